@@ -10,31 +10,148 @@ ve canlı kamera üzerinden gerçek zamanlı duygu tespiti gerçekleştirir.
 @version 1.0
 """
 
+import io
+import time
+
 import streamlit as st
 from functions import download_video, analyze_video, live_camera_analysis
-import tempfile
+from jobs import CANCELLED, DONE, FAILED, get_job_service
+from model_registry import start_background_warmup
+from result_cache import get_default_cache
 
 """
 @mainpage MoodLens - Duygu Analizi Arayüzü
 Bu ana sayfa, kullanıcıdan video veya canlı görüntü alarak yapay zeka destekli duygu tespiti yapar.
 """
 
+## @brief Çalışan işlerin durumunun kaç saniyede bir yenileneceği.
+POLL_INTERVAL = 1.0
+## @brief analyze_video çıktı modlarının arayüzdeki adları.
+RENDER_MODE_LABELS = {
+    "none": "Yok (yalnızca istatistikler, en hızlı)",
+    "keyframes": "Yalnızca analiz edilen kareler",
+    "full": "Tüm video",
+}
+## @brief Kare bazlı sonuç tablosunda seçilebilen sayfa boyları.
+PAGE_SIZES = (100, 500, 1000)
+
+# Modeller arka planda yüklenir; arayüz beklemeden açılır
+start_background_warmup()
+# Aynı video ya da URL için sonuçlar önbellekten döner
+cache = get_default_cache()
+# İndirme ve analizler arka planda, her biri kendi çalışma klasöründe yürütülür
+service = get_job_service()
+running_jobs = []
+
+
+def download_job(job, url):
+    """
+    @brief URL'deki videoyu işin çalışma klasörüne indirir (arka planda çalışır).
+    @return İndirilen video yolu.
+    """
+    job.report_progress(0.0, "Video indiriliyor...")
+    return download_video(url, job.path("video.mp4"), cache=cache)
+
+
+def analysis_job(job, video_path, profile, render_mode):
+    """
+    @brief Videoyu işin çalışma klasöründe analiz eder (arka planda çalışır).
+    @param video_path Analiz edilecek video; None ise işe yüklenen dosya.
+    @param render_mode İşaretlenmiş çıktı videosu modu ("none", "keyframes", "full").
+    @return analyze_video özeti.
+    """
+    def on_progress(done, total):
+        job.report_progress(done / total if total else 0.0, f"{done}/{total} kare analiz edildi")
+
+    return analyze_video(video_path or job.input_path, job.path("analyzed_output.mp4"), job.path("loglar.txt"),
+                         profile=profile, cache=cache, on_progress=on_progress, render_mode=render_mode)
+
+
+def show_job(state_key):
+    """
+    @brief Oturumda kayıtlı işin durumunu gösterir; iş sürüyorsa ilerleme çubuğu ve iptal düğmesi çizer.
+    @param state_key İş kimliğinin tutulduğu st.session_state anahtarı.
+    @return Başarıyla tamamlanmış iş ya da None.
+    """
+    job_id = st.session_state.get(state_key)
+    job = service.get(job_id) if job_id else None
+    if job is None:
+        return None
+    if not job.done:
+        st.progress(job.progress, text=f"{job.title}: {job.message or job.status}")
+        if st.button("İptal et", key=f"iptal-{job.id}"):
+            job.cancel()
+        running_jobs.append(job)
+        return None
+    if job.status == FAILED:
+        st.error(f"{job.title} başarısız oldu: {job.error}")
+    elif job.status == CANCELLED:
+        st.warning(f"{job.title} iptal edildi.")
+    return job if job.status == DONE else None
+
+
+def show_results(results, key):
+    """
+    @brief Analiz sonuçlarını, saniye bazlı duygu zaman çizelgesini, sayfalanmış kare sonuçlarını
+           ve ölçüldüyse aşama sürelerini gösterir.
+    @param results analyze_video çıktısı.
+    @param key Aynı sayfadaki birden fazla sonucun bileşenlerini ayırmak için önek.
+    """
+    st.write({k: v for k, v in results.items() if k not in ("Detaylı Sonuçlar", "Aşama Süreleri")})
+    detaylar = results["Detaylı Sonuçlar"]
+    if len(detaylar):
+        zaman_çizelgesi = detaylar.timeline()
+        st.subheader("📈 Saniye Bazlı Duygular")
+        st.line_chart({duygu: süreler for duygu, süreler in zaman_çizelgesi["Duygular"].items()})
+
+        # Uzun videolarda tüm satırlar tek seferde çizilmez; yalnızca seçilen sayfa gösterilir
+        st.subheader("🧾 Kare Bazlı Sonuçlar")
+        sayfa_boyu = st.selectbox("Sayfa başına satır", PAGE_SIZES, key=f"{key}_sayfa_boyu")
+        sayfa_sayısı = (len(detaylar) - 1) // sayfa_boyu + 1
+        sayfa = st.number_input(f"Sayfa (toplam {sayfa_sayısı})", min_value=1, max_value=sayfa_sayısı, value=1,
+                                key=f"{key}_sayfa")
+        başlangıç = (sayfa - 1) * sayfa_boyu
+        st.dataframe(detaylar.rows(başlangıç, başlangıç + sayfa_boyu))
+
+        buffer = io.BytesIO()
+        detaylar.save(buffer)
+        st.download_button("💾 Kare bazlı sonuçları indir (.npz)", buffer.getvalue(), file_name="sonuclar.npz",
+                           key=f"{key}_indir")
+    aşamalar = results.get("Aşama Süreleri")
+    if aşamalar:
+        st.subheader("⏱️ Aşama Süreleri")
+        st.table([{"Aşama": name, **{k: v for k, v in stats.items() if k != "histogram_ms"}}
+                  for name, stats in aşamalar.items()])
+
+
 st.title("🎥 Video & Kamera Duygu Analizi")
 
+profile = st.checkbox("⏱️ Aşama sürelerini ölç (hangi aşamanın yavaş olduğunu gösterir)")
+render_mode = st.selectbox("🎞️ İşaretlenmiş çıktı videosu", list(RENDER_MODE_LABELS), format_func=RENDER_MODE_LABELS.get)
+
 # YouTube videosu
 video_url = st.text_input("🎬 YouTube video linkini buraya yapıştır güzelim:")
 
 if video_url:
-    with st.spinner("Videoyu indiriyorum... Bekle biraz ❤️"):
-        video_path = download_video(video_url)
+    # İndirme işi saklama süresi dolup silinmişse video yeniden indirilir
+    if st.session_state.get("indirilen_url") != video_url or service.get(st.session_state["indirme_isi"]) is None:
+        st.session_state["indirilen_url"] = video_url
+        st.session_state["indirme_isi"] = service.submit(download_job, video_url, title="Videoyu indirme").id
+        st.session_state.pop("url_analiz_isi", None)
+
+    download = show_job("indirme_isi")
+    if download is not None:
         st.success("Video başarıyla indirildi!")
-        st.video(video_path)
+        st.video(download.result)
 
         if st.button("Bu videoyu analiz et"):
-            with st.spinner("Analiz ediliyor..."):
-                results = analyze_video(video_path)
-                st.success("Analiz tamamlandı!")
-                st.write(results)
+            st.session_state["url_analiz_isi"] = service.submit(analysis_job, download.result, profile,
+                                                                render_mode, title="Analiz",
+                                                                depends_on=[download]).id
+        analysis = show_job("url_analiz_isi")
+        if analysis is not None:
+            st.success("Analiz tamamlandı!")
+            show_results(analysis.result, "url")
 
 st.markdown("---")
 
@@ -45,18 +162,25 @@ if uploaded_file is not None:
     st.video(uploaded_file)
 
     if st.button("Yüklediğim videoyu analiz et"):
-        with st.spinner("Videoyu analiz ediyorum..."):
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as tmp_file:
-                tmp_file.write(uploaded_file.read())
-                tmp_video_path = tmp_file.name
-
-            results = analyze_video(tmp_video_path)
-            st.success("Analiz tamamlandı!")
-            st.write(results)
+        # Dosya belleğe okunmadan parça parça işin çalışma klasörüne yazılır
+        extension = uploaded_file.name.rsplit(".", 1)[-1]
+        st.session_state["yukleme_analiz_isi"] = service.submit(analysis_job, None, profile, render_mode,
+                                                                title="Analiz",
+                                                                upload=uploaded_file,
+                                                                upload_name=f"video.{extension}").id
+    analysis = show_job("yukleme_analiz_isi")
+    if analysis is not None:
+        st.success("Analiz tamamlandı!")
+        show_results(analysis.result, "yukleme")
 
 st.markdown("---")
 
 # Canlı kamera
 if st.button("📷 Canlı Kamerayı Başlat"):
     st.info("Canlı kamera açılıyor... Çıkmak için video penceresinde 'q' tuşuna bas.")
-    live_camera_analysis()
\ No newline at end of file
+    live_camera_analysis()
+
+# Süren işler varsa sayfa kısa aralıklarla yenilenerek ilerleme güncellenir
+if running_jobs:
+    time.sleep(POLL_INTERVAL)
+    st.rerun()
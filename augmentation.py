@@ -0,0 +1,92 @@
+##
+# @file augmentation.py
+# @brief Görüntü çeşitlemelerini (döndürme, kaydırma, parlaklık, yakınlaştırma, yansıtma) diske
+#        yazmadan, bellekte ve tekrarlanabilir biçimde üreten veri artırma aşaması.
+# @details data_augmention.ipynb'deki ImageDataGenerator ayarlarının karşılığıdır; ancak aug_*.jpg
+#          dosyaları üretmek yerine çeşitlemeler gerektiği yerde (gömme hesaplayan işçi süreçlerde ya
+#          da eğitimin ön yükleme iş parçacıklarında) üretilir.
+#
+#          Her çeşitleme (tohum, görüntü anahtarı, çeşitleme no) üçlüsünden türetilen kendi rastgele
+#          üretecini kullanır; böylece sonuç işçi sayısından ve iş sırasından bağımsızdır ve aynı tohumla
+#          her çalıştırmada aynı çeşitlemeler elde edilir.
+##
+
+import hashlib
+import json
+
+import cv2
+import numpy as np
+
+DEFAULT_ROTATION = 10
+DEFAULT_SHIFT = 0.1
+DEFAULT_BRIGHTNESS = (0.8, 1.2)
+DEFAULT_ZOOM = 0.1
+## @brief Eski yöntemle diske yazılmış çeşitlemelerin dosya adı öneki.
+MATERIALIZED_PREFIX = "aug_"
+
+
+## @brief İçerik özetini (hex) rastgele üretece verilebilecek tam sayı anahtara çevirir.
+def hash_key(content_hash):
+    return int(content_hash[:15], 16)
+
+
+## @brief Ayarları ve tohumu sabit, işçi süreçlere gönderilebilen (pickle) veri artırıcı.
+class Augmenter:
+    ## @param seed Tohum.
+    #  @param rotation En büyük döndürme açısı (derece).
+    #  @param shift En büyük yatay/dikey kaydırma (görüntü boyutunun oranı).
+    #  @param brightness (en küçük, en büyük) parlaklık çarpanı.
+    #  @param zoom En büyük yakınlaştırma/uzaklaştırma oranı.
+    #  @param flip True ise yarı olasılıkla yatay yansıtılır.
+    def __init__(self, seed=0, rotation=DEFAULT_ROTATION, shift=DEFAULT_SHIFT, brightness=DEFAULT_BRIGHTNESS,
+                 zoom=DEFAULT_ZOOM, flip=True):
+        self.seed = seed
+        self.rotation = rotation
+        self.shift = shift
+        self.brightness = tuple(brightness)
+        self.zoom = zoom
+        self.flip = flip
+
+    ## @brief Ayarların ve tohumun kısa özeti; önbellek anahtarlarında kullanılır.
+    def signature(self):
+        params = [self.seed, self.rotation, self.shift, list(self.brightness), self.zoom, self.flip]
+        return hashlib.sha1(json.dumps(params).encode("utf-8")).hexdigest()[:12]
+
+    ## @brief Tek bir çeşitleme üretir.
+    #  @param image uint8 görüntü (H, W) ya da (H, W, C).
+    #  @param key Çeşitlemeyi belirleyen negatif olmayan tam sayılar (ör. görüntü anahtarı, çeşitleme no).
+    #  @return Aynı boyut ve türde yeni görüntü.
+    def augment(self, image, *key):
+        rng = np.random.default_rng([self.seed, *key])
+        # Ayarlardan bağımsız olarak aynı sırada çekilir; bir ayarı kapatmak diğerlerini değiştirmez
+        angle, scale, tx, ty, factor, flip = rng.random(6)
+        angle = (2 * angle - 1) * self.rotation
+        scale = 1 + (2 * scale - 1) * self.zoom
+        h, w = image.shape[:2]
+        matrix = cv2.getRotationMatrix2D((w / 2, h / 2), angle, scale)
+        matrix[0, 2] += (2 * tx - 1) * self.shift * w
+        matrix[1, 2] += (2 * ty - 1) * self.shift * h
+        # fill_mode='nearest' karşılığı: kenar pikselleri uzatılır
+        out = cv2.warpAffine(image, matrix, (w, h), borderMode=cv2.BORDER_REPLICATE)
+        if self.flip and flip < 0.5:
+            out = cv2.flip(out, 1)
+        low, high = self.brightness
+        factor = low + factor * (high - low)
+        if factor != 1:
+            out = cv2.convertScaleAbs(out, alpha=factor)
+        return out
+
+    ## @brief Bir görüntünün 1..n numaralı çeşitlemelerini üretir.
+    #  @param image uint8 görüntü.
+    #  @param n Çeşitleme sayısı.
+    #  @param key Görüntü anahtarı (ör. hash_key(içerik özeti)).
+    def variants(self, image, n, key):
+        return [self.augment(image, key, i) for i in range(1, n + 1)]
+
+    ## @brief Bir toplu girdideki her görüntüye epoka özgü bir çeşitleme uygular (eğitim için).
+    #  @param images (N, H, W, C) uint8 dizi.
+    #  @param keys Her görüntünün veri kümesindeki indeksi.
+    #  @param epoch Epok numarası; her epokta farklı çeşitleme üretilir.
+    #  @return (N, H, W, C) uint8 dizi.
+    def apply(self, images, keys, epoch=0):
+        return np.stack([self.augment(image, int(key), epoch) for image, key in zip(images, keys)])
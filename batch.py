@@ -0,0 +1,343 @@
+##
+# @file batch.py
+# @brief Çok sayıda videoyu ekransız (headless) analiz eden, kaldığı yerden devam edebilen toplu çalıştırma aracı.
+# @details Girdiler klasör, glob deseni, tek tek video dosyaları ya da URL'ler (veya URL listesi dosyası)
+#          olabilir. Modeller bir kez yüklenir ve aynı süreçteki iş parçacıkları arasında paylaşılır;
+#          videolar CPU bütçesine göre belirlenen sayıda eşzamanlı analiz edilir.
+#
+#          Her video için sonuç klasörüne <kimlik>/ altında özet.json, sonuçlar.npz (kare bazlı sonuçlar)
+#          ve günlük yazılır. Çıktılar önce geçici bir klasörde hazırlanıp tek adımda yerine taşınır;
+#          ardından manifest.jsonl dosyasına bir satır eklenir. Kesilen bir çalıştırma yeniden
+#          başlatıldığında tamamlanmış (ve varsayılan olarak hata vermiş) videolar atlanır.
+#
+#          Örnekler:
+#            python batch.py kayitlar/ --out sonuclar/
+#            python batch.py "arsiv/**/*.mp4" --out sonuclar/ --cpus 8 --sampling adaptive
+#            python batch.py --urls liste.txt --out sonuclar/ --local-downloads indirilenler/
+#            python batch.py kayitlar/ --out sonuclar/ --retry-failed
+##
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import parse_qs, urlparse
+
+from jobs import DONE, FAILED, JobCancelled
+from keyframes import DEFAULT_MAX_RATE, SAMPLING_MODES
+
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".avi", ".mkv", ".webm", ".m4v")
+MANIFEST_NAME = "manifest.jsonl"
+SUMMARY_NAME = "özet.json"
+## @brief Bir videonun analizinin meşgul ettiği yaklaşık çekirdek sayısı (çözme, çıkarım, kodlama).
+CORES_PER_VIDEO = 2
+_TMP_PREFIX = ".tmp-"
+
+
+## @brief Kaynağın bir URL olup olmadığını döndürür.
+def is_url(source):
+    return urlparse(source).scheme in ("http", "https")
+
+
+## @brief URL'den video kimliğini çıkarır (YouTube "v" parametresi ya da yolun son parçası).
+def url_video_id(url):
+    parsed = urlparse(url)
+    video_id = parse_qs(parsed.query).get("v")
+    if video_id:
+        return video_id[0]
+    return os.path.basename(parsed.path.rstrip("/")) or parsed.netloc
+
+
+## @brief Kaynak için sonuç klasörü ve manifest kaydında kullanılan kararlı kimliği üretir.
+#  @details Okunabilirlik için dosya adı (ya da video kimliği) ile tam yolun (ya da URL'nin) kısa
+#           özeti birleştirilir; farklı klasörlerdeki aynı adlı videolar çakışmaz.
+def item_id(source):
+    if is_url(source):
+        name, key = url_video_id(source), source
+    else:
+        name, key = os.path.splitext(os.path.basename(source))[0], os.path.abspath(source)
+    name = re.sub(r"[^\w.-]+", "_", name)[:60]
+    return f"{name}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:8]}"
+
+
+def _video_files(directory, recursive):
+    if recursive:
+        paths = [os.path.join(root, name) for root, _, names in os.walk(directory) for name in names]
+    else:
+        paths = [os.path.join(directory, name) for name in os.listdir(directory)]
+    return sorted(path for path in paths if path.lower().endswith(VIDEO_EXTENSIONS) and os.path.isfile(path))
+
+
+## @brief URL listesi dosyasını okur; boş satırlar ve # ile başlayan satırlar atlanır.
+def read_url_list(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+## @brief Girdileri (kimlik, kaynak) listesine çevirir.
+#  @param inputs Klasör, glob deseni, video dosyası ya da URL listesi.
+#  @param url_file İsteğe bağlı URL listesi dosyası.
+#  @param recursive True ise klasörlerin alt klasörleri de taranır.
+#  @return Girdi sırasını koruyan, tekrarsız (kimlik, kaynak) listesi.
+#  @throws FileNotFoundError Bir girdi bulunamazsa.
+def collect_items(inputs, url_file=None, recursive=False):
+    sources = []
+    for source in inputs:
+        if is_url(source):
+            sources.append(source)
+        elif os.path.isdir(source):
+            sources.extend(_video_files(source, recursive))
+        elif any(c in source for c in "*?["):
+            sources.extend(sorted(path for path in glob.glob(source, recursive=True) if os.path.isfile(path)))
+        elif os.path.isfile(source):
+            sources.append(source)
+        else:
+            raise FileNotFoundError(f"Girdi bulunamadı: {source}")
+    if url_file:
+        sources.extend(read_url_list(url_file))
+
+    items = {}
+    for source in sources:
+        items.setdefault(item_id(source), source)
+    return list(items.items())
+
+
+## @brief download_video'nun çevrimdışı karşılığı: URL'nin videosunu yerel klasörden kopyalar.
+#  @details Video, klasörde URL'deki video kimliğiyle adlandırılmış olarak aranır (ör. dQw4w9WgXcQ.mp4).
+#  @param url Video URL'si.
+#  @param output_path Videonun kopyalanacağı yol.
+#  @param source_dir Önceden indirilmiş videoların klasörü.
+#  @return output_path.
+#  @throws FileNotFoundError Klasörde karşılığı yoksa.
+def local_download(url, output_path, source_dir):
+    video_id = url_video_id(url)
+    for extension in VIDEO_EXTENSIONS:
+        candidate = os.path.join(source_dir, video_id + extension)
+        if os.path.isfile(candidate):
+            shutil.copyfile(candidate, output_path)
+            return output_path
+    raise FileNotFoundError(f"{source_dir} içinde {video_id} videosu bulunamadı ({url})")
+
+
+## @brief Toplu çalıştırmanın yalnızca eklenerek yazılan (append-only) durum kaydı.
+#  @details Her satır bir JSON kaydıdır; aynı kimliğin son kaydı geçerlidir. Satırlar yazıldıktan sonra
+#           diske aktarılır (fsync); süreç satır yazarken kesilirse yarım kalan son satır okunurken atlanır.
+class Manifest:
+    ## @param path manifest.jsonl yolu; yoksa ilk kayıtta oluşturulur.
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.entries[entry["id"]] = entry
+
+    ## @brief Kimliğin son durumunu döndürür; kaydı yoksa None.
+    def status(self, item_id):
+        entry = self.entries.get(item_id)
+        return entry["durum"] if entry else None
+
+    ## @brief Bir durum kaydı ekler.
+    #  @param item_id Kimlik.
+    #  @param status jobs.DONE ya da jobs.FAILED.
+    #  @param fields Kayda eklenecek diğer alanlar (kaynak, süre, hata...).
+    def record(self, item_id, status, **fields):
+        entry = {"id": item_id, "durum": status, "zaman": time.strftime("%Y-%m-%dT%H:%M:%S"), **fields}
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self.entries[item_id] = entry
+
+
+## @brief Tek bir videoyu analiz eder ve çıktılarını sonuç klasörüne atomik olarak yerleştirir.
+#  @param item_id Kimlik; çıktılar results_dir/<item_id>/ altına yazılır.
+#  @param source Video dosyası ya da URL.
+#  @param results_dir Sonuç klasörü.
+#  @param download URL'ler için download(url, output_path) fonksiyonu.
+#  @param options analyze_video'ya aktarılacak parametreler.
+#  @param stop_event İşaretlenirse analiz bir sonraki ilerleme bildiriminde JobCancelled ile durur.
+#  @return Kare bazlı sonuçlar hariç özet.
+def process_item(item_id, source, results_dir, download, options, stop_event=None):
+    from functions import RESULTS_FILE, analyze_video
+
+    def on_progress(frames, total_frames):
+        if stop_event is not None and stop_event.is_set():
+            raise JobCancelled()
+
+    work_dir = tempfile.mkdtemp(prefix=f"{_TMP_PREFIX}{item_id}-", dir=results_dir)
+    try:
+        video_path = source
+        if is_url(source):
+            video_path = download(source, os.path.join(work_dir, "video.mp4"))
+        log_name = "loglar.jsonl" if options.get("log_format") == "jsonl" else "loglar.txt"
+        özet = analyze_video(video_path, os.path.join(work_dir, "analiz.mp4"), os.path.join(work_dir, log_name),
+                             verbose=0, on_progress=on_progress, results_path=os.path.join(work_dir, RESULTS_FILE),
+                             **options)
+        if video_path != source:
+            os.remove(video_path)
+
+        özet = {k: v for k, v in özet.items() if k != "Detaylı Sonuçlar"}
+        with open(os.path.join(work_dir, SUMMARY_NAME), "w", encoding="utf-8") as f:
+            json.dump({"Kaynak": source, **özet}, f, ensure_ascii=False, indent=2)
+
+        final_dir = os.path.join(results_dir, item_id)
+        shutil.rmtree(final_dir, ignore_errors=True)
+        os.replace(work_dir, final_dir)
+    except BaseException:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+    return özet
+
+
+## @brief CPU bütçesine göre eşzamanlı video sayısını belirler.
+#  @param cpus Kullanılabilecek çekirdek sayısı.
+#  @param items Analiz edilecek video sayısı.
+def default_workers(cpus, items):
+    return max(1, min(items, cpus // CORES_PER_VIDEO))
+
+
+## @brief OpenCV ve TensorFlow iş parçacığı havuzlarını eşzamanlı videolar arasında paylaştırır.
+#  @details TensorFlow ortam değişkenleri yalnızca TensorFlow yüklenmeden önce etkilidir; bu yüzden
+#           modeller yüklenmeden çağrılmalıdır. Kullanıcının açıkça verdiği değerler değiştirilmez.
+def limit_threads(cpus, workers):
+    import cv2
+
+    threads = max(1, cpus // workers)
+    cv2.setNumThreads(threads)
+    os.environ.setdefault("TF_NUM_INTRAOP_THREADS", str(threads))
+    os.environ.setdefault("TF_NUM_INTEROP_THREADS", "1")
+    return threads
+
+
+## @brief Videoları eşzamanlı analiz eder ve durumları manifeste yazar.
+#  @param items collect_items çıktısı.
+#  @param results_dir Sonuç klasörü.
+#  @param workers Eşzamanlı analiz edilecek video sayısı.
+#  @param download URL'ler için download(url, output_path) fonksiyonu.
+#  @param options analyze_video'ya aktarılacak parametreler.
+#  @param retry_failed True ise daha önce hata veren videolar yeniden denenir.
+#  @return {"tamamlandı", "hata", "atlandı"} sayıları.
+def run_batch(items, results_dir, workers, download, options, retry_failed=False):
+    from model_registry import warm_up_models
+
+    os.makedirs(results_dir, exist_ok=True)
+    # Önceki kesilmiş çalıştırmalardan kalan yarım çıktılar
+    for name in os.listdir(results_dir):
+        if name.startswith(_TMP_PREFIX):
+            shutil.rmtree(os.path.join(results_dir, name), ignore_errors=True)
+
+    manifest = Manifest(os.path.join(results_dir, MANIFEST_NAME))
+    skip = {DONE} if retry_failed else {DONE, FAILED}
+    pending = [(i, source) for i, source in items if manifest.status(i) not in skip]
+    counts = {DONE: 0, FAILED: 0, "atlandı": len(items) - len(pending)}
+    if not pending:
+        print(f"Analiz edilecek video yok ({counts['atlandı']} video daha önce işlenmiş).")
+        return counts
+
+    print(f"🎬 {len(pending)} video analiz edilecek ({counts['atlandı']} atlandı), eşzamanlı: {workers}")
+    warm_up_models()
+
+    stop_event = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="moodlens-batch")
+    futures = {executor.submit(process_item, i, source, results_dir, download, options, stop_event):
+               (i, source, time.perf_counter()) for i, source in pending}
+    try:
+        for done, future in enumerate(as_completed(futures), 1):
+            i, source, submitted = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                traceback.print_exc()
+                manifest.record(i, FAILED, kaynak=source, hata=f"{type(e).__name__}: {e}")
+                counts[FAILED] += 1
+                print(f"❌ [{done}/{len(pending)}] {i}: {e}")
+            else:
+                manifest.record(i, DONE, kaynak=source, süre_sn=round(time.perf_counter() - submitted, 2))
+                counts[DONE] += 1
+                print(f"✅ [{done}/{len(pending)}] {i}")
+    except KeyboardInterrupt:
+        # Yarım kalan videolar manifeste yazılmaz; bir sonraki çalıştırmada baştan analiz edilir
+        print("⏹️ Durduruluyor; çalışan analizler bir sonraki ilerleme bildiriminde bırakılacak...")
+        stop_event.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+        raise
+    executor.shutdown()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MoodLens toplu video analizi")
+    parser.add_argument("inputs", nargs="*", help="Klasör, glob deseni, video dosyası ya da URL")
+    parser.add_argument("--urls", help="Satır başına bir URL içeren liste dosyası")
+    parser.add_argument("--out", required=True, help="Sonuç klasörü (manifest.jsonl burada tutulur)")
+    parser.add_argument("--recursive", action="store_true", help="Klasörlerin alt klasörlerini de tara")
+    parser.add_argument("--cpus", type=int, default=os.cpu_count() or 1, help="Kullanılacak çekirdek bütçesi")
+    parser.add_argument("--workers", type=int, default=None,
+                        help=f"Eşzamanlı video sayısı (varsayılan: cpus / {CORES_PER_VIDEO})")
+    parser.add_argument("--retry-failed", action="store_true", help="Daha önce hata veren videoları yeniden dene")
+    parser.add_argument("--local-downloads", help="URL'leri indirmek yerine bu klasördeki <video kimliği>.mp4 "
+                                                  "dosyalarını kullan (çevrimdışı çalışma)")
+    parser.add_argument("--render-mode", choices=["full", "keyframes", "none"], default="none",
+                        help="İşaretlenmiş çıktı videosu (varsayılan: yazılmaz)")
+    parser.add_argument("--sampling", choices=SAMPLING_MODES, default="fixed", help="Kare örnekleme modu")
+    parser.add_argument("--analysis-rate", type=float, default=DEFAULT_MAX_RATE,
+                        help="adaptive örneklemede saniyede en fazla analiz edilen kare")
+    parser.add_argument("--emotion-backend", choices=["keras", "tflite"], default=None, help="Duygu modeli arka ucu")
+    parser.add_argument("--log-format", choices=["text", "jsonl"], default="text", help="Günlük biçimi")
+    parser.add_argument("--batch-size", type=int, default=32, help="Tek model çağrısındaki en fazla yüz sayısı")
+    parser.add_argument("--no-tracking", action="store_true", help="Yüz izlemeyi kapat")
+    parser.add_argument("--video-workers", type=int, default=1,
+                        help="Her videoyu parçalara bölüp bu kadar süreçte analiz et "
+                             "(--no-tracking ve fixed örnekleme gerekir)")
+    args = parser.parse_args(argv)
+
+    if not args.inputs and not args.urls:
+        parser.error("en az bir girdi ya da --urls gerekli")
+    items = collect_items(args.inputs, args.urls, args.recursive)
+    if args.video_workers > 1 and args.sampling != "fixed":
+        parser.error("--video-workers yalnızca --sampling fixed ile kullanılabilir")
+    if args.video_workers > 1 and not args.no_tracking:
+        # İzler parça sınırında yeniden başlar; seri analizle aynı sonuç yalnızca izleme kapalıyken alınır
+        parser.error("--video-workers yalnızca --no-tracking ile kullanılabilir")
+    # Çekirdek bütçesi eşzamanlı videolar ve her videonun parça süreçleri arasında paylaşılır
+    cpus = max(1, args.cpus // args.video_workers)
+    workers = args.workers or default_workers(cpus, len(items))
+    limit_threads(cpus, workers)
+
+    if args.local_downloads:
+        def download(url, output_path):
+            return local_download(url, output_path, args.local_downloads)
+    else:
+        from functions import download_video
+
+        def download(url, output_path):
+            return download_video(url, output_path)
+
+    options = {"batch_size": args.batch_size, "track_faces": not args.no_tracking, "log_format": args.log_format,
+               "emotion_backend": args.emotion_backend, "render_mode": args.render_mode,
+               "sampling": args.sampling, "analysis_rate": args.analysis_rate, "workers": args.video_workers}
+    counts = run_batch(items, args.out, workers, download, options, args.retry_failed)
+    print(f"Bitti: {counts[DONE]} tamamlandı, {counts[FAILED]} hata, {counts['atlandı']} atlandı. "
+          f"Sonuçlar: {args.out}")
+    return 1 if counts[FAILED] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,413 @@
+##
+# @file benchmark.py
+# @brief MoodLens analiz giriş noktaları için tekrarlanabilir performans ölçüm aracı.
+# @details Kontrol edilebilir yüz sayısı, çözünürlük ve uzunlukta yapay bir test videosu üretir ve
+#          aşağıdaki giriş noktalarını ekransız (headless) ve çevrimdışı çalıştırır:
+#          - analyze_video (functions.py)
+#          - identify_speaker_transcribe_and_emotion (ggfunctions.py, "offline" tanıyıcı ile)
+#          - live_camera_analysis (functions.py, kaynak olarak test videosu)
+#          - enroll (enroll.py, geçici bir veri kümesiyle; ilk ve artımlı çalıştırma)
+#
+#          Her ölçüm ayrı bir süreçte yapılır; böylece tepe bellek (peak RSS) ve model yükleme süresi
+#          ölçümler arasında karışmaz. Sonuçlar JSON olarak kaydedilip önceki bir temel (baseline)
+#          ile karşılaştırılabilir.
+#
+#          Örnekler:
+#            python benchmark.py --faces 2 --seconds 10 --save benchmarks/temel.json
+#            python benchmark.py --only analyze_video live --compare benchmarks/temel.json
+##
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from media import AUDIO_SAMPLE_RATE, find_ffmpeg
+
+BENCHMARKS = ("analyze_video", "speaker_report", "live", "enroll")
+DEFAULT_DATASET = os.path.join("dataset", "train")
+DEFAULT_TOLERANCE = 10.0
+## @brief Ölçüm sürecinin hâlâ çalışıp çalışmadığının denetlendiği aralık (saniye).
+RESULT_POLL_SECONDS = 5
+
+## @brief Karşılaştırmada yüksek olması iyi olan metrikler; diğerlerinde düşük değer iyidir.
+HIGHER_IS_BETTER = ("kare_per_sn", "görüntü_per_sn")
+COMPARED_METRICS = ("kare_per_sn", "görüntü_per_sn", "yüz_başına_ms", "süre_sn", "tepe_rss_mb", "model_yükleme_sn",
+                    "gecikme_p50_ms", "gecikme_p90_ms")
+
+
+## @brief Veri kümesinden her kişi için bir yüz görüntüsü seçer.
+#  @param dataset_path Kişi klasörlerini içeren veri kümesi.
+#  @param n_faces İstenen yüz sayısı; kişi sayısından fazlaysa kişiler tekrar eder.
+#  @return BGR görüntü listesi; veri kümesi yoksa boş liste.
+def _load_face_images(dataset_path, n_faces):
+    if not os.path.isdir(dataset_path):
+        return []
+    faces = []
+    for person in sorted(os.listdir(dataset_path)):
+        person_path = os.path.join(dataset_path, person)
+        if not os.path.isdir(person_path):
+            continue
+        for file_name in sorted(os.listdir(person_path)):
+            img = cv2.imread(os.path.join(person_path, file_name))
+            if img is not None:
+                faces.append(img)
+                break
+    return [faces[i % len(faces)] for i in range(n_faces)] if faces else []
+
+
+## @brief Konuşmaya benzer, sessizliklerle ayrılmış ton patlamalarından oluşan mono PCM üretir.
+#  @param seconds Ses süresi.
+#  @param sample_rate Örnekleme hızı.
+#  @param seed Rastgele üreteç tohumu.
+#  @return int16 örnekler.
+def synthetic_speech(seconds, sample_rate=AUDIO_SAMPLE_RATE, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    # 1.5 sn konuşma, 0.7 sn sessizlik
+    envelope = ((t % 2.2) < 1.5).astype(np.float32)
+    signal = np.sin(2 * np.pi * 220 * t) + 0.3 * rng.standard_normal(len(t))
+    return (3000 * envelope * signal).astype(np.int16)
+
+
+## @brief Belirtilen sayıda yüz içeren yapay bir test videosu üretir.
+#  @details Yüzler veri kümesindeki görüntülerden alınır ve kare boyunca hafifçe hareket ettirilir;
+#           veri kümesi yoksa yüz yerine düz dikdörtgenler çizilir. ffmpeg varsa videoya konuşmaya
+#           benzer yapay bir ses izi eklenir.
+#  @param path Çıktı .mp4 dosyası.
+#  @param n_faces Karedeki yüz sayısı.
+#  @param width Kare genişliği.
+#  @param height Kare yüksekliği.
+#  @param seconds Video süresi.
+#  @param fps Kare hızı.
+#  @param dataset_path Yüz görüntülerinin alınacağı veri kümesi.
+#  @param with_audio True ise ses izi eklenir.
+#  @return Toplam kare sayısı.
+def make_synthetic_video(path, n_faces=1, width=640, height=360, seconds=10, fps=25,
+                         dataset_path=DEFAULT_DATASET, with_audio=True):
+    face_imgs = _load_face_images(dataset_path, n_faces)
+    size = int(min(height * 0.6, width / max(n_faces, 1) * 0.8))
+    slot = width / max(n_faces, 1)
+    faces = [cv2.resize(img, (size, size)) for img in face_imgs]
+
+    total_frames = int(seconds * fps)
+    video_path = path if not with_audio else path + ".video.mp4"
+    out = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    try:
+        for i in range(total_frames):
+            frame = np.full((height, width, 3), 90, dtype=np.uint8)
+            for j in range(n_faces):
+                shift = int((slot - size) / 2 * np.sin(i / fps + j))
+                x = int(j * slot + (slot - size) / 2) + shift
+                y = (height - size) // 2
+                if faces:
+                    frame[y:y + size, x:x + size] = faces[j]
+                else:
+                    cv2.rectangle(frame, (x, y), (x + size, y + size), (180, 200, 230), -1)
+            out.write(frame)
+    finally:
+        out.release()
+
+    if with_audio:
+        ffmpeg = find_ffmpeg()
+        if ffmpeg is None:
+            os.replace(video_path, path)
+            return total_frames
+        wav_path = path + ".wav"
+        import wave
+        with wave.open(wav_path, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(AUDIO_SAMPLE_RATE)
+            wav.writeframes(synthetic_speech(seconds).tobytes())
+        try:
+            subprocess.run([ffmpeg, "-y", "-loglevel", "error", "-i", video_path, "-i", wav_path,
+                            "-c:v", "copy", "-c:a", "aac", "-shortest", path], check=True)
+        finally:
+            os.remove(wav_path)
+            os.remove(video_path)
+    return total_frames
+
+
+## @brief Sürecin tepe bellek kullanımını MB cinsinden döndürür.
+#  @return MB; platform desteklemiyorsa None.
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux'ta KB, macOS'ta bayt cinsindendir
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+## @brief analyze_faces çağrılarını sayan ve süresini ölçen sarmalayıcıyı modüllere yerleştirir.
+#  @param modules analyze_faces'i adıyla içe aktarmış modüller.
+#  @return {"yüz": ..., "süre": ...} sayaç sözlüğü.
+def _instrument_analyze_faces(modules):
+    import inference
+
+    counter = {"yüz": 0, "süre": 0.0}
+    original = inference.analyze_faces
+
+    def counted(face_imgs, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return original(face_imgs, *args, **kwargs)
+        finally:
+            counter["süre"] += time.perf_counter() - start
+            counter["yüz"] += len(face_imgs)
+
+    for module in modules:
+        module.analyze_faces = counted
+    return counter
+
+
+def _face_metrics(counter):
+    per_face = counter["süre"] / counter["yüz"] * 1000 if counter["yüz"] else None
+    return {"yüz": counter["yüz"], "yüz_başına_ms": None if per_face is None else round(per_face, 2)}
+
+
+def _bench_analyze_video(video_path, workdir, params):
+    import functions
+
+    counter = _instrument_analyze_faces([functions])
+    start = time.perf_counter()
+    özet = functions.analyze_video(video_path, os.path.join(workdir, "cikti.mp4"), os.path.join(workdir, "log.txt"),
+                                   verbose=0)
+    elapsed = time.perf_counter() - start
+    return {"süre_sn": round(elapsed, 3), "kare": özet["Toplam Kare"],
+            "kare_per_sn": round(özet["Toplam Kare"] / elapsed, 2), **_face_metrics(counter)}
+
+
+def _bench_speaker_report(video_path, workdir, params):
+    import ggfunctions
+    from transcription import get_recognizer_backend
+
+    counter = _instrument_analyze_faces([ggfunctions])
+    start = time.perf_counter()
+    ggfunctions.identify_speaker_transcribe_and_emotion(video_path,
+                                                        recognizer_backend=get_recognizer_backend("offline"))
+    elapsed = time.perf_counter() - start
+    return {"süre_sn": round(elapsed, 3), "kare": params["kare"],
+            "kare_per_sn": round(params["kare"] / elapsed, 2), **_face_metrics(counter)}
+
+
+def _bench_live(video_path, workdir, params):
+    import functions
+
+    counter = _instrument_analyze_faces([functions])
+    start = time.perf_counter()
+    stats = functions.live_camera_analysis(video_path, display=False)
+    elapsed = time.perf_counter() - start
+    latency = stats["Gösterim Gecikmesi (ms)"]
+    result_latency = stats["Sonuç Gecikmesi (ms)"]
+    return {"süre_sn": round(elapsed, 3), "kare": stats["Gösterilen Kare"],
+            "kare_per_sn": round(stats["Analiz Edilen Kare"] / elapsed, 2),
+            "gecikme_p50_ms": latency.get("p50"), "gecikme_p90_ms": latency.get("p90"),
+            "sonuç_gecikmesi_p50_ms": result_latency.get("p50"), "sonuç_gecikmesi_p90_ms": result_latency.get("p90"),
+            **_face_metrics(counter)}
+
+
+def _bench_enroll(video_path, workdir, params):
+    from enroll import enroll
+
+    dataset = os.path.join(workdir, "train")
+    for person in sorted(os.listdir(params["veri_kümesi"])):
+        src = os.path.join(params["veri_kümesi"], person)
+        if not os.path.isdir(src):
+            continue
+        os.makedirs(os.path.join(dataset, person))
+        for file_name in sorted(os.listdir(src))[:params["kayıt_görüntü"]]:
+            shutil.copy2(os.path.join(src, file_name), os.path.join(dataset, person, file_name))
+
+    def run():
+        start = time.perf_counter()
+        stats = enroll(dataset, os.path.join(workdir, "store"), os.path.join(workdir, "knn.pkl"),
+                       index_path=os.path.join(workdir, "index.npz"))
+        return time.perf_counter() - start, stats
+
+    elapsed, stats = run()
+    incremental, _ = run()
+    return {"süre_sn": round(elapsed, 3), "artımlı_süre_sn": round(incremental, 3), "görüntü": stats["toplam"],
+            "görüntü_per_sn": round(stats["toplam"] / elapsed, 2)}
+
+
+_RUNNERS = {
+    "analyze_video": _bench_analyze_video,
+    "speaker_report": _bench_speaker_report,
+    "live": _bench_live,
+    "enroll": _bench_enroll,
+}
+
+
+## @brief Tek bir ölçümü yürütür (ayrı süreçte çalışır).
+def _child(name, video_path, params, results):
+    os.environ["MOODLENS_RECOGNIZER"] = "offline"
+    os.environ["MOODLENS_EMOTION_BACKEND"] = params["duygu_arka_ucu"]
+    workdir = tempfile.mkdtemp(prefix=f"moodlens_bench_{name}_")
+    try:
+        from model_registry import warm_up_models
+
+        start = time.perf_counter()
+        warm_up_models()
+        load_time = time.perf_counter() - start
+
+        metrics = _RUNNERS[name](video_path, workdir, params)
+        metrics["model_yükleme_sn"] = round(load_time, 3)
+        metrics["tepe_rss_mb"] = peak_rss_mb()
+        results.put((name, metrics))
+    except Exception as e:
+        results.put((name, {"hata": f"{type(e).__name__}: {e}"}))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+## @brief Ölçümleri sırayla, her biri yeni bir süreçte çalıştırır.
+#  @param names Çalıştırılacak ölçüm adları.
+#  @param video_path Test videosu.
+#  @param params Ölçüm parametreleri.
+#  @return {ad: metrikler} sözlüğü. Süreç sonuç vermeden ölürse (ör. bellek yetersizliği ya da yerel
+#          kütüphane çökmesi) o ölçümün metrikleri yalnızca "hata" içerir.
+def run_benchmarks(names, video_path, params):
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    for name in names:
+        results_queue = ctx.Queue()
+        process = ctx.Process(target=_child, args=(name, video_path, params, results_queue), name=f"bench-{name}")
+        process.start()
+        try:
+            while True:
+                # Canlılık beklemeden önce okunur: süreç sonucu yazıp hemen çıkmış olabilir
+                alive = process.is_alive()
+                try:
+                    _, metrics = results_queue.get(timeout=RESULT_POLL_SECONDS)
+                    break
+                except queue.Empty:
+                    if not alive:
+                        metrics = {"hata": f"Ölçüm süreci sonuç vermeden sonlandı (çıkış kodu {process.exitcode})"}
+                        break
+        finally:
+            process.join()
+        results[name] = metrics
+        print(f"⏱️ {name}: {metrics}")
+    return results
+
+
+## @brief Ölçüm ortamını tanımlayan bilgiler.
+def environment_info():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "işlemci_sayısı": os.cpu_count(),
+        "opencv": cv2.__version__,
+        "numpy": np.__version__,
+    }
+
+
+## @brief İki ölçüm raporunu karşılaştırır.
+#  @param baseline Temel rapor.
+#  @param current Güncel rapor.
+#  @param tolerance Gerileme sayılacak en küçük yüzde değişim.
+#  @return (satırlar, gerileme sayısı); her satır (ölçüm, metrik, temel, güncel, % değişim, gerileme mi).
+def compare_reports(baseline, current, tolerance=DEFAULT_TOLERANCE):
+    rows = []
+    regressions = 0
+    for name, metrics in current["sonuçlar"].items():
+        base_metrics = baseline.get("sonuçlar", {}).get(name, {})
+        for metric in COMPARED_METRICS:
+            old, new = base_metrics.get(metric), metrics.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            regressed = worse > tolerance
+            regressions += regressed
+            rows.append((name, metric, old, new, round(change, 1), regressed))
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MoodLens performans ölçüm aracı")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS),
+                        help="Çalıştırılacak ölçümler")
+    parser.add_argument("--faces", type=int, default=1, help="Test videosundaki yüz sayısı")
+    parser.add_argument("--width", type=int, default=640, help="Kare genişliği")
+    parser.add_argument("--height", type=int, default=360, help="Kare yüksekliği")
+    parser.add_argument("--seconds", type=float, default=10, help="Test videosu süresi")
+    parser.add_argument("--fps", type=int, default=25, help="Test videosu kare hızı")
+    parser.add_argument("--dataset", default=DEFAULT_DATASET, help="Yüz görüntülerinin alınacağı veri kümesi")
+    parser.add_argument("--enroll-images", type=int, default=20, help="Kayıt ölçümünde kişi başına görüntü sayısı")
+    parser.add_argument("--emotion-backend", choices=["keras", "tflite"], default="keras",
+                        help="Duygu modeli arka ucu (tflite için önce emotion_runtime.py export)")
+    parser.add_argument("--video", help="Yapay video yerine kullanılacak video dosyası")
+    parser.add_argument("--save", help="Sonuçların kaydedileceği JSON dosyası")
+    parser.add_argument("--compare", help="Karşılaştırılacak temel JSON dosyası")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Gerileme eşiği (yüzde)")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="moodlens_bench_")
+    try:
+        video_path = args.video
+        if video_path:
+            cap = cv2.VideoCapture(video_path)
+            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            cap.release()
+        else:
+            video_path = os.path.join(workdir, "test.mp4")
+            total_frames = make_synthetic_video(video_path, args.faces, args.width, args.height, args.seconds,
+                                                args.fps, args.dataset)
+
+        params = {
+            "yüz_sayısı": args.faces,
+            "çözünürlük": f"{args.width}x{args.height}",
+            "süre_sn": args.seconds,
+            "fps": args.fps,
+            "kare": total_frames,
+            "video": args.video,
+            "veri_kümesi": args.dataset,
+            "kayıt_görüntü": args.enroll_images,
+            "duygu_arka_ucu": args.emotion_backend,
+        }
+        report = {
+            "zaman": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "ortam": environment_info(),
+            "parametreler": params,
+            "sonuçlar": run_benchmarks(args.only, video_path, params),
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Sonuçlar kaydedildi: {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("parametreler") != params:
+            print("⚠️ Temel ölçüm farklı parametrelerle alınmış; karşılaştırma yanıltıcı olabilir.")
+        rows, regressions = compare_reports(baseline, report, args.tolerance)
+        for name, metric, old, new, change, regressed in rows:
+            mark = "❌" if regressed else "✅"
+            print(f"{mark} {name:15s} {metric:18s} {old:>10} → {new:>10} ({change:+.1f}%)")
+        if regressions:
+            print(f"{regressions} metrikte %{args.tolerance:g} üzerinde gerileme var.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+##
+# @file detection.py
+# @brief Tüm analiz fonksiyonlarının paylaştığı, küçültülmüş karede çalışan yüz algılama motoru.
+# @details Algılama tam çözünürlüklü kare yerine genişliği en fazla max_width olan küçültülmüş kopya
+#          üzerinde yapılır; bulunan kutular tam çözünürlüğe geri ölçeklenir, böylece kırpıntılar
+#          (kimlik ve duygu modelleri için) yine tam çözünürlükten alınır. En küçük ve en büyük yüz
+#          boyutu tam çözünürlük pikseli cinsinden uygulanır.
+#
+#          Tam taramalar arasında yalnızca önceki yüzlerin çevresindeki ilgi bölgeleri (ROI)
+#          taranır. Yeni giren bir yüz en geç full_scan_interval algılama sonra bulunur; önceki
+#          karede yüz yoksa her seferinde tam tarama yapılır.
+#
+#          Arka uçlar:
+#          - "haar": OpenCV Haar cascade (varsayılan; gri tonlamalı görüntüde çalışır).
+#          - "dnn": OpenCV DNN ile ResNet-10 SSD yüz dedektörü (CPU). Model dosyaları
+#            model_registry.DNN_MODEL_PATH ve DNN_CONFIG_PATH yollarında beklenir.
+#          Varsayılan arka uç MOODLENS_DETECTOR ortam değişkeniyle değiştirilebilir.
+##
+
+import os
+import threading
+
+import cv2
+import numpy as np
+
+from model_registry import get_face_cascade, get_face_dnn
+from tracking import box_iou
+
+DETECT_MAX_WIDTH = 640
+MIN_FACE_SIZE = 30
+MAX_FACE_SIZE = None
+SCALE_FACTOR = 1.1
+MIN_NEIGHBORS = 5
+FULL_SCAN_INTERVAL = 10
+ROI_MARGIN = 0.5
+DNN_CONFIDENCE = 0.5
+DNN_INPUT_SIZE = (300, 300)
+DUPLICATE_IOU = 0.5
+
+
+## @brief Haar cascade arka ucu.
+class HaarBackend:
+    name = "haar"
+
+    def __init__(self, cascade=None, scale_factor=SCALE_FACTOR, min_neighbors=MIN_NEIGHBORS):
+        self.cascade = cascade if cascade is not None else get_face_cascade()
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+
+    ## @brief Küçültülmüş BGR kareyi arka ucun girdisine çevirir (bir kez, tüm ROI'ler için).
+    def prepare(self, image):
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    ## @brief Hazırlanmış görüntüde yüz arar.
+    #  @param image prepare çıktısı ya da onun bir bölgesi.
+    #  @param min_size Görüntü pikseli cinsinden en küçük yüz kenarı.
+    #  @param max_size Görüntü pikseli cinsinden en büyük yüz kenarı; None ise sınırsız.
+    #  @return (x, y, w, h) kutuları.
+    def detect(self, image, min_size, max_size=None):
+        kwargs = {"scaleFactor": self.scale_factor, "minNeighbors": self.min_neighbors,
+                  "minSize": (min_size, min_size)}
+        if max_size:
+            kwargs["maxSize"] = (max_size, max_size)
+        return self.cascade.detectMultiScale(image, **kwargs)
+
+
+## @brief OpenCV DNN (ResNet-10 SSD) arka ucu.
+#  @details cv2.dnn.Net.forward aynı ağ nesnesiyle eşzamanlı çağrılamayacağından çağrılar kilitlenir.
+class DnnBackend:
+    name = "dnn"
+    _lock = threading.Lock()
+
+    def __init__(self, net=None, confidence=DNN_CONFIDENCE):
+        self.net = net if net is not None else get_face_dnn()
+        self.confidence = confidence
+
+    def prepare(self, image):
+        return image
+
+    def detect(self, image, min_size, max_size=None):
+        h, w = image.shape[:2]
+        blob = cv2.dnn.blobFromImage(image, 1.0, DNN_INPUT_SIZE, (104.0, 177.0, 123.0))
+        with self._lock:
+            self.net.setInput(blob)
+            detections = self.net.forward()[0, 0]
+
+        boxes = []
+        for detection in detections[detections[:, 2] >= self.confidence]:
+            x1, y1, x2, y2 = (detection[3:7] * np.array([w, h, w, h])).astype(int)
+            x1, y1 = max(0, x1), max(0, y1)
+            x2, y2 = min(w, x2), min(h, y2)
+            bw, bh = x2 - x1, y2 - y1
+            if min(bw, bh) >= min_size and (not max_size or max(bw, bh) <= max_size):
+                boxes.append((x1, y1, bw, bh))
+        return boxes
+
+
+_BACKENDS = {
+    "haar": HaarBackend,
+    "dnn": DnnBackend,
+}
+
+
+## @brief Varsayılan arka uç adını döndürür.
+def default_backend_name():
+    return os.environ.get("MOODLENS_DETECTOR", "haar")
+
+
+## @brief Adına göre algılama arka ucu oluşturur.
+#  @param name "haar" ya da "dnn"; None ise MOODLENS_DETECTOR ortam değişkeni, o da yoksa "haar".
+#  @return prepare ve detect metotları olan nesne.
+def get_detector_backend(name=None):
+    name = name or default_backend_name()
+    if name not in _BACKENDS:
+        raise ValueError(f"Bilinmeyen yüz algılama arka ucu: {name}")
+    return _BACKENDS[name]()
+
+
+## @brief Aynı yüzü gösteren (çakışan ROI'lerden gelen) kutulardan yalnızca birini bırakır.
+def _deduplicate(boxes):
+    kept = []
+    for box in sorted(boxes, key=lambda b: -b[2] * b[3]):
+        if all(box_iou(box, other) < DUPLICATE_IOU for other in kept):
+            kept.append(box)
+    return kept
+
+
+## @brief Küçültülmüş karede algılama yapıp kutuları tam çözünürlüğe çeviren yüz dedektörü.
+#  @details Bir video akışı boyunca aynı nesne kullanılmalıdır; ROI taraması önceki çağrının
+#           sonuçlarına dayanır. Yeni bir akış için reset çağrılır.
+class FaceDetector:
+    ## @param backend Arka uç adı ya da arka uç nesnesi; None ise varsayılan.
+    #  @param max_width Algılamanın yapılacağı en büyük kare genişliği.
+    #  @param min_size Tam çözünürlükte en küçük yüz kenarı (piksel).
+    #  @param max_size Tam çözünürlükte en büyük yüz kenarı; None ise sınırsız.
+    #  @param full_scan_interval Kaç algılamada bir tüm karenin taranacağı; 1 ise ROI kullanılmaz.
+    #  @param roi_margin ROI'nin yüz kutusu çevresinde her yöne genişletilme oranı.
+    def __init__(self, backend=None, max_width=DETECT_MAX_WIDTH, min_size=MIN_FACE_SIZE, max_size=MAX_FACE_SIZE,
+                 full_scan_interval=FULL_SCAN_INTERVAL, roi_margin=ROI_MARGIN):
+        self.backend = backend if backend is not None and not isinstance(backend, str) \
+            else get_detector_backend(backend)
+        self.max_width = max_width
+        self.min_size = min_size
+        self.max_size = max_size
+        self.full_scan_interval = max(1, full_scan_interval)
+        self.roi_margin = roi_margin
+        self.reset()
+
+    ## @brief ROI durumunu sıfırlar; bir sonraki algılama tam tarama olur.
+    def reset(self):
+        self._previous = []
+        self._calls = 0
+
+    ## @brief Karedeki yüzleri bulur.
+    #  @param frame Tam çözünürlüklü BGR kare.
+    #  @param index Karenin analiz edilen kareler arasındaki video genelindeki sırası (0 tabanlı). Verilirse
+    #         tam taramalar bu sıraya göre yapılır; böylece videonun bir parçasını analiz eden dedektör de
+    #         tüm videoyu analiz edenle aynı karelerde tam tarama yapar. None ise çağrı sayısı kullanılır.
+    #  @return (N, 4) int dizisi; her satır tam çözünürlükte (x, y, w, h), soldan sağa (x, sonra y) sıralı.
+    def detect(self, frame, index=None):
+        height, width = frame.shape[:2]
+        scale = min(1.0, self.max_width / width) if self.max_width else 1.0
+        small = frame if scale == 1.0 else cv2.resize(frame, (int(width * scale), int(height * scale)),
+                                                      interpolation=cv2.INTER_AREA)
+        image = self.backend.prepare(small)
+        min_size = max(1, int(round(self.min_size * scale)))
+        max_size = int(self.max_size * scale) if self.max_size else None
+
+        if index is None:
+            index = self._calls
+        full_scan = not self._previous or index % self.full_scan_interval == 0
+        self._calls += 1
+        if full_scan:
+            boxes = [tuple(b) for b in self.backend.detect(image, min_size, max_size)]
+        else:
+            boxes = []
+            img_h, img_w = image.shape[:2]
+            for x, y, w, h in self._previous:
+                # Önceki kutu küçük kare koordinatlarına çevrilip kenar payıyla genişletilir
+                x, y, w, h = x * scale, y * scale, w * scale, h * scale
+                x1 = int(max(0, x - w * self.roi_margin))
+                y1 = int(max(0, y - h * self.roi_margin))
+                x2 = int(min(img_w, x + w * (1 + self.roi_margin)))
+                y2 = int(min(img_h, y + h * (1 + self.roi_margin)))
+                if x2 - x1 < min_size or y2 - y1 < min_size:
+                    continue
+                for bx, by, bw, bh in self.backend.detect(image[y1:y2, x1:x2], min_size, max_size):
+                    boxes.append((bx + x1, by + y1, bw, bh))
+            boxes = _deduplicate(boxes)
+
+        result = np.array([[int(round(v / scale)) for v in box] for box in boxes], dtype=int).reshape(-1, 4)
+        if len(result):
+            sizes = result[:, 2:].min(axis=1)
+            keep = sizes >= self.min_size
+            if self.max_size:
+                keep &= result[:, 2:].max(axis=1) <= self.max_size
+            result = result[keep]
+            # detectMultiScale adayları iş parçacıklarında gruplar; sıra çalıştırmadan çalıştırmaya değişebilir
+            result = result[np.lexsort(result.T[::-1])]
+        self._previous = [tuple(box) for box in result]
+        return result
+
+
+## @brief Varsayılan ayarlarla yeni bir dedektör oluşturur.
+#  @param backend Arka uç adı; None ise varsayılan.
+#  @param kwargs FaceDetector parametreleri.
+def create_detector(backend=None, **kwargs):
+    return FaceDetector(backend, **kwargs)
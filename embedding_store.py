@@ -0,0 +1,211 @@
+##
+# @file embedding_store.py
+# @brief Yüz görüntülerinin Facenet gömmelerini içerik özetine (hash) göre saklayan disk deposu.
+# @details Gömmeler tek bir float32 .npy dizisinde tutulur ve bellek eşlemeli (mmap) okunabilir;
+#          satırların hangi dosya içeriğine ait olduğu yanındaki JSON dizininde saklanır.
+#          Veri kümesi yeniden tarandığında yalnızca içeriği depoda olmayan dosyalar için
+#          DeepFace çalıştırılır, silinen dosyaların satırları atılır.
+#
+#          Veri artırma açıksa her görüntünün çeşitlemeleri diske yazılmadan, gömmeyi hesaplayan işçi
+#          süreçte üretilir (bkz. augmentation.py). Çeşitleme gömmeleri "<içerik özeti>:<artırıcı
+#          imzası>:<no>" anahtarıyla saklanır; aynı ayar ve tohumla yeniden hesaplanmaz.
+##
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from augmentation import MATERIALIZED_PREFIX, hash_key
+
+EMBEDDINGS_FILE = "embeddings.npy"
+INDEX_FILE = "index.json"
+EMBEDDING_DIM = 128
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+## @brief Dosya içeriğinin SHA-1 özetini döndürür.
+#  @param path Dosya yolu.
+#  @return Onaltılık (hex) özet.
+def file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+## @brief Veri kümesi klasöründeki görüntüleri kişi etiketleriyle listeler.
+#  @details Beklenen yapı model_egitim.ipynb ile aynıdır: dataset_path/<kişi>/<görüntü>.
+#  @param dataset_path Veri kümesi klasörü (ör. "dataset/train").
+#  @return (görüntü yolu, kişi adı) ikililerinin sıralı listesi.
+def scan_dataset(dataset_path):
+    items = []
+    for person in sorted(os.listdir(dataset_path)):
+        person_path = os.path.join(dataset_path, person)
+        if not os.path.isdir(person_path):
+            continue
+        for img_name in sorted(os.listdir(person_path)):
+            if img_name.lower().endswith(IMAGE_EXTENSIONS):
+                items.append((os.path.join(person_path, img_name), person))
+    return items
+
+
+## @brief Bir gömme görevinin DeepFace girdisini hazırlar.
+#  @param task Görüntü yolu ya da (yol, Augmenter, anahtar, çeşitleme no); ikincisinde çeşitleme
+#         bellekte üretilir ve BGR dizi olarak verilir (DeepFace yoldan okurken de BGR kullanır).
+def _task_input(task):
+    if isinstance(task, str):
+        return task
+    import cv2
+
+    img_path, augmenter, key, index = task
+    image = cv2.imread(img_path)
+    if image is None:
+        raise ValueError("görüntü okunamadı")
+    return augmenter.augment(image, key, index)
+
+
+## @brief Bir grup görüntünün Facenet gömmelerini hesaplar (işçi süreçte çalışır).
+#  @param tasks Görüntü yolları ya da çeşitleme görevleri (bkz. _task_input).
+#  @return Her görev için gömme listesi ya da hata durumunda None.
+def _embed_files(tasks):
+    from deepface import DeepFace
+
+    embeddings = []
+    for task in tasks:
+        try:
+            result = DeepFace.represent(img_path=_task_input(task), model_name="Facenet", enforce_detection=False)
+            embeddings.append(result[0]["embedding"])
+        except Exception as e:
+            print(f"HATA - {task if isinstance(task, str) else task[0]} alınamadı:", e)
+            embeddings.append(None)
+    return embeddings
+
+
+## @brief Görüntü yollarının (ve çeşitleme görevlerinin) gömmelerini süreç havuzunda paralel hesaplar.
+#  @param paths Görüntü yolları ya da çeşitleme görevleri.
+#  @param workers İşçi süreç sayısı; 1 ise aynı süreçte çalışır.
+#  @param chunk_size Bir işçiye tek seferde verilecek görüntü sayısı.
+#  @return Yollarla aynı sırada gömme listesi (hatalı olanlar None).
+def compute_embeddings(paths, workers=None, chunk_size=32):
+    if not paths:
+        return []
+    workers = workers or os.cpu_count() or 1
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    if workers == 1 or len(chunks) == 1:
+        results = [_embed_files(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            results = list(executor.map(_embed_files, chunks))
+    return [embedding for chunk in results for embedding in chunk]
+
+
+## @brief İçerik özetine göre anahtarlanmış, dizi tabanlı gömme deposu.
+class EmbeddingStore:
+    ## @param store_dir Deponun klasörü; yoksa ilk kayıtta oluşturulur.
+    #  @param mmap True ise gömmeler bellek eşlemeli (salt okunur) açılır.
+    def __init__(self, store_dir, mmap=True):
+        self.store_dir = store_dir
+        self.hashes = []
+        self.embeddings = np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+        self._rows = {}
+
+        index_path = os.path.join(store_dir, INDEX_FILE)
+        embeddings_path = os.path.join(store_dir, EMBEDDINGS_FILE)
+        if os.path.exists(index_path) and os.path.exists(embeddings_path):
+            with open(index_path, "r", encoding="utf-8") as f:
+                self.hashes = json.load(f)["hashes"]
+            self.embeddings = np.load(embeddings_path, mmap_mode="r" if mmap else None)
+            self._rows = {h: i for i, h in enumerate(self.hashes)}
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def __contains__(self, content_hash):
+        return content_hash in self._rows
+
+    ## @brief Verilen içerik özetlerinin gömmelerini tek bir dizi olarak döndürür.
+    #  @param content_hashes Depoda bulunan özetler.
+    #  @return (len(content_hashes), EMBEDDING_DIM) boyutlu float32 dizi.
+    def get(self, content_hashes):
+        rows = [self._rows[h] for h in content_hashes]
+        return np.asarray(self.embeddings[rows], dtype=np.float32)
+
+    ## @brief Depoyu güncel özet kümesine göre günceller ve diske yazar.
+    #  @param keep Depoda kalacak özetler; diğerleri silinir.
+    #  @param new_hashes Eklenecek yeni özetler.
+    #  @param new_embeddings Yeni özetlere karşılık gelen gömmeler.
+    def update(self, keep, new_hashes, new_embeddings):
+        kept = [h for h in self.hashes if h in keep]
+        parts = [self.get(kept)]
+        if new_hashes:
+            parts.append(np.asarray(new_embeddings, dtype=np.float32).reshape(-1, EMBEDDING_DIM))
+        embeddings = np.concatenate(parts, axis=0)
+        hashes = kept + list(new_hashes)
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        embeddings_path = os.path.join(self.store_dir, EMBEDDINGS_FILE)
+        index_path = os.path.join(self.store_dir, INDEX_FILE)
+        # Yarım kalan bir yazma depoyu bozmasın diye önce geçici dosyaya yazılır
+        with open(embeddings_path + ".tmp", "wb") as f:
+            np.save(f, embeddings)
+        with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"hashes": hashes}, f)
+        # Eski dosyanın bellek eşlemesi bırakılır (Windows'ta açık eşleme üzerine yazılamaz)
+        self.embeddings = embeddings
+        os.replace(embeddings_path + ".tmp", embeddings_path)
+        os.replace(index_path + ".tmp", index_path)
+
+        self.hashes = hashes
+        self.embeddings = np.load(embeddings_path, mmap_mode="r")
+        self._rows = {h: i for i, h in enumerate(hashes)}
+
+    ## @brief Veri kümesini depoyla eşitler; yalnızca değişen dosyaların gömmesini hesaplar.
+    #  @param dataset_path Veri kümesi klasörü.
+    #  @param workers Gömme hesaplayan işçi süreç sayısı.
+    #  @param variants Görüntü başına bellekte üretilecek çeşitleme sayısı; 0 ise veri artırma yapılmaz.
+    #         Veri artırma açıkken eski yöntemle diske yazılmış aug_*.jpg dosyaları yok sayılır.
+    #  @param augmenter augmentation.Augmenter; None ise varsayılan ayarlar ve 0 tohumu.
+    #  @return (embeddings, labels, stats): eğitim dizisi, etiketler ve eklenen/silinen sayıları.
+    def sync(self, dataset_path, workers=None, variants=0, augmenter=None):
+        items = scan_dataset(dataset_path)
+        if variants:
+            from augmentation import Augmenter
+
+            augmenter = augmenter or Augmenter()
+            signature = augmenter.signature()
+            items = [(path, label) for path, label in items
+                     if not os.path.basename(path).startswith(MATERIALIZED_PREFIX)]
+        hashed = []
+        for path, label in items:
+            content_hash = file_hash(path)
+            hashed.append((content_hash, path, label))
+            for i in range(1, variants + 1):
+                hashed.append((f"{content_hash}:{signature}:{i}",
+                               (path, augmenter, hash_key(content_hash), i), label))
+
+        missing = {}
+        for content_hash, task, _ in hashed:
+            if content_hash not in self and content_hash not in missing:
+                missing[content_hash] = task
+
+        new_hashes, new_embeddings = [], []
+        computed = compute_embeddings(list(missing.values()), workers=workers)
+        for content_hash, embedding in zip(missing, computed):
+            if embedding is not None:
+                new_hashes.append(content_hash)
+                new_embeddings.append(embedding)
+
+        current = {content_hash for content_hash, _, _ in hashed}
+        removed = sum(1 for h in self.hashes if h not in current)
+        if new_hashes or removed:
+            self.update(current, new_hashes, new_embeddings)
+
+        usable = [(content_hash, label) for content_hash, _, label in hashed if content_hash in self]
+        embeddings = self.get([content_hash for content_hash, _ in usable])
+        labels = [label for _, label in usable]
+        stats = {"eklenen": len(new_hashes), "silinen": removed, "hatalı": len(missing) - len(new_hashes)}
+        return embeddings, labels, stats
@@ -0,0 +1,259 @@
+##
+# @file emotion_runtime.py
+# @brief Duygu CNN'inin TensorFlow Lite'a aktarılması, hafif çalışma zamanında çalıştırılması ve
+#        Keras modeliyle doğruluk karşılaştırması (parity).
+# @details Keras modeli (ör. model_dropout.h5) isteğe bağlı float16 ya da int8 nicemlemeyle .tflite
+#          dosyasına aktarılır. TFLiteEmotionModel, Keras modelinin predict arayüzünü taklit eder;
+#          tflite_runtime kuruluysa TensorFlow hiç içe aktarılmaz, bu da başlangıç süresini ve bellek
+#          kullanımını düşürür. Analizlerde kullanmak için MOODLENS_EMOTION_BACKEND=tflite ya da
+#          fonksiyonlara emotion_backend="tflite" verilir (bkz. model_registry.get_emotion_model);
+#          kullanılacak dosya MOODLENS_EMOTION_TFLITE ile seçilir (varsayılan model_dropout.tflite).
+#
+#          Kullanım:
+#          python emotion_runtime.py export --model model_dropout.h5 --quantize int8
+#          python emotion_runtime.py parity --model model_dropout.h5 --tflite model_dropout.tflite
+##
+
+import argparse
+import json
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from inference import EMOTION_INPUT_SIZE, emotion_from_probability
+
+QUANTIZATIONS = (None, "float16", "int8")
+DEFAULT_VALIDATION_DIR = os.path.join("images", "validation")
+DEFAULT_REPRESENTATIVE_DIR = os.path.join("images", "train")
+REPRESENTATIVE_SAMPLES = 200
+## @brief flow_from_directory sınıf sırası; modelin çıktısı "sad" olasılığıdır.
+CLASS_NAMES = ("happy", "sad")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+DEFAULT_THREADS = int(os.environ.get("MOODLENS_TFLITE_THREADS", 0)) or None
+
+
+## @brief Keras modelinin yanına yazılacak .tflite dosyasının yolunu üretir.
+#  @param model_path Keras model yolu (ör. model_dropout.h5).
+#  @param quantization None, "float16" ya da "int8".
+def tflite_path_for(model_path, quantization=None):
+    base = os.path.splitext(model_path)[0]
+    return f"{base}_{quantization}.tflite" if quantization else f"{base}.tflite"
+
+
+## @brief Klasördeki görüntüleri analizdeki gibi (BGR, 48x48, 0-1 aralığı) hazırlar.
+#  @param data_dir Sınıf alt klasörleri (happy, sad) içeren klasör.
+#  @param limit En fazla kaç görüntü okunacağı; None ise hepsi.
+#  @return (girdiler (N, 48, 48, 3) float32, etiketler (N,) int; happy=0, sad=1).
+def load_images(data_dir, limit=None):
+    inputs, labels = [], []
+    for label, class_name in enumerate(CLASS_NAMES):
+        class_dir = os.path.join(data_dir, class_name)
+        if not os.path.isdir(class_dir):
+            continue
+        for name in sorted(os.listdir(class_dir)):
+            if not name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            image = cv2.imread(os.path.join(class_dir, name))
+            if image is None:
+                continue
+            inputs.append(cv2.resize(image, EMOTION_INPUT_SIZE) / 255.0)
+            labels.append(label)
+    inputs = np.asarray(inputs, dtype=np.float32).reshape(-1, *EMOTION_INPUT_SIZE, 3)
+    labels = np.asarray(labels, dtype=int)
+    if limit is not None and len(inputs) > limit:
+        # Her iki sınıftan da örnek kalması için eşit aralıklı seçilir
+        keep = np.linspace(0, len(inputs) - 1, limit).astype(int)
+        inputs, labels = inputs[keep], labels[keep]
+    return inputs, labels
+
+
+## @brief Keras duygu modelini TensorFlow Lite biçimine aktarır.
+#  @param model_path Keras model yolu.
+#  @param output_path .tflite çıktı yolu; None ise tflite_path_for ile üretilir.
+#  @param quantization None (float32), "float16" (ağırlıklar yarım duyarlıklı) ya da "int8"
+#         (ağırlık ve aktivasyonlar tam sayı; girdi ve çıktı float32 kalır).
+#  @param representative_dir int8 kalibrasyonu için kullanılacak görüntü klasörü.
+#  @return Yazılan dosyanın yolu.
+def export_tflite(model_path, output_path=None, quantization=None, representative_dir=DEFAULT_REPRESENTATIVE_DIR):
+    import tensorflow as tf
+    from keras.models import load_model
+
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Bilinmeyen nicemleme: {quantization}")
+    output_path = output_path or tflite_path_for(model_path, quantization)
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(load_model(model_path))
+    if quantization == "float16":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == "int8":
+        samples, _ = load_images(representative_dir, REPRESENTATIVE_SAMPLES)
+        if not len(samples):
+            raise FileNotFoundError(f"int8 kalibrasyonu için {representative_dir} içinde görüntü bulunamadı.")
+
+        def representative_dataset():
+            for sample in samples:
+                yield [sample[np.newaxis]]
+
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+
+    with open(output_path, "wb") as f:
+        f.write(converter.convert())
+    print(f"✅ {model_path} → {output_path} ({os.path.getsize(output_path) / 1024:.1f} KB)")
+    return output_path
+
+
+## @brief Kurulu olan en hafif TFLite yorumlayıcı sınıfını döndürür.
+#  @details Sırasıyla tflite_runtime, ai_edge_litert ve tensorflow denenir.
+def _interpreter_class():
+    try:
+        from tflite_runtime.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    import tensorflow as tf
+    return tf.lite.Interpreter
+
+
+## @brief .tflite duygu modelini Keras modeliyle aynı predict arayüzüyle çalıştırır.
+#  @details Yorumlayıcı iş parçacığı güvenli olmadığından çağrılar kilitlenir. Girdi tensörü toplu
+#           boyuta göre yeniden boyutlandırılır; boyut değişmedikçe allocate_tensors tekrarlanmaz.
+#           Nicemlenmiş girdi/çıktı tensörleri varsa ölçek ve sıfır noktasıyla dönüştürülür.
+class TFLiteEmotionModel:
+    ## @param path .tflite dosyasının yolu.
+    #  @param num_threads Yorumlayıcının kullanacağı iş parçacığı sayısı; None ise varsayılan.
+    def __init__(self, path, num_threads=DEFAULT_THREADS):
+        self.path = path
+        self._lock = threading.Lock()
+        self._interpreter = _interpreter_class()(model_path=path, num_threads=num_threads)
+        self._interpreter.allocate_tensors()
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self._batch = int(self._input["shape"][0])
+
+    ## @brief Keras Model.predict ile uyumlu tahmin.
+    #  @param x (N, 48, 48, 3) girdi (0-1 aralığında).
+    #  @param verbose Yalnızca uyumluluk için; yok sayılır.
+    #  @return (N, 1) float32 olasılık dizisi.
+    def predict(self, x, verbose=0, **kwargs):
+        x = np.asarray(x, dtype=np.float32)
+        with self._lock:
+            if len(x) != self._batch:
+                self._interpreter.resize_tensor_input(self._input["index"], [len(x), *x.shape[1:]])
+                self._interpreter.allocate_tensors()
+                self._input = self._interpreter.get_input_details()[0]
+                self._output = self._interpreter.get_output_details()[0]
+                self._batch = len(x)
+            self._interpreter.set_tensor(self._input["index"], self._quantize(x, self._input))
+            self._interpreter.invoke()
+            output = self._interpreter.get_tensor(self._output["index"])
+        return self._dequantize(output, self._output)
+
+    ## @brief Keras Model.predict_on_batch ile uyumlu tahmin; predict ile aynıdır.
+    #  @param x (N, 48, 48, 3) girdi (0-1 aralığında).
+    #  @return (N, 1) float32 olasılık dizisi.
+    def predict_on_batch(self, x):
+        return self.predict(x)
+
+    @staticmethod
+    def _quantize(x, details):
+        if details["dtype"] == np.float32:
+            return x
+        scale, zero_point = details["quantization"]
+        info = np.iinfo(details["dtype"])
+        return np.clip(np.round(x / scale + zero_point), info.min, info.max).astype(details["dtype"])
+
+    @staticmethod
+    def _dequantize(y, details):
+        if details["dtype"] == np.float32:
+            return y.copy()
+        scale, zero_point = details["quantization"]
+        return ((y.astype(np.float32) - zero_point) * scale).astype(np.float32)
+
+
+## @brief Modeli toplu olarak çalıştırır ve örnek başına süreyi ölçer.
+#  @return ("sad" olasılıkları (N,), örnek başına ortalama süre (ms)).
+def _predict_all(model, inputs, batch_size):
+    model.predict(inputs[:1], verbose=0)
+    outputs = []
+    start = time.perf_counter()
+    for i in range(0, len(inputs), batch_size):
+        outputs.append(np.asarray(model.predict(inputs[i:i + batch_size], verbose=0)).reshape(-1))
+    elapsed = time.perf_counter() - start
+    return np.concatenate(outputs) if outputs else np.zeros(0), elapsed / max(len(inputs), 1) * 1000
+
+
+## @brief TFLite modelinin Keras modeliyle doğrulama kümesindeki uyumunu ölçer.
+#  @param model_path Keras model yolu.
+#  @param tflite_path Karşılaştırılacak .tflite dosyası.
+#  @param data_dir Doğrulama görüntüleri (images/validation).
+#  @param batch_size Tahmin toplu boyutu.
+#  @return Örnek sayısı, iki modelin doğrulukları, etiket uyuşma oranı, olasılık farkları, örnek başına
+#          süreler ve dosya boyutlarını içeren sözlük.
+def parity_report(model_path, tflite_path, data_dir=DEFAULT_VALIDATION_DIR, batch_size=32):
+    from keras.models import load_model
+
+    inputs, labels = load_images(data_dir)
+    if not len(inputs):
+        raise FileNotFoundError(f"{data_dir} içinde görüntü bulunamadı.")
+
+    keras_probs, keras_ms = _predict_all(load_model(model_path), inputs, batch_size)
+    tflite_probs, tflite_ms = _predict_all(TFLiteEmotionModel(tflite_path), inputs, batch_size)
+
+    keras_labels = np.array([emotion_from_probability(p)[0] for p in keras_probs])
+    tflite_labels = np.array([emotion_from_probability(p)[0] for p in tflite_probs])
+    expected = np.where(labels == 1, "Sad", "Happy")
+    diff = np.abs(keras_probs - tflite_probs)
+    return {
+        "örnek": int(len(inputs)),
+        "keras_doğruluk": round(float(np.mean(keras_labels == expected)), 4),
+        "tflite_doğruluk": round(float(np.mean(tflite_labels == expected)), 4),
+        "etiket_uyuşması": round(float(np.mean(keras_labels == tflite_labels)), 4),
+        "olasılık_farkı_ortalama": round(float(diff.mean()), 5),
+        "olasılık_farkı_en_büyük": round(float(diff.max()), 5),
+        "keras_ms_örnek": round(keras_ms, 3),
+        "tflite_ms_örnek": round(tflite_ms, 3),
+        "keras_boyut_kb": round(os.path.getsize(model_path) / 1024, 1),
+        "tflite_boyut_kb": round(os.path.getsize(tflite_path) / 1024, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Duygu CNN'ini TFLite'a aktarır ve Keras ile karşılaştırır.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="Keras modelini .tflite dosyasına aktar")
+    export.add_argument("--model", default="model_dropout.h5")
+    export.add_argument("--output", default=None)
+    export.add_argument("--quantize", choices=["float16", "int8"], default=None)
+    export.add_argument("--representative-dir", default=DEFAULT_REPRESENTATIVE_DIR)
+    export.add_argument("--parity", action="store_true", help="Aktarımdan sonra doğruluk karşılaştırması yap")
+    export.add_argument("--data-dir", default=DEFAULT_VALIDATION_DIR)
+
+    parity = sub.add_parser("parity", help="Keras ve TFLite modellerini doğrulama kümesinde karşılaştır")
+    parity.add_argument("--model", default="model_dropout.h5")
+    parity.add_argument("--tflite", default=None)
+    parity.add_argument("--data-dir", default=DEFAULT_VALIDATION_DIR)
+
+    args = parser.parse_args(argv)
+    if args.command == "export":
+        tflite_path = export_tflite(args.model, args.output, args.quantize, args.representative_dir)
+        if not args.parity:
+            return
+    else:
+        tflite_path = args.tflite or tflite_path_for(args.model)
+    print(json.dumps(parity_report(args.model, tflite_path, args.data_dir), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
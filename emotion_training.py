@@ -0,0 +1,361 @@
+##
+# @file emotion_training.py
+# @brief Duygu CNN'inin betikle eğitimi: görüntülerin bir kez paketlenmesi, bellek eşlemeli veri
+#        kümesinden ön yüklemeli (prefetch) toplu okuma ve sürümlü model çıktıları.
+# @details Defterlerdeki (4.1-4.10) flow_from_directory her epokta tüm JPEG'leri yeniden çözüp
+#          boyutlandırır. Burada images/train ve images/validation bir kez, analizdeki ön işlemeyle
+#          (cv2.imread → BGR, 48x48) uint8 .npy dosyalarına paketlenir; eğitim bu dosyaları bellek
+#          eşlemeli (mmap) açar ve toplu girdileri arka plan iş parçacıklarında hazırlar. Kaynak
+#          klasör değişmedikçe (dosya adları, boyutları, mtime'ları) paket yeniden üretilmez.
+#          --augment ile eğitim görüntüleri her epokta farklı, tohumlu bir çeşitlemeyle verilir;
+#          çeşitlemeler ön yükleme iş parçacıklarında üretilir (bkz. augmentation.py).
+#
+#          Her eğitim models/emotion/<sürüm>/ altına model.h5 ve meta.json yazar. Analizler bir sürümü
+#          MOODLENS_EMOTION_MODEL=models/emotion/<sürüm>/model.h5 ile doğrudan kullanabilir; --promote
+#          ile model, varsayılan model_registry.EMOTION_MODEL_PATH yoluna kopyalanır.
+#
+#          Kullanım:
+#          python emotion_training.py pack
+#          python emotion_training.py train --epochs 50 --promote
+##
+
+import argparse
+import hashlib
+import json
+import os
+import queue
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from augmentation import Augmenter
+from emotion_runtime import CLASS_NAMES, IMAGE_EXTENSIONS
+from inference import EMOTION_INPUT_SIZE
+
+DEFAULT_TRAIN_DIR = os.path.join("images", "train")
+DEFAULT_VALIDATION_DIR = os.path.join("images", "validation")
+DEFAULT_PACK_DIR = os.path.join("packed", "emotion")
+DEFAULT_ARTIFACT_DIR = os.path.join("models", "emotion")
+IMAGES_FILE = "images.npy"
+LABELS_FILE = "labels.npy"
+META_FILE = "meta.json"
+MODEL_FILE = "model.h5"
+## @brief Paket biçimi değiştiğinde artırılır; eski paketler yeniden üretilir.
+PACK_VERSION = 1
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+DEFAULT_PREFETCH = 4
+
+
+## @brief Klasördeki görüntü dosyalarını sınıf sırasıyla listeler.
+#  @return [(yol, etiket)]; happy=0, sad=1.
+def list_images(data_dir):
+    items = []
+    for label, class_name in enumerate(CLASS_NAMES):
+        class_dir = os.path.join(data_dir, class_name)
+        if not os.path.isdir(class_dir):
+            continue
+        for name in sorted(os.listdir(class_dir)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                items.append((os.path.join(class_dir, name), label))
+    return items
+
+
+## @brief Kaynak dosya listesinin (ad, boyut, mtime) imzası; içerik okunmadan değişiklik anlaşılır.
+def _source_signature(items):
+    digest = hashlib.sha1()
+    for path, label in items:
+        stat = os.stat(path)
+        digest.update(f"{os.path.relpath(path)}|{label}|{stat.st_size}|{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _read_image(path):
+    image = cv2.imread(path)
+    if image is None:
+        return None
+    if image.shape[:2] != EMOTION_INPUT_SIZE[::-1]:
+        image = cv2.resize(image, EMOTION_INPUT_SIZE)
+    return image
+
+
+## @brief Bir görüntü klasörünü bellek eşlemeli uint8 dizisine paketler.
+#  @details Görüntüler iş parçacığı havuzunda çözülür (cv2.imread GIL'i bırakır) ve doğrudan
+#           open_memmap ile açılmış dosyaya yazılır; tüm veri kümesi belleğe alınmaz. Okunamayan
+#           görüntüler atlanır. Paket önce geçici adla yazılıp yerine taşınır.
+#  @param data_dir Sınıf alt klasörleri (happy, sad) içeren klasör.
+#  @param out_dir Paket klasörü (images.npy, labels.npy, meta.json).
+#  @param workers Çözme iş parçacığı sayısı.
+#  @param force True ise kaynak değişmemiş olsa da yeniden paketler.
+#  @return Paketin meta bilgisi.
+def pack_images(data_dir, out_dir, workers=DEFAULT_WORKERS, force=False):
+    items = list_images(data_dir)
+    if not items:
+        raise FileNotFoundError(f"{data_dir} içinde görüntü bulunamadı.")
+    signature = _source_signature(items)
+    meta_path = os.path.join(out_dir, META_FILE)
+    if not force and os.path.exists(meta_path):
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("kaynak_imzası") == signature and meta.get("paket_sürümü") == PACK_VERSION:
+            return meta
+
+    os.makedirs(out_dir, exist_ok=True)
+    # Yarım kalan bir paketleme eski meta bilgisiyle geçerli sayılmasın
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    tmp_images = os.path.join(out_dir, f".{IMAGES_FILE}.tmp")
+    width, height = EMOTION_INPUT_SIZE
+    images = np.lib.format.open_memmap(tmp_images, mode="w+", dtype=np.uint8, shape=(len(items), height, width, 3))
+    labels = np.empty(len(items), dtype=np.uint8)
+    count = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for (path, label), image in zip(items, executor.map(_read_image, [path for path, _ in items])):
+            if image is None:
+                print(f"HATA - {path} okunamadı")
+                continue
+            images[count] = image
+            labels[count] = label
+            count += 1
+    images.flush()
+    del images
+
+    if count != len(items):
+        # Atlanan görüntüler olduysa dosya gerçek boyuta kısaltılır
+        full = np.load(tmp_images, mmap_mode="r")
+        part_path = os.path.join(out_dir, ".images.part.npy")
+        np.save(part_path, full[:count])
+        del full
+        os.replace(part_path, tmp_images)
+    np.save(os.path.join(out_dir, LABELS_FILE), labels[:count])
+    os.replace(tmp_images, os.path.join(out_dir, IMAGES_FILE))
+
+    meta = {
+        "paket_sürümü": PACK_VERSION,
+        "kaynak": os.path.abspath(data_dir),
+        "kaynak_imzası": signature,
+        "örnek": count,
+        "sınıflar": list(CLASS_NAMES),
+        "sınıf_sayıları": {name: int(np.sum(labels[:count] == i)) for i, name in enumerate(CLASS_NAMES)},
+        "boyut": [height, width, 3],
+        "renk": "BGR",
+    }
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    print(f"📦 {data_dir} → {out_dir}: {count} görüntü, {time.perf_counter() - start:.1f} sn")
+    return meta
+
+
+## @brief Paketlenmiş, bellek eşlemeli veri kümesi.
+class PackedDataset:
+    ## @param pack_dir pack_images çıktısı olan klasör.
+    def __init__(self, pack_dir):
+        self.pack_dir = pack_dir
+        self.images = np.load(os.path.join(pack_dir, IMAGES_FILE), mmap_mode="r")
+        self.labels = np.load(os.path.join(pack_dir, LABELS_FILE))
+        with open(os.path.join(pack_dir, META_FILE), encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+    def __len__(self):
+        return len(self.labels)
+
+    ## @brief Verilen indekslerdeki ham (uint8) görüntüleri verilen sırayla döndürür.
+    def raw(self, indices):
+        # mmap'ten sıralı okuma daha hızlıdır; sıra sonra geri kurulur
+        indices = np.asarray(indices)
+        order = np.argsort(indices)
+        images = np.empty((len(indices), *self.images.shape[1:]), dtype=np.uint8)
+        images[order] = self.images[indices[order]]
+        return images
+
+    ## @brief Verilen indekslerdeki örnekleri modele girdi olarak hazırlar.
+    #  @param indices Sıralı ya da karışık indeks dizisi.
+    #  @param augmenter augmentation.Augmenter; verilirse her görüntüye epoka özgü çeşitleme uygulanır.
+    #  @param epoch Epok numarası.
+    #  @return (x (N, 48, 48, 3) float32 0-1 aralığında, y (N,) float32).
+    def batch(self, indices, augmenter=None, epoch=0):
+        images = self.raw(indices)
+        if augmenter is not None:
+            images = augmenter.apply(images, indices, epoch)
+        x = images.astype(np.float32)
+        x *= 1.0 / 255
+        return x, self.labels[indices].astype(np.float32)
+
+
+## @brief Bir epoktaki toplu indeksleri üretir.
+#  @param n Örnek sayısı.
+#  @param batch_size Toplu boyut.
+#  @param rng Karıştırma için np.random.Generator; None ise sıra korunur.
+def epoch_batches(n, batch_size, rng=None):
+    indices = rng.permutation(n) if rng is not None else np.arange(n)
+    return [indices[i:i + batch_size] for i in range(0, n, batch_size)]
+
+
+## @brief Toplu girdileri arka planda hazırlayıp sırasıyla veren yineleyici.
+#  @details En fazla prefetch kadar toplu girdi önceden hazırlanır (sınırlı bellek); hazırlama
+#           workers iş parçacığına dağıtılır. NumPy kopyalama ve ölçekleme GIL'i bıraktığından
+#           iş parçacıkları gerçekten paralel çalışır.
+#  @param dataset batch(indices) metodu olan veri kümesi.
+#  @param batch_size Toplu boyut.
+#  @param shuffle True ise her epokta karıştırılır.
+#  @param seed Karıştırma tohumu; aynı tohumla aynı sıra üretilir.
+#  @param repeat True ise sonsuz sayıda epok üretilir (Keras fit için).
+#  @param prefetch Önceden hazırlanacak en fazla toplu girdi sayısı.
+#  @param workers Hazırlama iş parçacığı sayısı.
+#  @param augmenter augmentation.Augmenter; verilirse görüntüler her epokta yeniden çeşitlenir.
+def batch_stream(dataset, batch_size=32, shuffle=True, seed=0, repeat=False, prefetch=DEFAULT_PREFETCH,
+                 workers=DEFAULT_WORKERS, augmenter=None):
+    rng = np.random.default_rng(seed) if shuffle else None
+    pending = queue.Queue()
+    epoch = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-prefetch") as executor:
+        while True:
+            for indices in epoch_batches(len(dataset), batch_size, rng):
+                pending.put(executor.submit(dataset.batch, indices, augmenter, epoch))
+                if pending.qsize() >= prefetch:
+                    yield pending.get().result()
+            epoch += 1
+            if not repeat:
+                break
+        while not pending.empty():
+            yield pending.get().result()
+
+
+## @brief Defterlerdeki (4.2) dropout'lu CNN mimarisini kurar.
+#  @param dropout Flatten sonrası dropout oranı; 0 ise dropout katmanı eklenmez.
+def build_model(dropout=0.5):
+    from keras.layers import Conv2D, Dense, Dropout, Flatten, Input, MaxPooling2D
+    from keras.models import Sequential
+
+    width, height = EMOTION_INPUT_SIZE
+    layers = [Input(shape=(height, width, 3))]
+    for filters in (32, 64, 128, 128):
+        layers += [Conv2D(filters, (3, 3), activation="relu"), MaxPooling2D(2, 2)]
+    layers.append(Flatten())
+    if dropout:
+        layers.append(Dropout(dropout))
+    layers += [Dense(512, activation="relu"), Dense(1, activation="sigmoid")]
+
+    model = Sequential(layers)
+    model.compile(loss="binary_crossentropy", optimizer="adam", metrics=["accuracy"])
+    return model
+
+
+## @brief Yeni bir model sürümü adı üretir (zaman damgası).
+def new_version():
+    return time.strftime("%Y%m%d-%H%M%S")
+
+
+## @brief Paketlenmiş veriyle modeli eğitir ve sürümlü çıktı klasörüne yazar.
+#  @param train_pack Eğitim paketi klasörü.
+#  @param validation_pack Doğrulama paketi klasörü.
+#  @param artifact_dir Sürüm klasörlerinin kökü.
+#  @param epochs Epok sayısı.
+#  @param batch_size Toplu boyut.
+#  @param dropout Dropout oranı.
+#  @param seed Karıştırma ve ağırlık başlatma tohumu.
+#  @param prefetch Önceden hazırlanacak toplu girdi sayısı.
+#  @param workers Hazırlama iş parçacığı sayısı.
+#  @param augment True ise eğitim görüntüleri her epokta bellekte çeşitlenir (4.3/4.4 defterlerindeki
+#         ImageDataGenerator artırmasının karşılığı).
+#  @return Sürüm klasörü yolu.
+def train(train_pack, validation_pack, artifact_dir=DEFAULT_ARTIFACT_DIR, epochs=50, batch_size=32, dropout=0.5,
+          seed=0, prefetch=DEFAULT_PREFETCH, workers=DEFAULT_WORKERS, augment=False):
+    import keras
+
+    keras.utils.set_random_seed(seed)
+    train_data = PackedDataset(train_pack)
+    validation_data = PackedDataset(validation_pack)
+    model = build_model(dropout)
+    augmenter = Augmenter(seed) if augment else None
+
+    start = time.perf_counter()
+    history = model.fit(
+        batch_stream(train_data, batch_size, shuffle=True, seed=seed, repeat=True, prefetch=prefetch,
+                     workers=workers, augmenter=augmenter),
+        steps_per_epoch=-(-len(train_data) // batch_size),
+        epochs=epochs,
+        validation_data=batch_stream(validation_data, batch_size, shuffle=False, repeat=True, prefetch=prefetch,
+                                     workers=workers),
+        validation_steps=-(-len(validation_data) // batch_size),
+    )
+    elapsed = time.perf_counter() - start
+
+    version = new_version()
+    version_dir = os.path.join(artifact_dir, version)
+    os.makedirs(version_dir)
+    model.save(os.path.join(version_dir, MODEL_FILE))
+    meta = {
+        "sürüm": version,
+        "eğitim_paketi": train_data.meta["kaynak_imzası"],
+        "doğrulama_paketi": validation_data.meta["kaynak_imzası"],
+        "örnek": {"eğitim": len(train_data), "doğrulama": len(validation_data)},
+        "parametreler": {"epochs": epochs, "batch_size": batch_size, "dropout": dropout, "seed": seed,
+                        "augment": augment},
+        "süre_sn": round(elapsed, 1),
+        "epok_süresi_sn": round(elapsed / max(epochs, 1), 2),
+        "geçmiş": {key: [round(float(v), 4) for v in values] for key, values in history.history.items()},
+    }
+    with open(os.path.join(version_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    print(f"✅ Model kaydedildi: {version_dir}")
+    return version_dir
+
+
+## @brief Bir model sürümünü analizlerin kullandığı yola kopyalar.
+#  @details Kopya önce geçici adla yazılıp os.replace ile taşınır; model kayıt defteri dosya
+#           değişikliğini görüp bir sonraki istekte yeni modeli yükler, sonuç önbelleği de model
+#           özeti değiştiği için eski sonuçları kullanmaz.
+#  @param version_dir train çıktısı olan sürüm klasörü.
+#  @param model_path Hedef yol; None ise model_registry.EMOTION_MODEL_PATH.
+def promote(version_dir, model_path=None):
+    from model_registry import EMOTION_MODEL_PATH
+
+    model_path = model_path or EMOTION_MODEL_PATH
+    tmp_path = f"{model_path}.tmp"
+    shutil.copyfile(os.path.join(version_dir, MODEL_FILE), tmp_path)
+    os.replace(tmp_path, model_path)
+    print(f"🚀 {version_dir} → {model_path}")
+    return model_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Duygu CNN'ini paketlenmiş veriyle eğitir.")
+    parser.add_argument("--train-dir", default=DEFAULT_TRAIN_DIR)
+    parser.add_argument("--validation-dir", default=DEFAULT_VALIDATION_DIR)
+    parser.add_argument("--pack-dir", default=DEFAULT_PACK_DIR)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    pack = sub.add_parser("pack", help="Görüntüleri bellek eşlemeli pakete dönüştür")
+    pack.add_argument("--force", action="store_true")
+
+    train_parser = sub.add_parser("train", help="Paketlenmiş veriyle eğit (gerekirse önce paketler)")
+    train_parser.add_argument("--epochs", type=int, default=50)
+    train_parser.add_argument("--batch-size", type=int, default=32)
+    train_parser.add_argument("--dropout", type=float, default=0.5)
+    train_parser.add_argument("--seed", type=int, default=0)
+    train_parser.add_argument("--prefetch", type=int, default=DEFAULT_PREFETCH)
+    train_parser.add_argument("--augment", action="store_true", help="Eğitim görüntülerini her epokta çeşitle")
+    train_parser.add_argument("--artifact-dir", default=DEFAULT_ARTIFACT_DIR)
+    train_parser.add_argument("--promote", action="store_true",
+                              help="Eğitilen modeli analizlerin kullandığı model dosyasına kopyala")
+
+    args = parser.parse_args(argv)
+    train_pack = os.path.join(args.pack_dir, "train")
+    validation_pack = os.path.join(args.pack_dir, "validation")
+    force = getattr(args, "force", False)
+    pack_images(args.train_dir, train_pack, args.workers, force)
+    pack_images(args.validation_dir, validation_pack, args.workers, force)
+    if args.command == "train":
+        version_dir = train(train_pack, validation_pack, args.artifact_dir, args.epochs, args.batch_size,
+                            args.dropout, args.seed, args.prefetch, args.workers, args.augment)
+        if args.promote:
+            promote(version_dir)
+
+
+if __name__ == "__main__":
+    main()
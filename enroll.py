@@ -0,0 +1,126 @@
+##
+# @file enroll.py
+# @brief Kişi kaydı (enrollment) için komut satırı aracı.
+# @details dataset/train klasörünü gömme deposuyla eşitler, yalnızca yeni ya da değişmiş
+#          görüntülerin gömmesini hesaplar, face_index.npz kimlik dizinini ve geriye dönük
+#          uyumluluk için face_knn_model.pkl dosyasını yeniden oluşturur.
+#
+#          Örnekler:
+#            python enroll.py                              # veri kümesini eşitle ve modeli kaydet
+#            python enroll.py add Ayse foto1.jpg foto2.jpg # yeni kişinin görüntülerini ekle
+#            python enroll.py --augment 5 --augment-seed 0 # görüntü başına 5 bellek içi çeşitleme
+#
+#          Bir kişiyi çıkarmak için dataset/train/<kişi> klasörünü silip aracı yeniden çalıştırmak yeterlidir.
+##
+
+import argparse
+import os
+import shutil
+import time
+
+from augmentation import Augmenter
+from embedding_store import EmbeddingStore
+from identity_index import DEFAULT_THRESHOLD, IdentityIndex
+from model_registry import IDENTITY_INDEX_PATH, KNN_MODEL_PATH
+
+DEFAULT_DATASET = os.path.join("dataset", "train")
+DEFAULT_STORE = os.path.join("dataset", "embeddings")
+DEFAULT_NEIGHBORS = 7
+
+
+## @brief KNN modelini eğitir ve diske kaydeder.
+#  @param embeddings (N, 128) gömme dizisi.
+#  @param labels Kişi etiketleri.
+#  @param model_path Modelin kaydedileceği yol.
+#  @param n_neighbors Komşu sayısı (model_egitim.ipynb ile aynı varsayılan).
+#  @return Eğitilen model.
+def fit_knn(embeddings, labels, model_path=KNN_MODEL_PATH, n_neighbors=DEFAULT_NEIGHBORS):
+    import joblib
+    from sklearn.neighbors import KNeighborsClassifier
+
+    model = KNeighborsClassifier(n_neighbors=min(n_neighbors, len(labels)))
+    model.fit(embeddings, labels)
+    # Analiz süreçleri yarım yazılmış bir pickle okumasın diye önce geçici dosyaya yazılır
+    joblib.dump(model, model_path + ".tmp")
+    os.replace(model_path + ".tmp", model_path)
+    return model
+
+
+## @brief Görüntüleri kişinin veri kümesi klasörüne kopyalar.
+#  @param dataset_path Veri kümesi klasörü.
+#  @param person Kişi adı.
+#  @param images Kopyalanacak görüntü yolları.
+def add_images(dataset_path, person, images):
+    person_path = os.path.join(dataset_path, person)
+    os.makedirs(person_path, exist_ok=True)
+    for img_path in images:
+        shutil.copy2(img_path, os.path.join(person_path, os.path.basename(img_path)))
+
+
+## @brief Kimlik dizinini oluşturur ve atomik olarak diske kaydeder.
+#  @param embeddings (N, 128) gömme dizisi.
+#  @param labels Kişi etiketleri.
+#  @param index_path Dizinin kaydedileceği .npz yolu.
+#  @param kwargs IdentityIndex parametreleri.
+#  @return Oluşturulan dizin.
+def build_index(embeddings, labels, index_path=IDENTITY_INDEX_PATH, **kwargs):
+    index = IdentityIndex(embeddings, labels, **kwargs)
+    tmp_path = index_path + ".tmp.npz"
+    index.save(tmp_path)
+    os.replace(tmp_path, index_path)
+    return index
+
+
+## @brief Veri kümesini depoyla eşitler, kimlik dizinini ve KNN modelini yeniden oluşturur.
+#  @param augment Görüntü başına bellekte üretilecek çeşitleme sayısı (data_augmention.ipynb'deki
+#         aug_*.jpg dosyalarının yerine); 0 ise veri artırma yapılmaz.
+#  @param augment_seed Çeşitlemelerin tohumu.
+#  @return Eşitleme istatistikleri.
+def enroll(dataset_path=DEFAULT_DATASET, store_dir=DEFAULT_STORE, model_path=KNN_MODEL_PATH,
+           n_neighbors=DEFAULT_NEIGHBORS, workers=None, index_path=IDENTITY_INDEX_PATH,
+           threshold=DEFAULT_THRESHOLD, dtype="float32", augment=0, augment_seed=0):
+    start = time.time()
+    store = EmbeddingStore(store_dir)
+    embeddings, labels, stats = store.sync(dataset_path, workers=workers, variants=augment,
+                                           augmenter=Augmenter(augment_seed) if augment else None)
+    if not labels:
+        raise ValueError(f"{dataset_path} içinde gömmesi çıkarılabilen görüntü bulunamadı.")
+
+    fit_knn(embeddings, labels, model_path, n_neighbors)
+    build_index(embeddings, labels, index_path, k=n_neighbors, threshold=threshold, dtype=dtype)
+    stats["toplam"] = len(labels)
+    stats["kişiler"] = sorted(set(labels))
+    stats["süre (sn)"] = round(time.time() - start, 2)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MoodLens kişi kaydı ve KNN modeli güncelleme aracı")
+    parser.add_argument("command", nargs="?", default="sync", choices=["sync", "add"],
+                        help="sync: veri kümesini eşitle, add: kişiye görüntü ekle ve eşitle")
+    parser.add_argument("person", nargs="?", help="add komutu için kişi adı")
+    parser.add_argument("images", nargs="*", help="add komutu için görüntü dosyaları")
+    parser.add_argument("--dataset", default=DEFAULT_DATASET, help="Veri kümesi klasörü")
+    parser.add_argument("--store", default=DEFAULT_STORE, help="Gömme deposu klasörü")
+    parser.add_argument("--model", default=KNN_MODEL_PATH, help="Kaydedilecek KNN modeli")
+    parser.add_argument("--index", default=IDENTITY_INDEX_PATH, help="Kaydedilecek kimlik dizini")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Bilinmiyor eşiği (kosinüs uzaklığı)")
+    parser.add_argument("--float16", action="store_true", help="Dizindeki gömmeleri float16 sakla")
+    parser.add_argument("--neighbors", type=int, default=DEFAULT_NEIGHBORS, help="KNN komşu sayısı")
+    parser.add_argument("--workers", type=int, default=None, help="Paralel işçi süreç sayısı")
+    parser.add_argument("--augment", type=int, default=0, help="Görüntü başına bellek içi çeşitleme sayısı")
+    parser.add_argument("--augment-seed", type=int, default=0, help="Çeşitleme tohumu")
+    args = parser.parse_args(argv)
+
+    if args.command == "add":
+        if not args.person or not args.images:
+            parser.error("add komutu bir kişi adı ve en az bir görüntü ister")
+        add_images(args.dataset, args.person, args.images)
+
+    stats = enroll(args.dataset, args.store, args.model, args.neighbors, args.workers, args.index,
+                   args.threshold, "float16" if args.float16 else "float32", args.augment, args.augment_seed)
+    print(f"✅ Kayıt tamamlandı: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+##
+# @file event_log.py
+# @brief Arka planda toplu yazan, yapılandırılmış (JSONL ya da metin) olay günlüğü.
+# @details Analiz döngüsü yalnızca olayı bir kuyruğa ekler; biçimlendirme, dosyaya yazma ve
+#          isteğe bağlı ekrana basma ayrı bir yazıcı iş parçacığında, toplu (batch) olarak yapılır.
+#          Dosya analiz boyunca bir kez açılır ve close çağrısında kalan olaylar boşaltılır.
+#
+#          Biçimler:
+#          - "text": loglar.txt'nin eski biçimi ("Kare #5 | Kişi: Aysu | Duygu: Happy (99.7%)").
+#          - "jsonl": her satırda bir JSON nesnesi; panolar (dashboard) tarafından doğrudan okunabilir.
+##
+
+import json
+import queue
+import threading
+import time
+
+from inference import format_emotion
+
+LOG_FORMATS = ("text", "jsonl")
+BATCH_SIZE = 256
+FLUSH_INTERVAL = 0.5
+
+_CLOSE = object()
+
+
+## @brief Bir yüz olayını eski metin günlüğü satırına çevirir.
+def format_face_line(event):
+    return f"Kare #{event['kare']} | Kişi: {event['kişi']} | Duygu: {event['duygu_metni']}"
+
+
+## @brief Olayları arka planda dosyaya yazan günlük.
+class EventLog:
+    ## @param path Günlük dosyası; None ise dosyaya yazılmaz.
+    #  @param fmt "text" ya da "jsonl".
+    #  @param verbose 0: ekrana basma, 1: yüz satırlarını ekrana da bas (eski davranış).
+    #  @param batch_size Tek yazma işleminde en fazla olay sayısı.
+    #  @param flush_interval Olay gelmese bile dosyanın boşaltılacağı süre (saniye).
+    def __init__(self, path, fmt="text", verbose=1, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        if fmt not in LOG_FORMATS:
+            raise ValueError(f"Bilinmeyen günlük biçimi: {fmt}")
+        self.path = path
+        self.fmt = fmt
+        self.verbose = verbose
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.SimpleQueue()
+        self._file = open(path, "w", encoding="utf-8") if path else None
+        if self._file and fmt == "text":
+            self._file.write("Analiz Başladı\n\n")
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+        self._thread.start()
+
+    ## @brief Bir olayı kuyruğa ekler; çağıran iş parçacığını bekletmez.
+    #  @param kind Olay türü (ör. "yüz").
+    #  @param fields Olay alanları.
+    def emit(self, kind, **fields):
+        self._queue.put({"olay": kind, "zaman": time.time(), **fields})
+
+    ## @brief Analiz edilen bir yüzü günlüğe ekler.
+    #  @details emotion_text verilmezse metin analiz döngüsünde değil, yazıcı iş parçacığında üretilir.
+    def face(self, kare_no, name, emotion_label, emotion_score, emotion_text=None):
+        self.emit("yüz", kare=kare_no, kişi=str(name), duygu=emotion_label,
+                  güven=None if emotion_score is None else round(float(emotion_score), 2),
+                  duygu_metni=emotion_text, _skor=emotion_score)
+
+    def _format(self, event):
+        if self.fmt == "jsonl":
+            return json.dumps(event, ensure_ascii=False)
+        if event["olay"] == "yüz":
+            return format_face_line(event)
+        fields = ", ".join(f"{k}={v}" for k, v in event.items() if k not in ("olay", "zaman"))
+        return f"[{event['olay']}] {fields}"
+
+    def _write_batch(self, batch):
+        for event in batch:
+            if event["olay"] == "yüz":
+                score = event.pop("_skor")
+                if event["duygu_metni"] is None:
+                    event["duygu_metni"] = format_emotion(event["duygu"], score)
+        lines = [self._format(event) for event in batch]
+        if self.verbose:
+            for event in batch:
+                if event["olay"] == "yüz":
+                    print(format_face_line(event))
+        if self._file:
+            self._file.write("\n".join(lines) + "\n")
+            self._file.flush()
+
+    def _run(self):
+        closing = False
+        while not closing:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = []
+            while True:
+                if item is _CLOSE:
+                    closing = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch and self._error is None:
+                try:
+                    self._write_batch(batch)
+                except Exception as e:
+                    self._error = e
+
+    ## @brief Kuyruktaki tüm olayları yazar ve dosyayı kapatır.
+    #  @throws Exception Yazıcı iş parçacığında oluşan hata.
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(_CLOSE)
+            self._thread.join()
+        if self._file:
+            self._file.close()
+            self._file = None
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,16 +1,45 @@
-import yt_dlp
+import os
+import tempfile
 import cv2
-import numpy as np
-import joblib
-from deepface import DeepFace
-from keras.models import load_model
 import time
+import profiling
+from detection import DETECT_MAX_WIDTH, create_detector, default_backend_name
+from inference import UNKNOWN_NAME, analyze_faces, format_emotion
+from keyframes import DEFAULT_MAX_RATE, DEFAULT_MIN_RATE, SAMPLING_MODES, AdaptiveSampler, sample_seconds
+from event_log import EventLog
+from live import (DEFAULT_TARGET_LATENCY, CaptureThread, InferenceWorker, LatestFrame, latency_percentiles,
+                  open_source)
+from pipeline import DEFAULT_QUEUE_SIZE, FrameReader, FrameWriter
+from result_cache import cache_key, restore_file
+from results_store import NO_TRACK, FaceResults
+from tracking import FaceTracker
+from model_registry import default_emotion_backend, get_knn_model, get_emotion_model
+
+## @brief analyze_video'nun kaç karede bir analiz yaptığı.
+SKIP_FRAMES = 5
+## @brief Kare bazlı sonuçların önbellekteki dosya adı.
+RESULTS_FILE = "sonuçlar.npz"
+## @brief İlerleme bildiriminin kaç karede bir yapılacağı.
+PROGRESS_EVERY = 25
+## @brief analyze_video çıktı modları: tüm video, yalnızca analiz edilen kareler, çıktı yok.
+RENDER_MODES = ("full", "keyframes", "none")
 
 ## @brief Verilen YouTube URL'sinden video indirir.
 #  @param youtube_url YouTube video URL'si.
 #  @param output_path İndirilen videonun kaydedileceği dosya yolu (varsayılan "aysu_video.mp4").
+#  @param cache result_cache.ResultCache; verilirse aynı URL bir daha indirilmez.
 #  @return İndirilen video dosyasının yolu.
-def download_video(youtube_url, output_path="aysu_video.mp4"):
+def download_video(youtube_url, output_path="aysu_video.mp4", cache=None):
+    if cache is not None:
+        key = cache_key("download_video", {"url": youtube_url}, include_models=False)
+        hit = cache.get(key)
+        if hit is not None:
+            restore_file(hit[1], "video.mp4", output_path)
+            print("Video önbellekten alındı!")
+            return output_path
+
+    import yt_dlp
+
     ydl_opts = {
         'outtmpl': output_path,
         'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/mp4',
@@ -22,104 +51,315 @@ def download_video(youtube_url, output_path="aysu_video.mp4"):
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
         ydl.download([youtube_url])
     print("Video indirildi!")
+    if cache is not None:
+        cache.put(key, {"url": youtube_url}, {"video.mp4": output_path})
     return output_path
 
 
+## @brief Bir kare akışındaki yüzleri analiz eder, kareleri işaretleyip sırayla yazar.
+#  @details analyze_video'nun çekirdeğidir; paralel (parçalı) analiz de aynı fonksiyonu kullanır.
+#           Analiz edilen karelerdeki yüzler biriktirilir ve batch_size yüze ulaşıldığında
+#           Facenet, KNN ve duygu CNN'i tek seferde çalıştırılır; kareler sırası bozulmadan yazılır.
+#  @param frames Kare yineleyicisi.
+#  @param write_frame İşaretlenmiş kareyi alan fonksiyon; None ise kareler üzerine çizilmez ve yazılmaz.
+#         Akıştaki None kareler (çözülmeden atlanmış) yazılmaz.
+#  @param on_face Her yüz için (kare_no, name, emotion_label, emotion_score, box, track_id) ile çağrılan
+#         fonksiyon; izleme kapalıysa track_id results_store.NO_TRACK olur.
+#  @param first_frame İlk karenin (1 tabanlı) video içindeki numarası; skip_frames hizalaması buna göre yapılır.
+#  @param skip_frames Kaç karede bir analiz yapılacağı.
+#  @param batch_size Tek model çağrısında işlenecek en fazla yüz sayısı.
+#  @param track_faces True ise yüzler kareler arasında izlenir ve kimlik iz başına önbelleğe alınır.
+#  @param emotion_backend Duygu modeli arka ucu ("keras" ya da "tflite"); None ise varsayılan.
+#  @param sampler keyframes.AdaptiveSampler; verilirse skip_frames yerine analiz edilecek kareleri o seçer
+#         ve bir sahne kesmesinden sonra algılayıcının ROI'leri ile izler sıfırlanır.
+#  @param max_pending_frames Toplu çıkarım beklenirken yazılmak üzere tutulacak en fazla kare sayısı; bu
+#         sayıya ulaşılınca yüz sayısı batch_size'a varmasa da model çalıştırılır. Okuma ve yazma
+#         kuyruklarıyla aynı queue_size değeri verilir; write_frame None ise kare tutulmaz.
+#  @return Okunan kare sayısı.
+def _analyze_frames(frames, write_frame, on_face, first_frame=1, skip_frames=SKIP_FRAMES, batch_size=32,
+                    track_faces=True, emotion_backend=None, sampler=None, max_pending_frames=DEFAULT_QUEUE_SIZE):
+    # Uyarlanabilir örnekler arasında saniyeler geçebilir; önceki kutuların ROI'leri yüzü kaçırır
+    detector = create_detector(full_scan_interval=1) if sampler is not None else create_detector()
+    knn_model = get_knn_model()
+    emotion_model = get_emotion_model(emotion_backend)
+    tracker = FaceTracker() if track_faces else None
+    profiler = profiling.current()
+
+    # Henüz yazılmamış kareler: (kare no, kare, yüz kutuları ya da None, yüz kırpıntıları, izler).
+    # Kareler yalnızca yazılacaksa tutulur; write_frame None ise kare yerine None saklanır
+    pending = []
+    pending_faces = 0
+
+    def flush_pending():
+        crops = [crop for _, _, _, frame_crops, _ in pending for crop in frame_crops]
+        matches = [match for _, _, _, _, frame_matches in pending for match in frame_matches]
+        identify_mask = [needs for _, needs in matches] if tracker else None
+        annotations = iter(analyze_faces(crops, knn_model, emotion_model, identify_mask))
+        matches = iter(matches)
+
+        for kare_no, frame, faces, _, _ in pending:
+            for (x, y, w, h) in faces if faces is not None else ():
+                name, emotion_label, emotion_score = next(annotations)
+                track_id = NO_TRACK
+                if tracker:
+                    track, needs = next(matches)
+                    if needs:
+                        track.add_identity(name)
+                    name = track.name if track.name is not None else UNKNOWN_NAME
+                    track_id = track.track_id
+
+                if write_frame is not None:
+                    with profiler.stage("çizim"):
+                        cv2.rectangle(frame, (x, y), (x + w, y + h), (100, 255, 100), 2)
+                        cv2.putText(frame, f"{name}", (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+                        cv2.putText(frame, format_emotion(emotion_label, emotion_score), (x, y + h + 25),
+                                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 200, 0), 2)
+
+                on_face(kare_no, name, emotion_label, emotion_score, (x, y, w, h), track_id)
+
+            if write_frame is not None:
+                write_frame(frame)
+        pending.clear()
+
+    frame_count = first_frame - 1
+    for frame in frames:
+        frame_count += 1
+
+        # Sadece belirli karelerde işlem yap, diğerlerini sırası gelince yaz
+        if sampler is not None:
+            with profiler.stage("örnekleme"):
+                analyze = frame is not None and sampler.should_analyze(frame_count, frame)
+        else:
+            analyze = frame_count % skip_frames == 0
+        if not analyze:
+            if write_frame is None or frame is None:
+                continue
+            if pending:
+                # Önceki analiz edilen kare yazılmadan bu kare yazılamaz
+                pending.append((frame_count, frame, None, [], []))
+                if len(pending) >= max_pending_frames:
+                    flush_pending()
+                    pending_faces = 0
+            else:
+                write_frame(frame)
+            continue
+
+        if sampler is not None and sampler.cut:
+            # Önceki sahnenin yüz bölgeleri ve izleri yeni sahnede geçersizdir
+            detector.reset()
+            if tracker:
+                tracker.clear()
+        with profiler.stage("algılama"):
+            faces = detector.detect(frame, None if sampler is not None else frame_count // skip_frames - 1)
+
+        # Kırpıntılar kopyalanır: etiketler komşu yüzlere taşmaz, yazılmayacak kare de bellekte kalmaz
+        crops = [frame[y:y + h, x:x + w].copy() for (x, y, w, h) in faces]
+        frame_matches = tracker.update(faces, frame_count) if tracker else []
+        if write_frame is None:
+            if not crops:
+                continue
+            frame = None
+        pending.append((frame_count, frame, faces, crops, frame_matches))
+        pending_faces += len(crops)
+
+        if pending_faces >= batch_size or (write_frame is not None and len(pending) >= max_pending_frames):
+            flush_pending()
+            pending_faces = 0
+
+    flush_pending()
+    return frame_count - first_frame + 1
+
+
+## @brief Kareleri olduğu gibi verirken her PROGRESS_EVERY karede ilerlemeyi bildirir.
+#  @param frames Kare akışı.
+#  @param total_frames Toplam (tahmini) kare sayısı.
+#  @param on_progress on_progress(okunan kare, toplam kare) ile çağrılan fonksiyon; yükselttiği
+#         hata (ör. iptal) analizi durdurur.
+def _iter_with_progress(frames, total_frames, on_progress):
+    for i, frame in enumerate(frames, 1):
+        yield frame
+        if i % PROGRESS_EVERY == 0:
+            on_progress(i, total_frames)
+
+
+## @brief Bir yüz sonucunu özet sözlüklerine ve sütunsal sonuç deposuna ekler.
+#  @param süreler (kişiler_süre, duygular_süre) sözlükleri.
+#  @param results results_store.FaceResults.
+#  @param saniye Analiz edilen bir karenin temsil ettiği süre.
+def _record_face(süreler, results, saniye, kare_no, name, emotion_label, emotion_score, box, track_id):
+    kişiler_süre, duygular_süre = süreler
+    kişiler_süre[name] = kişiler_süre.get(name, 0) + saniye
+    if emotion_label:
+        duygular_süre[emotion_label] = duygular_süre.get(emotion_label, 0) + saniye
+
+    results.append(kare_no, name, emotion_label, emotion_score, box, track_id)
+
+
 ## @brief Video içerisindeki yüzleri tanır ve duygu analizi yapar.
 #  @details Hem konuşan kişileri tanır hem de yüz ifadelerinden duyguları sınıflandırır.
+#           Kare çözme, çıkarım ve video kodlama sınırlı kuyruklarla bağlı ayrı iş parçacıklarında çalışır.
+#           Yüz izleme açıkken kimlik yalnızca iz başladığında ve yeniden doğrulama aralığında hesaplanır.
 #  @param video_path Analiz edilecek video dosyasının yolu.
 #  @param output_video_path Üzerine çizim yapılmış çıktının kaydedileceği video dosyası.
-#  @param log_path İşlem detaylarının kaydedileceği metin dosyası.
+#  @param log_path İşlem detaylarının kaydedileceği günlük dosyası.
+#  @param batch_size Tek model çağrısında işlenecek en fazla yüz sayısı.
+#  @param queue_size Çözme ve kodlama aşamaları arasında ve toplu çıkarım beklenirken tutulacak en fazla
+#         kare sayısı. "full" modda büyük değerler daha büyük model yığınlarına izin verir.
+#  @param track_faces True ise yüzler kareler arasında izlenir ve kimlik iz başına önbelleğe alınır.
+#  @param log_format Günlük biçimi: "text" (eski loglar.txt biçimi) ya da "jsonl".
+#  @param verbose 0 ise yüz satırları ekrana basılmaz.
+#  @param profile True ise aşama süreleri ölçülür ve özete "Aşama Süreleri" olarak eklenir; ölçüm
+#         her seferinde gerçek analiz gerektirdiğinden bu durumda önbellek kullanılmaz.
+#  @param cache result_cache.ResultCache; verilirse aynı içerik, model ve parametrelerle yapılmış
+#         analizin özeti, işaretlenmiş videosu ve günlüğü önbellekten döndürülür.
+#  @param on_progress on_progress(okunan kare, toplam kare) ile düzenli aralıklarla çağrılır;
+#         bu fonksiyonun yükselttiği hata analizi durdurur (iş iptali için).
+#  @param emotion_backend Duygu modeli arka ucu: "keras" ya da "tflite" (emotion_runtime ile aktarılmış
+#         model); None ise MOODLENS_EMOTION_BACKEND, o da yoksa "keras".
+#  @param render_mode Çıktı videosu:
+#         - "full": tüm kareler işaretlenip output_video_path'e yazılır (varsayılan).
+#         - "keyframes": yalnızca analiz edilen işaretli kareler, süre korunacak şekilde
+#           fps / SKIP_FRAMES hızında kısa bir video olarak yazılır.
+#         - "none": video yazılmaz, yalnızca özet ve günlük üretilir.
+#         "keyframes" ve "none" modlarında analiz edilmeyen kareler çözülmeden atlanır.
+#  @param results_path Verilirse kare bazlı sonuçlar bu sütunsal dosyaya (.npz ya da .parquet) yazılır.
+#  @param sampling Analiz edilecek karelerin seçimi:
+#         - "fixed": her SKIP_FRAMES karede bir (varsayılan).
+#         - "adaptive": sahne değişimi ve harekete göre (bkz. keyframes.AdaptiveSampler); neredeyse aynı
+#           kareler atlanır, kesmeden hemen sonra analiz yapılır. Süreler her örneğin temsil ettiği
+#           gerçek aralıkla ağırlıklandırılır. Sinyal için her kare çözülür; "keyframes" çıktısı
+#           analysis_rate hızında yazılır ve süreyi korumaz.
+#  @param analysis_rate "adaptive" modda saniyede analiz edilecek en fazla kare sayısı.
+#  @param workers 1'den büyükse video kare aralıklarına bölünüp bu kadar süreçte paralel analiz edilir
+#         (bkz. parallel_video.analyze_video_parallel); sonuç seri analizle birebir aynıdır. İzler parça
+#         sınırında yeniden başlayacağından yalnızca track_faces=False, "fixed" örnekleme ve profile kapalıyken
+#         kullanılabilir. on_progress her parça bittiğinde çağrılır.
 #  @return Toplam kare sayısı, kişi başına süreler, duygu bazında süreler ve kare bazlı analiz sonuçlarını içeren sözlük.
-def analyze_video(video_path, output_video_path="analyzed_output.mp4", log_path="loglar.txt"):
-    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-    knn_model = joblib.load("face_knn_model.pkl")
-    emotion_model = load_model("model_dropout.h5")
+#          "Detaylı Sonuçlar" bir results_store.FaceResults deposudur; eski liste gibi yinelenebilir.
+def analyze_video(video_path, output_video_path="analyzed_output.mp4", log_path="loglar.txt", batch_size=32,
+                  queue_size=DEFAULT_QUEUE_SIZE, track_faces=True, log_format="text", verbose=1, profile=False,
+                  cache=None, on_progress=None, emotion_backend=None, render_mode="full", results_path=None,
+                  sampling="fixed", analysis_rate=DEFAULT_MAX_RATE, workers=1):
+    if render_mode not in RENDER_MODES:
+        raise ValueError(f"Bilinmeyen çıktı modu: {render_mode}")
+    if sampling not in SAMPLING_MODES:
+        raise ValueError(f"Bilinmeyen örnekleme modu: {sampling}")
+    if workers > 1 and (track_faces or sampling != "fixed" or profile):
+        raise ValueError("Paralel analiz yalnızca yüz izleme kapalıyken, sabit örneklemeyle ve profil ölçümü "
+                         "olmadan yapılabilir")
+    emotion_backend = emotion_backend or default_emotion_backend()
+    if profile:
+        cache = None
+    if cache is not None:
+        key = cache_key("analyze_video", {"skip_frames": SKIP_FRAMES, "track_faces": track_faces,
+                                          "log_format": log_format, "detector": default_backend_name(),
+                                          "emotion": emotion_backend, "render_mode": render_mode,
+                                          "sampling": sampling,
+                                          "analysis_rate": analysis_rate if sampling == "adaptive" else None},
+                        video_path)
+        hit = cache.get(key)
+        if hit is not None:
+            özet, files = hit
+            restore_file(files, "video.mp4", output_video_path)
+            restore_file(files, "log", log_path)
+            özet["Detaylı Sonuçlar"] = FaceResults.load(files[RESULTS_FILE])
+            if results_path:
+                özet["Detaylı Sonuçlar"].save(results_path)
+            print(f"⚡ Sonuç önbellekten alındı. Log dosyası: {log_path}")
+            return özet
+
+    if workers > 1:
+        from parallel_video import analyze_video_parallel
+
+        özet = analyze_video_parallel(video_path, output_video_path, log_path, workers, batch_size=batch_size,
+                                      track_faces=track_faces, log_format=log_format, verbose=verbose,
+                                      emotion_backend=emotion_backend, render_mode=render_mode,
+                                      on_progress=on_progress)
+    else:
+        with profiling.enabled(profile) as profiler:
+            özet = _analyze_video(video_path, output_video_path, log_path, batch_size, queue_size, track_faces,
+                                  log_format, verbose, on_progress, emotion_backend, render_mode, sampling,
+                                  analysis_rate)
+    if profile:
+        özet["Aşama Süreleri"] = profiler.report()
+    if results_path:
+        özet["Detaylı Sonuçlar"].save(results_path)
+    if cache is not None:
+        # Kare bazlı sonuçlar JSON yerine sütunsal dosya olarak saklanır
+        fd, tmp_results = tempfile.mkstemp(suffix=".npz")
+        os.close(fd)
+        try:
+            özet["Detaylı Sonuçlar"].save(tmp_results)
+            cache.put(key, {k: v for k, v in özet.items() if k != "Detaylı Sonuçlar"},
+                      {"video.mp4": output_video_path if render_mode != "none" else None, "log": log_path,
+                       RESULTS_FILE: tmp_results})
+        finally:
+            os.remove(tmp_results)
+    return özet
+
 
+def _analyze_video(video_path, output_video_path, log_path, batch_size, queue_size, track_faces, log_format,
+                   verbose, on_progress, emotion_backend, render_mode, sampling, analysis_rate):
     cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"Video açılamadı: {video_path}")
     width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
     height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
     fps = cap.get(cv2.CAP_PROP_FPS)
-
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-    out = cv2.VideoWriter(output_video_path, fourcc, fps, (width, height))
-
-    frame_count = 0
-    skip_frames = 5  # Her 5 karede bir analiz yapacak
-    results = []
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    skip_frames = SKIP_FRAMES  # Her 5 karede bir analiz yapacak
+    sampler = AdaptiveSampler(fps, analysis_rate, min(analysis_rate, DEFAULT_MIN_RATE)) \
+        if sampling == "adaptive" else None
+    out = writer = None
+    if render_mode != "none":
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        if render_mode == "full":
+            out_fps = fps
+        else:
+            out_fps = fps / skip_frames if sampler is None else analysis_rate
+        out = cv2.VideoWriter(output_video_path, fourcc, out_fps, (width, height))
+        writer = FrameWriter(out, queue_size)
+    # Analiz edilmeyen karelere yalnızca tam çıktıda ihtiyaç vardır; uyarlanabilir örnekleyici
+    # karar vermek için her kareye bakar
+    keep = None if render_mode == "full" or sampler is not None else \
+        (lambda frame_no: frame_no % skip_frames == 0)
+    reader = FrameReader(cap, queue_size, keep)
+
+    saniye = skip_frames / fps
+    results = FaceResults(fps, saniye if sampler is None else None)
     kişiler_süre = {}
     duygular_süre = {}
 
-    with open(log_path, "w", encoding="utf-8") as f:
-        f.write("Analiz Başladı\n\n")
-
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            print("🎬 Video bitti.")
-            break
-
-        frame_count += 1
-
-        # Sadece belirli karelerde işlem yap, diğerlerini direk yaz
-        if frame_count % skip_frames != 0:
-            out.write(frame)
-            continue
-
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5)
-
-        for (x, y, w, h) in faces:
-            face_img = frame[y:y + h, x:x + w]
-            name = "Bilinmiyor"
-            emotion_text = "Tespit edilemedi"
-            emotion_label = None
-
-            # Yüz tanıma
-            try:
-                rgb_face = cv2.cvtColor(face_img, cv2.COLOR_BGR2RGB)
-                result = DeepFace.represent(img_path=rgb_face, model_name="Facenet", enforce_detection=False)
-                embedding = np.expand_dims(result[0]['embedding'], axis=0)
-                prediction = knn_model.predict(embedding)
-                name = prediction[0]
-            except Exception as e:
-                print(f"Yüz Tanıma Hatası: {e}")
-
-            # Duygu analizi
-            try:
-                resized_face = cv2.resize(face_img, (48, 48)) / 255.0
-                resized_face = np.expand_dims(resized_face, axis=0)
-                prediction = emotion_model.predict(resized_face)
-                emotion_label = "Sad" if prediction[0][0] > 0.5 else "Happy"
-                emotion_score = max(prediction[0][0], 1 - prediction[0][0]) * 100
-                emotion_text = f"{emotion_label} ({emotion_score:.1f}%)"
-            except Exception as e:
-                print(f"Duygu Analizi Hatası: {e}")
-
-            saniye = skip_frames / fps
-            kişiler_süre[name] = kişiler_süre.get(name, 0) + saniye
-            if emotion_label:
-                duygular_süre[emotion_label] = duygular_süre.get(emotion_label, 0) + saniye
-
-            cv2.rectangle(frame, (x, y), (x + w, y + h), (100, 255, 100), 2)
-            cv2.putText(frame, f"{name}", (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-            cv2.putText(frame, emotion_text, (x, y + h + 25), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 200, 0), 2)
-
-            log_line = f"Kare #{frame_count} | Kişi: {name} | Duygu: {emotion_text}"
-            print(log_line)
-            with open(log_path, "a", encoding="utf-8") as f:
-                f.write(log_line + "\n")
-
-            results.append({
-                "Kare": frame_count,
-                "Kişi": name,
-                "Duygu": emotion_text
-            })
-
-        out.write(frame)
-
-    cap.release()
-    out.release()
+    event_log = EventLog(log_path, log_format, verbose)
+
+    def on_face(kare_no, name, emotion_label, emotion_score, box, track_id):
+        if sampler is None:
+            _record_face((kişiler_süre, duygular_süre), results, saniye, kare_no, name, emotion_label,
+                         emotion_score, box, track_id)
+        else:
+            # Örneğin temsil ettiği aralık bir sonraki örnek seçilince belli olur; süreler sonda atanır
+            results.append(kare_no, name, emotion_label, emotion_score, box, track_id)
+        event_log.face(kare_no, name, emotion_label, emotion_score)
+
+    frames = reader if on_progress is None else _iter_with_progress(reader, total_frames, on_progress)
+    try:
+        frame_count = _analyze_frames(frames, writer.write if writer else None, on_face, skip_frames=skip_frames,
+                                      batch_size=batch_size, track_faces=track_faces,
+                                      emotion_backend=emotion_backend, sampler=sampler,
+                                      max_pending_frames=queue_size)
+    finally:
+        reader.close()
+        if writer:
+            writer.close()
+            out.release()
+        cap.release()
+        event_log.close()
+    print("🎬 Video bitti.")
+
+    if sampler is not None:
+        results.assign_seconds(sampler.samples, sample_seconds(sampler.samples, frame_count, fps))
+        kişiler_süre, duygular_süre = results.totals()
 
     özet = {
         "Toplam Kare": frame_count,
@@ -128,68 +368,106 @@ def analyze_video(video_path, output_video_path="analyzed_output.mp4", log_path=
         "Detaylı Sonuçlar": results
     }
 
-    print(f"\n✅ İşlem tamamlandı! Çıkış videosu: {output_video_path}, Log dosyası: {log_path}")
+    if render_mode == "none":
+        print(f"\n✅ İşlem tamamlandı! Log dosyası: {log_path}")
+    else:
+        print(f"\n✅ İşlem tamamlandı! Çıkış videosu: {output_video_path}, Log dosyası: {log_path}")
     return özet
 
 
-## @brief Kameradan gerçek zamanlı yüz tanıma ve duygu analizi yapar.
-#  @details Kamera görüntüsünden alınan her karede yüz algılama, tanıma ve duygu tespiti yapılır.
-#  @note Programı sonlandırmak için 'q' tuşuna basmak gerekir.
-def live_camera_analysis():
-    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-    knn_model = joblib.load("face_knn_model.pkl")
-    emotion_model = load_model("model_dropout.h5")
-
-    cap = cv2.VideoCapture(0)
-    fps_limit = 5  # Maksimum 5 FPS analiz
-    interval = 1.0 / fps_limit
-    last_time = time.time()
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        current_time = time.time()
-        if (current_time - last_time) < interval:
-            continue
-        last_time = current_time
-
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5)
-
-        for (x, y, w, h) in faces:
-            face_img = frame[y:y+h, x:x+w]
-            name = "Bilinmiyor"
-
-            try:
-                rgb_face = cv2.cvtColor(face_img, cv2.COLOR_BGR2RGB)
-                result = DeepFace.represent(img_path=rgb_face, model_name="Facenet", enforce_detection=False)
-                embedding = np.expand_dims(result[0]['embedding'], axis=0)
-                prediction = knn_model.predict(embedding)
-                name = prediction[0]
-
+## @brief Kameradan (ya da dosya / yapay kaynaktan) gerçek zamanlı yüz tanıma ve duygu analizi yapar.
+#  @details Yakalama, çıkarım ve gösterim ayrı iş parçacıklarında çalışır (bkz. live.py). Yakalama
+#           yalnızca en son kareyi tutar; gösterim her yeni karede en son çıkarım sonuçlarını çizer ve
+#           algılama çözünürlüğü hedef gecikmeye göre uyarlanır (bkz. live.InferenceWorker). Yüzler izlenir;
+#           kimlik yalnızca yeni bir iz başladığında ve reverify_interval analiz edilen karede bir yeniden
+#           hesaplanır.
+#  @param source Kamera indeksi, video dosyası yolu ya da live.SyntheticSource gibi bir kaynak.
+#  @param reverify_interval Bir izin kimliğinin yeniden doğrulanacağı analiz edilen kare sayısı.
+#  @param target_latency Hedef yakalama→sonuç gecikmesi (saniye).
+#  @param display False ise pencere açılmaz (headless çalışma ve ölçüm için).
+#  @param duration En uzun çalışma süresi (saniye); None ise kaynak bitene kadar.
+#  @param emotion_backend Duygu modeli arka ucu ("keras" ya da "tflite"); None ise varsayılan.
+#  @return Kare sayılarını ve gecikme yüzdeliklerini (ms) içeren sözlük.
+#  @note Pencere açıkken programı sonlandırmak için 'q' tuşuna basmak gerekir.
+def live_camera_analysis(source=0, reverify_interval=10, target_latency=DEFAULT_TARGET_LATENCY, display=True,
+                         duration=None, emotion_backend=None):
+    detector = create_detector()
+    knn_model = get_knn_model()
+    emotion_model = get_emotion_model(emotion_backend)
+    tracker = FaceTracker(reverify_interval=reverify_interval)
+    processed = 0
+
+    def analyze(frame, scale):
+        nonlocal processed
+        processed += 1
+        detector.max_width = max(1, int(min(frame.shape[1], DETECT_MAX_WIDTH) * scale))
+        faces = detector.detect(frame)
+
+        matches = tracker.update(faces, processed)
+        crops = [frame[y:y+h, x:x+w].copy() for (x, y, w, h) in faces]
+        annotations = analyze_faces(crops, knn_model, emotion_model, [needs for _, needs in matches])
+
+        results = []
+        for box, (track, needs), (name, emotion_label, emotion_score) in zip(faces, matches, annotations):
+            if needs:
+                track.add_identity(name)
+            name = track.name if track.name is not None else UNKNOWN_NAME
+            results.append((box, name, emotion_label, emotion_score))
+        return results
+
+    cap, realtime = open_source(source)
+    latest = LatestFrame()
+    capture = CaptureThread(cap, latest, realtime)
+    worker = InferenceWorker(latest, analyze, target_latency)
+    capture.start()
+    worker.start()
+
+    display_latencies = []
+    start = time.monotonic()
+    seq = 0
+    try:
+        while duration is None or time.monotonic() - start < duration:
+            new_seq, frame, captured_at = latest.get(seq, timeout=0.05)
+            if new_seq == seq or frame is None:
+                if latest.closed:
+                    break
+                continue
+            seq = new_seq
+
+            # Kare çıkarım iş parçacığıyla paylaşıldığından üzerine çizmeden önce kopyalanır
+            frame = frame.copy()
+            annotations, _ = worker.result()
+            for (x, y, w, h), name, emotion_label, emotion_score in annotations:
                 cv2.rectangle(frame, (x, y), (x + w, y + h), (100, 255, 100), 2)
                 cv2.putText(frame, f"Name: {name}", (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 200, 0), 2)
-            except Exception as e:
-                print(f"Yüz Tanıma Hatası: {e}")
-
-            try:
-                resized_face = cv2.resize(face_img, (48, 48)) / 255.0
-                resized_face = np.expand_dims(resized_face, axis=0)
-                prediction = emotion_model.predict(resized_face)
-                emotion_label = "Sad" if prediction[0][0] > 0.5 else "Happy"
-                emotion_score = max(prediction[0][0], 1 - prediction[0][0]) * 100
-                emotion_text = f"{emotion_label}: {emotion_score:.1f}%"
-
-                cv2.putText(frame, emotion_text, (x, y + h + 25), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
-            except Exception as e:
-                print(f"Duygu Analizi Hatası: {e}")
 
-        cv2.imshow("Kamera - Canlı Analiz (Çıkmak için 'q' bas)", frame)
-
-        if cv2.waitKey(1) & 0xFF == ord("q"):
-            break
-
-    cap.release()
-    cv2.destroyAllWindows()
\ No newline at end of file
+                if emotion_label:
+                    emotion_text = f"{emotion_label}: {emotion_score:.1f}%"
+                    cv2.putText(frame, emotion_text, (x, y + h + 25), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
+
+            if display:
+                cv2.imshow("Kamera - Canlı Analiz (Çıkmak için 'q' bas)", frame)
+                if cv2.waitKey(1) & 0xFF == ord("q"):
+                    break
+            display_latencies.append(time.monotonic() - captured_at)
+    finally:
+        capture.stop()
+        worker.stop()
+        capture.join()
+        worker.join()
+        cap.release()
+        if display:
+            cv2.destroyAllWindows()
+    if worker.error is not None:
+        raise worker.error
+
+    istatistik = {
+        "Yakalanan Kare": capture.frames_captured,
+        "Gösterilen Kare": len(display_latencies),
+        "Analiz Edilen Kare": worker.frames_analyzed,
+        "Gösterim Gecikmesi (ms)": latency_percentiles(display_latencies),
+        "Sonuç Gecikmesi (ms)": latency_percentiles(worker.result_latencies),
+        "Algılama Ölçeği": round(worker.scale, 2),
+    }
+    print(f"📷 Canlı analiz bitti: {istatistik}")
+    return istatistik
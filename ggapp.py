@@ -1,6 +1,10 @@
+import time
+
 import streamlit as st
 from ggfunctions import download_video, identify_speaker_transcribe_and_emotion, live_camera_analysis
-import tempfile
+from jobs import CANCELLED, DONE, FAILED, get_job_service
+from model_registry import start_background_warmup
+from result_cache import get_default_cache
 
 ## \mainpage
 # \brief Video veya canlı kamera görüntüsü üzerinden kişi tanıma ve duygu analizi yapan Streamlit arayüzü.
@@ -10,6 +14,53 @@ import tempfile
 # - Kullanıcının yüklediği videoları analiz eder
 # - Gerçek zamanlı kamera görüntüsünde yüz tanıma ve duygu analizi yapar
 
+## Çalışan işlerin durumunun kaç saniyede bir yenileneceği.
+POLL_INTERVAL = 1.0
+
+# Modeller arka planda yüklenir; arayüz beklemeden açılır
+start_background_warmup()
+# Aynı video ya da URL için sonuçlar önbellekten döner
+cache = get_default_cache()
+# İndirme ve analizler arka planda, her biri kendi çalışma klasöründe yürütülür
+service = get_job_service()
+running_jobs = []
+
+## \brief URL'deki videoyu işin çalışma klasörüne indirir (arka planda çalışır).
+# \return İndirilen video yolu.
+def download_job(job, url):
+    job.report_progress(0.0, "Video indiriliyor...")
+    return download_video(url, job.path("video.mp4"), cache=cache)
+
+## \brief Konuşmacı, duygu ve konuşma metni raporunu arka planda üretir.
+# \param video_path Analiz edilecek video; None ise işe yüklenen dosya.
+# \return Metin raporu.
+def report_job(job, video_path):
+    def on_progress(done, total):
+        job.report_progress(done / total if total else 0.0, f"{done}/{total} kare işlendi")
+
+    return identify_speaker_transcribe_and_emotion(video_path or job.input_path, cache=cache,
+                                                   on_progress=on_progress)  # \callgraph
+
+## \brief Oturumda kayıtlı işin durumunu gösterir; iş sürüyorsa ilerleme çubuğu ve iptal düğmesi çizer.
+# \param state_key İş kimliğinin tutulduğu st.session_state anahtarı.
+# \return Başarıyla tamamlanmış iş ya da None.
+def show_job(state_key):
+    job_id = st.session_state.get(state_key)
+    job = service.get(job_id) if job_id else None
+    if job is None:
+        return None
+    if not job.done:
+        st.progress(job.progress, text=f"{job.title}: {job.message or job.status}")
+        if st.button("İptal et", key=f"iptal-{job.id}"):
+            job.cancel()
+        running_jobs.append(job)
+        return None
+    if job.status == FAILED:
+        st.error(f"{job.title} başarısız oldu: {job.error}")
+    elif job.status == CANCELLED:
+        st.warning(f"{job.title} iptal edildi.")
+    return job if job.status == DONE else None
+
 st.title("Video ve Canlı Kamera Duygu Analizi Uygulaması")
 
 ## \section Video URL'den analiz
@@ -17,16 +68,24 @@ st.title("Video ve Canlı Kamera Duygu Analizi Uygulaması")
 video_url = st.text_input("Video URL'sini gir ve indir")
 
 if video_url:
-    with st.spinner("Video indiriliyor... Sabırlı ol güzelim ❤️"):
-        video_path = download_video(video_url)  # \callgraph
+    # İndirme işi saklama süresi dolup silinmişse video yeniden indirilir
+    if st.session_state.get("indirilen_url") != video_url or service.get(st.session_state["indirme_isi"]) is None:
+        st.session_state["indirilen_url"] = video_url
+        st.session_state["indirme_isi"] = service.submit(download_job, video_url, title="Video indirme").id  # \callgraph
+        st.session_state.pop("url_analiz_isi", None)
+
+    download = show_job("indirme_isi")
+    if download is not None:
         st.success("Video indirildi!")
-        st.video(video_path)
+        st.video(download.result)
 
         if st.button("İndirilen videoyu analiz et"):
-            with st.spinner("Analiz yapılıyor..."):
-                result_text = identify_speaker_transcribe_and_emotion(video_path)  # \callgraph
-                st.success("Analiz tamamlandı!")
-                st.text(result_text)
+            st.session_state["url_analiz_isi"] = service.submit(report_job, download.result, title="Analiz",
+                                                                depends_on=[download]).id
+        analysis = show_job("url_analiz_isi")
+        if analysis is not None:
+            st.success("Analiz tamamlandı!")
+            st.text(analysis.result)
 
 st.markdown("---")
 
@@ -38,14 +97,14 @@ if uploaded_file is not None:
     st.video(uploaded_file)
 
     if st.button("Yüklenen videoyu analiz et"):
-        with st.spinner("Analiz yapılıyor... Sabırlı ol güzelim ❤️"):
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as tmp_file:
-                tmp_file.write(uploaded_file.read())
-                tmp_video_path = tmp_file.name
-
-            result_text = identify_speaker_transcribe_and_emotion(tmp_video_path)  # \callgraph
-            st.success("Analiz tamamlandı!")
-            st.text(result_text)
+        # Dosya belleğe okunmadan parça parça işin çalışma klasörüne yazılır
+        extension = uploaded_file.name.rsplit(".", 1)[-1]
+        st.session_state["yukleme_analiz_isi"] = service.submit(report_job, None, title="Analiz", upload=uploaded_file,
+                                                                upload_name=f"video.{extension}").id
+    analysis = show_job("yukleme_analiz_isi")
+    if analysis is not None:
+        st.success("Analiz tamamlandı!")
+        st.text(analysis.result)
 
 st.markdown("---")
 
@@ -54,4 +113,9 @@ st.markdown("---")
 if st.button("Canlı Kamera Analizini Başlat"):
     st.write("Canlı kamera analizi başlatılıyor... Çıkmak için video penceresinde 'q' tuşuna bas.")
     live_camera_analysis()  # \callgraph
-    st.write("Canlı analiz sonlandı.")
\ No newline at end of file
+    st.write("Canlı analiz sonlandı.")
+
+# Süren işler varsa sayfa kısa aralıklarla yenilenerek ilerleme güncellenir
+if running_jobs:
+    time.sleep(POLL_INTERVAL)
+    st.rerun()
\ No newline at end of file
@@ -6,25 +6,42 @@
 #        DeepFace, KNN, CNN modelleri ve Google Speech Recognition kullanmaktadır.
 ##
 
-import yt_dlp
 import cv2
 import numpy as np
-import joblib
-from deepface import DeepFace
-from keras.models import load_model
-import time
 import os
-import speech_recognition as sr
-from pydub import AudioSegment
-from moviepy.editor import VideoFileClip
+import math
+import tempfile
+import threading
+import profiling
+from detection import create_detector, default_backend_name
+from inference import analyze_faces
+from keyframes import DEFAULT_MAX_RATE, DEFAULT_MIN_RATE, SAMPLING_MODES, AdaptiveSampler, sample_seconds
+from media import AVDemuxer
+from model_registry import default_emotion_backend, get_knn_model, get_emotion_model
+from result_cache import cache_key, restore_file
+from transcription import iter_wav_blocks, join_segments, transcribe_stream
+
+## @brief İlerleme bildiriminin kaç karede bir yapılacağı.
+PROGRESS_EVERY = 25
 
 ##
 # @brief Belirtilen YouTube videosunu MP4 formatında indirir.
 # @param youtube_url İndirilecek YouTube video URL’si.
 # @param output_path Videonun kaydedileceği dosya adı (varsayılan: "aysu_video.mp4").
+# @param cache result_cache.ResultCache; verilirse aynı URL bir daha indirilmez.
 # @return Kaydedilen video dosyasının yolu.
 ##
-def download_video(youtube_url, output_path="aysu_video.mp4"):
+def download_video(youtube_url, output_path="aysu_video.mp4", cache=None):
+    if cache is not None:
+        key = cache_key("download_video", {"url": youtube_url}, include_models=False)
+        hit = cache.get(key)
+        if hit is not None:
+            restore_file(hit[1], "video.mp4", output_path)
+            print("Video önbellekten alındı!")
+            return output_path
+
+    import yt_dlp
+
     ydl_opts = {
         'outtmpl': output_path,
         'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/mp4',
@@ -36,121 +53,86 @@ def download_video(youtube_url, output_path="aysu_video.mp4"):
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
         ydl.download([youtube_url])
     print("Video indirildi!")
+    if cache is not None:
+        cache.put(key, {"url": youtube_url}, {"video.mp4": output_path})
     return output_path
 
 ##
 # @brief Videodaki birden fazla yüzü tanır ve her biri için duygu analizi yapar.
 # @param video_path Analiz edilecek video dosyasının yolu.
+# @param profile True ise aşama süreleri ölçülür, ekrana basılır ve döndürülür.
+# @param emotion_backend Duygu modeli arka ucu ("keras" ya da "tflite"); None ise varsayılan.
+# @return profile True ise aşama süreleri raporu, aksi halde None.
 ##
-def analyze_video_multi_face(video_path):
-    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-    knn_model = joblib.load("face_knn_model.pkl")
-    emotion_model = load_model("model_dropout.h5")
-
-    cap = cv2.VideoCapture(video_path)
-
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        faces = face_cascade.detectMultiScale(frame, scaleFactor=1.1, minNeighbors=5)
-
-        for (x, y, w, h) in faces:
-            face_img = frame[y:y+h, x:x+w]
-            try:
-                rgb_face = cv2.cvtColor(face_img, cv2.COLOR_BGR2RGB)
-                result = DeepFace.represent(img_path=rgb_face, model_name="Facenet", enforce_detection=False)
-                embedding = np.expand_dims(result[0]['embedding'], axis=0)
+def analyze_video_multi_face(video_path, profile=False, emotion_backend=None):
+    from deepface import DeepFace
 
-                prediction = knn_model.predict(embedding)
-                name = prediction[0]
+    detector = create_detector()
+    knn_model = get_knn_model()
+    emotion_model = get_emotion_model(emotion_backend)
 
-                cv2.rectangle(frame, (x, y), (x+w, y+h), (100, 255, 100), 2)
-                cv2.putText(frame, f"Name: {name}", (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 200, 0), 2)
-
-                resized_face = cv2.resize(face_img, (48, 48))
-                resized_face = resized_face / 255.0
-                resized_face = np.expand_dims(resized_face, axis=0)
-                pred_emotion = emotion_model.predict(resized_face)
-                emotion_label = "Sad" if pred_emotion[0][0] > 0.5 else "Happy"
-                cv2.putText(frame, f"Emotion: {emotion_label}", (x, y+h+25), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
-
-            except Exception as e:
-                print(f"Hata: {e}")
+    cap = cv2.VideoCapture(video_path)
 
-        cv2.imshow("Multi Face Video Analysis", frame)
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
+    with profiling.enabled(profile) as profiler:
+        while cap.isOpened():
+            with profiler.stage("çözme"):
+                ret, frame = cap.read()
+            if not ret:
+                break
+
+            with profiler.stage("algılama"):
+                faces = detector.detect(frame)
+
+            for (x, y, w, h) in faces:
+                face_img = frame[y:y+h, x:x+w]
+                try:
+                    with profiler.stage("gömme"):
+                        rgb_face = cv2.cvtColor(face_img, cv2.COLOR_BGR2RGB)
+                        result = DeepFace.represent(img_path=rgb_face, model_name="Facenet", enforce_detection=False)
+                        embedding = np.expand_dims(result[0]['embedding'], axis=0)
+
+                    with profiler.stage("kimlik"):
+                        prediction = knn_model.predict(embedding)
+                    name = prediction[0]
+
+                    with profiler.stage("çizim"):
+                        cv2.rectangle(frame, (x, y), (x+w, y+h), (100, 255, 100), 2)
+                        cv2.putText(frame, f"Name: {name}", (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 200, 0), 2)
+
+                    with profiler.stage("duygu"):
+                        resized_face = cv2.resize(face_img, (48, 48))
+                        resized_face = resized_face / 255.0
+                        resized_face = np.expand_dims(resized_face, axis=0)
+                        pred_emotion = emotion_model.predict(resized_face)
+                    emotion_label = "Sad" if pred_emotion[0][0] > 0.5 else "Happy"
+                    with profiler.stage("çizim"):
+                        cv2.putText(frame, f"Emotion: {emotion_label}", (x, y+h+25), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
+
+                except Exception as e:
+                    print(f"Hata: {e}")
+
+            cv2.imshow("Multi Face Video Analysis", frame)
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
 
     cap.release()
     cv2.destroyAllWindows()
 
+    if profile:
+        report = profiler.report()
+        print("\n".join(["Aşama Süreleri:"] + profiling.format_report(report)))
+        return report
+
 ##
 # @brief Canlı kamera akışında yüz tanıma ve duygu analizi yapar.
+# @details Yakalama, çıkarım ve gösterimi ayrı iş parçacıklarında çalıştıran functions.live_camera_analysis'e devreder.
+# @param source Kamera indeksi, video dosyası ya da yapay kaynak (varsayılan: 0).
+# @return Kare sayıları ve gecikme yüzdeliklerini içeren sözlük.
 ##
-def live_camera_analysis():
-    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-    knn_model = joblib.load("face_knn_model.pkl")
-    emotion_model = load_model("model_dropout.h5")
-
-    cap = cv2.VideoCapture(0)
-    fps_limit = 5
-    interval = 1.0 / fps_limit
-    last_time = time.time()
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        current_time = time.time()
-        if (current_time - last_time) < interval:
-            continue
-        last_time = current_time
-
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5)
-
-        for (x, y, w, h) in faces:
-            face_img = frame[y:y+h, x:x+w]
-
-            try:
-                rgb_face = cv2.cvtColor(face_img, cv2.COLOR_BGR2RGB)
-                result = DeepFace.represent(img_path=rgb_face, model_name="Facenet", enforce_detection=False)
-                embedding = np.expand_dims(result[0]['embedding'], axis=0)
-
-                prediction = knn_model.predict(embedding)
-                name = prediction[0]
-
-                cv2.rectangle(frame, (x, y), (x + w, y + h), (100, 255, 100), 2)
-                cv2.putText(frame, f"Name: {name}", (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 200, 0), 2)
-
-            except Exception as e:
-                print(f"Yüz Tanıma Hatası: {e}")
-
-            try:
-                resized_face = cv2.resize(face_img, (48, 48))
-                resized_face = resized_face / 255.0
-                resized_face = np.expand_dims(resized_face, axis=0)
-
-                prediction = emotion_model.predict(resized_face)
-                emotion_label = "Sad" if prediction[0][0] > 0.5 else "Happy"
-                emotion_score = max(prediction[0][0], 1 - prediction[0][0]) * 100
-                emotion_text = f"{emotion_label}: {emotion_score:.1f}%"
-
-                cv2.putText(frame, emotion_text, (x, y + h + 25), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
-
-            except Exception as e:
-                print(f"Duygu Analizi Hatası: {e}")
-
-        cv2.imshow("Kamera - Canlı Analiz (Çıkmak için 'q' bas)", frame)
+def live_camera_analysis(source=0):
+    from functions import live_camera_analysis as run_live_analysis
 
-        if cv2.waitKey(1) & 0xFF == ord("q"):
-            break
-
-    cap.release()
-    cv2.destroyAllWindows()
+    return run_live_analysis(source)
 
 ##
 # @brief Videodan sesi çıkarır ve WAV formatında kaydeder.
@@ -159,6 +141,8 @@ def live_camera_analysis():
 # @return Oluşturulan ses dosyasının yolu.
 ##
 def extract_audio_from_video(video_path, output_audio_path="temp_audio.wav"):
+    from moviepy.editor import VideoFileClip
+
     video = VideoFileClip(video_path)
     audio = video.audio
     audio.write_audiofile(output_audio_path, codec='pcm_s16le')
@@ -166,92 +150,211 @@ def extract_audio_from_video(video_path, output_audio_path="temp_audio.wav"):
     video.close()
     return output_audio_path
 
+##
+# @brief WAV dosyasını sessizlik sınırlarından parçalara bölerek zaman damgalı biçimde yazıya çevirir.
+# @details Dosya bloklar halinde okunur; parçalar kapandıkça tanıyıcıya eşzamanlı gönderilir.
+# @param audio_path Yazıya çevrilecek 16 bit PCM WAV dosyasının yolu.
+# @param backend Tanıyıcı arka ucu (bkz. transcription.get_recognizer_backend); None ise varsayılan.
+# @return (segments, duration_minute): {"start", "end", "text"} parçaları ve ses süresi (dakika cinsinden).
+##
+def transcribe_audio_segments(audio_path, backend=None):
+    sample_rate, blocks = iter_wav_blocks(audio_path)
+    segments, duration_sec = transcribe_stream(blocks, sample_rate, backend)
+    duration_min = round(duration_sec / 60, 2)
+    return segments, duration_min
+
 ##
 # @brief WAV dosyasını yazıya çevirir ve toplam ses süresini dakika olarak döndürür.
 # @param audio_path Yazıya çevrilecek ses dosyasının yolu.
+# @param backend Tanıyıcı arka ucu; None ise varsayılan (Google).
 # @return (transcribed_text, duration_minute): Yazıya dökülmüş metin ve süresi (dakika cinsinden).
-# @throws sr.UnknownValueError Konuşma anlaşılamadığında.
-# @throws sr.RequestError Google API erişim hatası oluştuğunda.
+#         Google API hataları ilgili parçanın metninde "[Google API hatası: ...]" olarak yer alır.
 ##
-def transcribe_audio(audio_path):
-    recognizer = sr.Recognizer()
-    audio_file = sr.AudioFile(audio_path)
-
-    with audio_file as source:
-        audio_data = recognizer.record(source)
-
-    try:
-        text = recognizer.recognize_google(audio_data, language="tr-TR")
-    except sr.UnknownValueError:
-        text = "[Konuşma anlaşılamadı]"
-    except sr.RequestError as e:
-        text = f"[Google API hatası: {e}]"
-
-    audio_seg = AudioSegment.from_wav(audio_path)
-    duration_sec = audio_seg.duration_seconds
-    duration_min = round(duration_sec / 60, 2)
-
-    return text, duration_min
+def transcribe_audio(audio_path, backend=None):
+    segments, duration_min = transcribe_audio_segments(audio_path, backend)
+    return join_segments(segments), duration_min
 
 ##
 # @brief Videodaki kişileri tanır, duygularını analiz eder, ses verisini yazıya çevirir ve süre analizini yapar.
+# @details Video tek bir ffmpeg geçişiyle çözülür: kareler yüz aşamasına, PCM ses ise eşzamanlı
+#          olarak yazıya dökme aşamasına akar; geçici WAV dosyası yazılmaz. ffmpeg yoksa (ya da
+#          Windows'ta) OpenCV ile okunup ses moviepy ile ayrıca çıkarılır.
+#          Videonun tamamı kapsanacak şekilde her stride karede bir analiz yapılır; stride,
+#          analiz edilen kare sayısı max_analyzed_frames'i geçmeyecek biçimde seçilir.
+#          "adaptive" örneklemede kareler sahne değişimi ve harekete göre seçilir (bkz. keyframes.py);
+#          aynı bütçe saniyedeki en fazla analiz sayısına çevrilir ve görünme süresi her örneğin
+#          temsil ettiği kare aralığıyla hesaplanır.
 # @param video_path Analiz edilecek video dosyasının yolu.
+# @param max_analyzed_frames Analiz edilecek en fazla kare sayısı; None ise her kare analiz edilir.
+# @param recognizer_backend Konuşma tanıyıcı arka ucu; None ise varsayılan.
+# @param profile True ise aşama süreleri ölçülür ve rapora "Aşama Süreleri" bölümü eklenir (önbellek kullanılmaz).
+# @param cache result_cache.ResultCache; verilirse aynı içerik, model ve parametrelerle üretilmiş rapor önbellekten döner.
+# @param on_progress on_progress(okunan kare, toplam kare) ile düzenli aralıklarla çağrılır; yükselttiği hata analizi durdurur.
+# @param emotion_backend Duygu modeli arka ucu ("keras" ya da "tflite"); None ise varsayılan.
+# @param sampling Analiz edilecek karelerin seçimi: "fixed" (her stride karede bir) ya da "adaptive".
 # @return Tanınan kişiler, duyguları, görünme süresi, konuşma metni ve ses süresini içeren detaylı rapor (metin formatında).
 ##
-def identify_speaker_transcribe_and_emotion(video_path):
-    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-    knn_model = joblib.load("face_knn_model.pkl")
-    emotion_model = load_model("model_dropout.h5")
+def identify_speaker_transcribe_and_emotion(video_path, max_analyzed_frames=1000, recognizer_backend=None,
+                                            profile=False, cache=None, on_progress=None, emotion_backend=None,
+                                            sampling="fixed"):
+    if sampling not in SAMPLING_MODES:
+        raise ValueError(f"Bilinmeyen örnekleme modu: {sampling}")
+    emotion_backend = emotion_backend or default_emotion_backend()
+    if profile:
+        cache = None
+    if cache is not None:
+        recognizer = (type(recognizer_backend).__name__ if recognizer_backend is not None
+                      else os.environ.get("MOODLENS_RECOGNIZER", "google"))
+        key = cache_key("identify_speaker_transcribe_and_emotion",
+                        {"max_analyzed_frames": max_analyzed_frames, "recognizer": recognizer,
+                         "detector": default_backend_name(), "emotion": emotion_backend, "sampling": sampling},
+                        video_path)
+        hit = cache.get(key)
+        if hit is not None:
+            print("⚡ Rapor önbellekten alındı.")
+            return hit[0]["rapor"]
+
+    with profiling.enabled(profile) as profiler:
+        report = _identify_speaker_transcribe_and_emotion(video_path, max_analyzed_frames, recognizer_backend,
+                                                          on_progress, emotion_backend, sampling)
+    if profile:
+        report += "\n\nAşama Süreleri:\n" + "\n".join(profiling.format_report(profiler.report()))
+    if cache is not None:
+        cache.put(key, {"rapor": report})
+    return report
+
+
+def _identify_speaker_transcribe_and_emotion(video_path, max_analyzed_frames, recognizer_backend, on_progress,
+                                             emotion_backend, sampling):
+    profiler = profiling.current()
+    knn_model = get_knn_model()
+    emotion_model = get_emotion_model(emotion_backend)
 
     cap = cv2.VideoCapture(video_path)
     fps = cap.get(cv2.CAP_PROP_FPS)
-
-    detected_faces = {}
-    appearance_counts = {}
-
-    frame_counter = 0
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    max_frames_to_process = min(1000, total_frames)
-
-    while frame_counter < max_frames_to_process:
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        faces = face_cascade.detectMultiScale(frame, scaleFactor=1.1, minNeighbors=5)
 
-        for (x, y, w, h) in faces:
-            face_img = frame[y:y + h, x:x + w]
+    stride = 1
+    if max_analyzed_frames and total_frames > 0:
+        stride = max(1, math.ceil(total_frames / max_analyzed_frames))
 
-            try:
-                rgb_face = cv2.cvtColor(face_img, cv2.COLOR_BGR2RGB)
-                result = DeepFace.represent(img_path=rgb_face, model_name="Facenet", enforce_detection=False)
-                embedding = np.expand_dims(result[0]['embedding'], axis=0)
-                name = knn_model.predict(embedding)[0]
-            except Exception:
-                name = "Bilinmiyor"
-
-            try:
-                resized_face = cv2.resize(face_img, (48, 48))
-                resized_face = resized_face / 255.0
-                resized_face = np.expand_dims(resized_face, axis=0)
-                prediction = emotion_model.predict(resized_face)
-                emotion = "Sad" if prediction[0][0] > 0.5 else "Happy"
-            except Exception:
-                emotion = "Bilinmiyor"
+    sampler = None
+    if sampling == "adaptive":
+        max_rate = DEFAULT_MAX_RATE
+        if max_analyzed_frames and total_frames > 0:
+            max_rate = min(max_rate, max_analyzed_frames * fps / total_frames)
+        sampler = AdaptiveSampler(fps, max_rate, min(max_rate, DEFAULT_MIN_RATE))
 
+    # Seyrek ya da uyarlanabilir örneklenen kareler birbirinden uzak olabilir; ROI yerine hep tam tarama yapılır
+    detector = create_detector(full_scan_interval=1) if stride > 1 or sampler is not None else create_detector()
+    detected_faces = {}
+    appearance_counts = {}
+    # Uyarlanabilir örneklemede her örnekte görülen kişiler; süreleri sonda atanır
+    sample_names = []
+
+    def analyze_frame(frame_counter, frame):
+        if sampler is None:
+            if frame_counter % stride != 0:
+                return
+        else:
+            with profiler.stage("örnekleme"):
+                if not sampler.should_analyze(frame_counter + 1, frame):
+                    return
+            if sampler.cut:
+                detector.reset()
+
+        with profiler.stage("algılama"):
+            faces = detector.detect(frame)
+        crops = [frame[y:y + h, x:x + w] for (x, y, w, h) in faces]
+
+        names = []
+        for name, emotion_label, _ in analyze_faces(crops, knn_model, emotion_model):
+            emotion = emotion_label or "Bilinmiyor"
             if name not in detected_faces:
                 detected_faces[name] = emotion
+            names.append(name)
 
-            appearance_counts[name] = appearance_counts.get(name, 0) + 1
-
-        frame_counter += 1
+            # Analiz edilen her kare, atlanan stride - 1 kareyi de temsil eder
+            if sampler is None:
+                appearance_counts[name] = appearance_counts.get(name, 0) + stride
+        if sampler is not None:
+            sample_names.append(names)
 
-    cap.release()
+    def frame_done(frame_counter):
+        if on_progress is not None and frame_counter % PROGRESS_EVERY == 0:
+            on_progress(frame_counter, total_frames)
 
-    audio_path = extract_audio_from_video(video_path)
-    transcription, duration_min = transcribe_audio(audio_path)
-    os.remove(audio_path)
+    try:
+        demuxer = AVDemuxer(video_path, width, height)
+    except (RuntimeError, OSError):
+        demuxer = None
+
+    if demuxer is None:
+        frame_counter = 0
+        while True:
+            with profiler.stage("çözme"):
+                ret, frame = cap.read()
+            if not ret:
+                break
+            analyze_frame(frame_counter, frame)
+            frame_counter += 1
+            frame_done(frame_counter)
+        cap.release()
+
+        # Aynı anda çalışan analizler birbirinin ses dosyasının üzerine yazmasın diye benzersiz ad kullanılır
+        fd, audio_path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            with profiler.stage("ses çıkarma"):
+                extract_audio_from_video(video_path, audio_path)
+            with profiler.stage("konuşma tanıma"):
+                segments, duration_min = transcribe_audio_segments(audio_path, recognizer_backend)
+        finally:
+            os.remove(audio_path)
+    else:
+        cap.release()
+        transcription = {}
+
+        def transcribe():
+            try:
+                # Ses iş parçacığında ölçülür; süre görüntü aşamalarıyla çakışır
+                with profiler.stage("konuşma tanıma"):
+                    transcription["result"] = transcribe_stream(demuxer.audio_blocks(), demuxer.sample_rate,
+                                                                recognizer_backend)
+            except Exception as e:
+                transcription["error"] = e
+                # Ses borusu artık okunmadığından ffmpeg görüntü üretmeyi de bırakır; görüntü
+                # döngüsü dosya sonuna ulaşsın ve hata aşağıda yükseltilsin diye süreç durdurulur
+                demuxer.terminate()
+
+        with demuxer:
+            audio_thread = threading.Thread(target=transcribe, name="audio-transcription", daemon=True)
+            audio_thread.start()
+            frames = demuxer.frames()
+            frame_counter = 0
+            while True:
+                with profiler.stage("çözme"):
+                    frame = next(frames, None)
+                if frame is None:
+                    break
+                analyze_frame(frame_counter, frame)
+                frame_counter += 1
+                frame_done(frame_counter)
+            audio_thread.join()
+
+        if "error" in transcription:
+            raise transcription["error"]
+        segments, duration_sec = transcription["result"]
+        duration_min = round(duration_sec / 60, 2)
+
+    if sampler is not None:
+        # Her örnek, bir sonraki örneğe kadar olan kareleri temsil eder
+        intervals = np.rint(sample_seconds(sampler.samples, frame_counter, fps) * fps).astype(int)
+        for names, count in zip(sample_names, intervals):
+            for name in names:
+                appearance_counts[name] = appearance_counts.get(name, 0) + int(count)
 
     result_lines = ["Görüntüde Tanınan Kişiler ve Duyguları:"]
     for name, emotion in detected_faces.items():
@@ -263,7 +366,11 @@ def identify_speaker_transcribe_and_emotion(video_path):
         result_lines.append(f"- {name}: {duration_sec} saniye ({count} kare)")
 
     result_lines.append("\nKonuşma Metni:")
-    result_lines.append(transcription)
+    result_lines.append(join_segments(segments))
+
+    result_lines.append("\nZaman Damgalı Konuşma:")
+    for segment in segments:
+        result_lines.append(f"- [{segment['start']:.2f} - {segment['end']:.2f} sn] {segment['text']}")
     result_lines.append(f"\nToplam Konuşma Süresi (dakika): {duration_min}")
 
     return "\n".join(result_lines)
\ No newline at end of file
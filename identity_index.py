@@ -0,0 +1,216 @@
+##
+# @file identity_index.py
+# @brief L2-normalize Facenet gömmeleri üzerinde toplu kosinüs arama yapan kimlik dizini.
+# @details sklearn KNeighborsClassifier yerine doğrudan kullanılabilir (predict aynı biçimde
+#          isim dizisi döndürür). Farkları:
+#          - En yakın komşunun kosinüs uzaklığı eşikten büyükse yüz "Bilinmiyor" olarak işaretlenir.
+#          - Sorgular tek matris çarpımıyla toplu işlenir.
+#          - Büyük galerilerde (on binlerce kişi) küresel k-means ile bölümlenmiş yaklaşık arama
+#            (IVF) kullanılır; sorgu yalnızca en yakın n_probe bölümdeki gömmelerle karşılaştırılır.
+#          - Gömmeler isteğe bağlı olarak float16 saklanarak bellek yarıya indirilir.
+#
+#          Mevcut pickle'dan geçiş: python identity_index.py face_knn_model.pkl face_index.npz
+##
+
+import argparse
+
+import numpy as np
+
+from inference import UNKNOWN_NAME
+
+DEFAULT_K = 7
+DEFAULT_THRESHOLD = 0.40  # DeepFace'in Facenet için kullandığı kosinüs uzaklığı eşiği
+DEFAULT_N_PROBE = 8
+EXACT_SEARCH_LIMIT = 20000
+GALLERY_CHUNK = 16384
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLES_PER_LIST = 256
+
+
+## @brief Satırları birim uzunluğa getirir.
+#  @param vectors (N, D) boyutlu dizi ya da liste.
+#  @return float32 (N, D) dizi.
+def l2_normalize(vectors):
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+## @brief Birim vektörler üzerinde küresel k-means uygular.
+#  @param vectors L2-normalize (N, D) dizi.
+#  @param n_lists Bölüm (küme) sayısı.
+#  @param seed Tekrarlanabilirlik için rastgelelik tohumu.
+#  @return (centroids, assignment): (n_lists, D) merkezler ve her satırın bölüm numarası.
+def _spherical_kmeans(vectors, n_lists, seed=0):
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), n_lists * KMEANS_SAMPLES_PER_LIST)
+    sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+
+    for _ in range(KMEANS_ITERATIONS):
+        labels = np.argmax(sample @ centroids.T, axis=1)
+        for c in range(n_lists):
+            members = sample[labels == c]
+            if len(members):
+                centroids[c] = members.sum(axis=0)
+        centroids = l2_normalize(centroids)
+
+    assignment = np.concatenate([np.argmax(chunk @ centroids.T, axis=1)
+                                 for chunk in np.array_split(vectors, max(1, len(vectors) // 8192))])
+    return centroids, assignment
+
+
+## @brief Açık küme (open-set) reddi yapan, toplu kosinüs top-k kimlik dizini.
+class IdentityIndex:
+    ## @param embeddings (N, D) gömme dizisi; içeride L2-normalize edilir.
+    #  @param labels Her gömmenin kişi adı.
+    #  @param k Oylamaya katılan komşu sayısı.
+    #  @param threshold Kabul için en büyük kosinüs uzaklığı (1 - benzerlik).
+    #  @param dtype Saklama tipi: "float32" ya da yarı bellek için "float16".
+    #  @param mode "exact", "ivf" ya da galeri boyutuna göre seçen "auto".
+    #  @param n_lists IVF bölüm sayısı; None ise sqrt(N).
+    #  @param n_probe Sorgu başına taranacak bölüm sayısı.
+    #  @param seed k-means tohumu.
+    def __init__(self, embeddings, labels, k=DEFAULT_K, threshold=DEFAULT_THRESHOLD, dtype="float32",
+                 mode="auto", n_lists=None, n_probe=DEFAULT_N_PROBE, seed=0):
+        vectors = l2_normalize(embeddings)
+        classes, label_ids = np.unique(np.asarray(labels).astype(str), return_inverse=True)
+        if len(vectors) != len(label_ids):
+            raise ValueError("Gömme ve etiket sayıları eşleşmiyor.")
+
+        centroids = offsets = None
+        if mode == "ivf" or (mode == "auto" and len(vectors) > EXACT_SEARCH_LIMIT):
+            n_lists = min(n_lists or max(1, int(np.sqrt(len(vectors)))), len(vectors))
+            centroids, assignment = _spherical_kmeans(vectors, n_lists, seed)
+            order = np.argsort(assignment, kind="stable")
+            vectors, label_ids, assignment = vectors[order], label_ids[order], assignment[order]
+            offsets = np.searchsorted(assignment, np.arange(n_lists + 1))
+
+        self._set_arrays(vectors.astype(dtype), label_ids.astype(np.int32), classes, centroids, offsets)
+        self.k = k
+        self.threshold = threshold
+        self.n_probe = n_probe
+
+    def _set_arrays(self, vectors, label_ids, classes, centroids, offsets):
+        self.embeddings = vectors
+        self.label_ids = label_ids
+        self.classes_ = classes
+        self.centroids = centroids
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.embeddings)
+
+    ## @brief Eğitilmiş bir sklearn KNeighborsClassifier'dan dizin oluşturur.
+    #  @param knn_model face_knn_model.pkl içinden yüklenen model.
+    #  @param kwargs IdentityIndex parametreleri (k verilmezse modelin n_neighbors değeri kullanılır).
+    @classmethod
+    def from_knn(cls, knn_model, **kwargs):
+        kwargs.setdefault("k", knn_model.n_neighbors)
+        labels = knn_model.classes_[np.asarray(knn_model._y)]
+        return cls(knn_model._fit_X, labels, **kwargs)
+
+    ## @brief Dizini sıkıştırılmamış .npz dosyasına kaydeder.
+    def save(self, path):
+        extra = {}
+        if self.centroids is not None:
+            extra = {"centroids": self.centroids, "offsets": self.offsets}
+        np.savez(path, embeddings=self.embeddings, label_ids=self.label_ids, classes=self.classes_,
+                 params=np.array([self.k, self.threshold, self.n_probe], dtype=np.float64), **extra)
+
+    ## @brief save ile kaydedilmiş dizini yükler.
+    @classmethod
+    def load(cls, path):
+        index = cls.__new__(cls)
+        with np.load(path, allow_pickle=False) as data:
+            index._set_arrays(data["embeddings"], data["label_ids"], data["classes"],
+                              data["centroids"] if "centroids" in data else None,
+                              data["offsets"] if "offsets" in data else None)
+            k, threshold, n_probe = data["params"]
+        index.k, index.threshold, index.n_probe = int(k), float(threshold), int(n_probe)
+        return index
+
+    ## @brief Sorguların en yakın k galeri gömmesini bulur.
+    #  @param queries (B, D) sorgu gömmeleri.
+    #  @param k Komşu sayısı; None ise dizinin k değeri.
+    #  @return (similarities, indices): (B, k) kosinüs benzerlikleri (azalan) ve galeri satırları.
+    #          Yeterli aday olmayan yerlerde indeks -1, benzerlik -inf olur.
+    def search(self, queries, k=None):
+        queries = l2_normalize(queries)
+        k = max(1, min(k or self.k, len(self.embeddings)))
+        if self.centroids is None:
+            # float16 galeri parça parça float32'ye çevrilir; tüm galerinin kopyası oluşturulmaz
+            sims = np.empty((len(queries), len(self.embeddings)), dtype=np.float32)
+            for start in range(0, len(self.embeddings), GALLERY_CHUNK):
+                chunk = self.embeddings[start:start + GALLERY_CHUNK].astype(np.float32, copy=False)
+                sims[:, start:start + GALLERY_CHUNK] = queries @ chunk.T
+            return self._top_k(sims, np.arange(len(self.embeddings)), k)
+
+        all_sims = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        all_idx = np.full((len(queries), k), -1, dtype=np.int64)
+        n_probe = min(self.n_probe, len(self.centroids))
+        probes = np.argsort(-(queries @ self.centroids.T), axis=1)[:, :n_probe]
+        for q, query in enumerate(queries):
+            candidates = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in probes[q]])
+            if not len(candidates):
+                continue
+            sims = (self.embeddings[candidates].astype(np.float32) @ query)[None, :]
+            top_sims, top_idx = self._top_k(sims, candidates, min(k, len(candidates)))
+            all_sims[q, :top_sims.shape[1]] = top_sims[0]
+            all_idx[q, :top_idx.shape[1]] = top_idx[0]
+        return all_sims, all_idx
+
+    @staticmethod
+    def _top_k(sims, candidates, k):
+        part = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        part_sims = np.take_along_axis(sims, part, axis=1)
+        order = np.argsort(-part_sims, axis=1)
+        return np.take_along_axis(part_sims, order, axis=1), candidates[np.take_along_axis(part, order, axis=1)]
+
+    ## @brief Gömmeleri kişilere eşler; eşiği aşan yüzler "Bilinmiyor" olur.
+    #  @details En yakın komşu eşik içindeyse, eşik içindeki komşular arasında çoğunluk oyu alınır.
+    #  @param embeddings (B, D) gömme dizisi.
+    #  @return KNeighborsClassifier.predict ile aynı biçimde isim dizisi.
+    def predict(self, embeddings):
+        sims, indices = self.search(embeddings)
+        names = np.empty(len(sims), dtype=object)
+        for i, (row_sims, row_idx) in enumerate(zip(sims, indices)):
+            accepted = (row_idx >= 0) & (1.0 - row_sims <= self.threshold)
+            if not accepted[0]:
+                names[i] = UNKNOWN_NAME
+                continue
+            votes = np.bincount(self.label_ids[row_idx[accepted]], minlength=len(self.classes_))
+            names[i] = str(self.classes_[np.argmax(votes)])
+        return names
+
+
+## @brief Kimlik modelini dosyadan yükler.
+#  @details .npz dosyası IdentityIndex olarak yüklenir; pickle dosyası (eski KNN modeli) ise
+#           bellekte IdentityIndex'e dönüştürülür.
+#  @param path Model dosyasının yolu.
+#  @return IdentityIndex nesnesi.
+def load_identity_model(path):
+    if path.endswith(".npz"):
+        return IdentityIndex.load(path)
+    import joblib
+    return IdentityIndex.from_knn(joblib.load(path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="face_knn_model.pkl dosyasını kimlik dizinine dönüştürür")
+    parser.add_argument("source", help="Kaynak KNN pickle dosyası")
+    parser.add_argument("target", help="Yazılacak .npz dizin dosyası")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Kosinüs uzaklığı eşiği")
+    parser.add_argument("--float16", action="store_true", help="Gömmeleri float16 sakla")
+    parser.add_argument("--mode", default="auto", choices=["auto", "exact", "ivf"], help="Arama modu")
+    args = parser.parse_args(argv)
+
+    import joblib
+    index = IdentityIndex.from_knn(joblib.load(args.source), threshold=args.threshold,
+                                   dtype="float16" if args.float16 else "float32", mode=args.mode)
+    index.save(args.target)
+    print(f"✅ {len(index)} gömme, {len(index.classes_)} kişi: {args.target}")
+
+
+if __name__ == "__main__":
+    main()
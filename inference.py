@@ -0,0 +1,182 @@
+##
+# @file inference.py
+# @brief Yüz kırpıntıları için toplu (batch) kimlik tanıma ve duygu analizi yardımcıları.
+# @details Kare kare tek yüzlük Keras çağrıları yerine birden fazla kareden toplanan yüzler
+#          tek bir Facenet, KNN ve duygu CNN çağrısıyla işlenir.
+##
+
+import cv2
+import numpy as np
+
+import profiling
+
+UNKNOWN_NAME = "Bilinmiyor"
+FACENET_MODEL = "Facenet"
+EMOTION_INPUT_SIZE = (48, 48)
+
+
+## @brief DeepFace ile tek bir RGB yüzün Facenet gömmesini hesaplar.
+#  @param rgb_face RGB formatında yüz görüntüsü.
+#  @return Gömme vektörü (liste).
+def _represent_one(rgb_face):
+    from deepface import DeepFace
+
+    result = DeepFace.represent(img_path=rgb_face, model_name=FACENET_MODEL, enforce_detection=False)
+    return result[0]['embedding']
+
+
+## @brief Yüz kırpıntılarının Facenet gömmelerini toplu olarak hesaplar.
+#  @details DeepFace'in liste girişini desteklediği sürümlerde tek çağrı yapılır. Toplu çağrı
+#           desteklenmiyorsa ya da hata verirse her yüz için ayrı çağrıya geri dönülür.
+#  @param face_imgs BGR yüz kırpıntılarının listesi.
+#  @return Her yüz için gömme vektörü; hesaplanamayan yüzler için None.
+def represent_faces(face_imgs):
+    embeddings = [None] * len(face_imgs)
+    rgb_faces = {}
+    for i, face_img in enumerate(face_imgs):
+        try:
+            rgb_faces[i] = cv2.cvtColor(face_img, cv2.COLOR_BGR2RGB)
+        except Exception as e:
+            print(f"Yüz Tanıma Hatası: {e}")
+
+    indices = list(rgb_faces)
+    if len(indices) > 1:
+        try:
+            from deepface import DeepFace
+
+            batch = DeepFace.represent(img_path=[rgb_faces[i] for i in indices],
+                                       model_name=FACENET_MODEL, enforce_detection=False)
+            if len(batch) == len(indices) and all(isinstance(r, list) for r in batch):
+                for i, result in zip(indices, batch):
+                    embeddings[i] = result[0]['embedding']
+                return embeddings
+        except Exception:
+            pass
+
+    for i in indices:
+        try:
+            embeddings[i] = _represent_one(rgb_faces[i])
+        except Exception as e:
+            print(f"Yüz Tanıma Hatası: {e}")
+    return embeddings
+
+
+## @brief Gömmeleri tek bir KNN çağrısıyla kişilere eşler.
+#  @param knn_model Eğitilmiş kimlik modeli (predict metodu olan).
+#  @param embeddings represent_faces çıktısı; None olan girdiler "Bilinmiyor" olur.
+#  @return Her yüz için kişi adı listesi.
+def identify_embeddings(knn_model, embeddings):
+    names = [UNKNOWN_NAME] * len(embeddings)
+    indices = [i for i, emb in enumerate(embeddings) if emb is not None]
+    if not indices:
+        return names
+    try:
+        predictions = knn_model.predict(np.asarray([embeddings[i] for i in indices]))
+        for i, name in zip(indices, predictions):
+            names[i] = name
+    except Exception as e:
+        print(f"Yüz Tanıma Hatası: {e}")
+    return names
+
+
+## @brief Duygu modelini tek bir girdi yığını üzerinde çalıştırır.
+#  @details Keras'ın predict metodu her çağrıda veri hattı kurduğundan küçük yığınlarda
+#           predict_on_batch tercih edilir; bu metodu olmayan modellerde predict kullanılır.
+#  @param emotion_model Keras duygu modeli ya da predict arayüzlü eşdeğeri.
+#  @param x (N, 48, 48, 3) girdi yığını.
+#  @return (N, 1) olasılık dizisi.
+def _predict_batch(emotion_model, x):
+    predict_on_batch = getattr(emotion_model, "predict_on_batch", None)
+    if predict_on_batch is not None:
+        return np.asarray(predict_on_batch(x))
+    return np.asarray(emotion_model.predict(x, verbose=0))
+
+
+## @brief Yüz kırpıntılarını 48x48 boyutuna getirip duygu CNN'ini tek seferde çalıştırır.
+#  @details Toplu çağrı hata verirse her yüz için ayrı çağrıya geri dönülür; böylece yalnızca
+#           hatalı yüzün sonucu None olur.
+#  @param emotion_model Keras duygu modeli.
+#  @param face_imgs BGR yüz kırpıntılarının listesi.
+#  @return Her yüz için "Sad" olasılığı (0-1 arası); hesaplanamayanlar için None.
+def predict_emotions(emotion_model, face_imgs):
+    probabilities = [None] * len(face_imgs)
+    inputs = {}
+    for i, face_img in enumerate(face_imgs):
+        try:
+            inputs[i] = cv2.resize(face_img, EMOTION_INPUT_SIZE) / 255.0
+        except Exception as e:
+            print(f"Duygu Analizi Hatası: {e}")
+    if not inputs:
+        return probabilities
+
+    indices = list(inputs)
+    if len(indices) > 1:
+        try:
+            predictions = _predict_batch(emotion_model, np.stack([inputs[i] for i in indices]))
+            if len(predictions) == len(indices):
+                for i, prediction in zip(indices, predictions):
+                    probabilities[i] = prediction[0]
+                return probabilities
+        except Exception:
+            pass
+
+    for i in indices:
+        try:
+            probabilities[i] = _predict_batch(emotion_model, inputs[i][np.newaxis])[0][0]
+        except Exception as e:
+            print(f"Duygu Analizi Hatası: {e}")
+    return probabilities
+
+
+## @brief "Sad" olasılığını etiket ve yüzde güven skoruna çevirir.
+#  @param probability Modelin "Sad" olasılığı.
+#  @return (emotion_label, emotion_score) ikilisi; skor yüzde cinsindendir.
+def emotion_from_probability(probability):
+    emotion_label = "Sad" if probability > 0.5 else "Happy"
+    emotion_score = max(probability, 1 - probability) * 100
+    return emotion_label, emotion_score
+
+
+## @brief Duygu etiketini ve güven skorunu ekranda / günlükte gösterilen metne çevirir.
+#  @param emotion_label Duygu etiketi; None ise duygu bulunamamıştır.
+#  @param emotion_score Yüzde güven skoru.
+#  @return Ör. "Happy (99.7%)" ya da "Tespit edilemedi".
+def format_emotion(emotion_label, emotion_score):
+    if not emotion_label:
+        return "Tespit edilemedi"
+    return f"{emotion_label} ({emotion_score:.1f}%)"
+
+
+## @brief Bir grup yüz kırpıntısı için kimlik ve duygu tahminlerini toplu olarak üretir.
+#  @param face_imgs BGR yüz kırpıntılarının listesi.
+#  @param knn_model Kimlik modeli.
+#  @param emotion_model Duygu modeli.
+#  @param identify_mask Hangi yüzlerin kimliğinin hesaplanacağını belirten bool listesi; None ise hepsi.
+#  @return Her yüz için (name, emotion_label, emotion_score) üçlüsü; duygu bulunamazsa etiket ve skor None,
+#          kimliği istenmeyen yüzler için name None.
+def analyze_faces(face_imgs, knn_model, emotion_model, identify_mask=None):
+    if not face_imgs:
+        return []
+    profiler = profiling.current()
+    if identify_mask is None:
+        indices = list(range(len(face_imgs)))
+    else:
+        indices = [i for i, needed in enumerate(identify_mask) if needed]
+    names = [None] * len(face_imgs)
+    if indices:
+        with profiler.stage("gömme", len(indices)):
+            embeddings = represent_faces([face_imgs[i] for i in indices])
+        with profiler.stage("kimlik", len(indices)):
+            identified = identify_embeddings(knn_model, embeddings)
+        for i, name in zip(indices, identified):
+            names[i] = name
+    with profiler.stage("duygu", len(face_imgs)):
+        probabilities = predict_emotions(emotion_model, face_imgs)
+
+    annotations = []
+    for name, probability in zip(names, probabilities):
+        if probability is None:
+            annotations.append((name, None, None))
+        else:
+            annotations.append((name, *emotion_from_probability(probability)))
+    return annotations
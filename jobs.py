@@ -0,0 +1,219 @@
+##
+# @file jobs.py
+# @brief Streamlit arayüzleri için yerel arka plan iş (job) servisi.
+# @details Analizler arayüz isteğinin içinde değil, sınırlı boyutlu bir iş parçacığı havuzunda
+#          çalışır; arayüz işi gönderir ve durumunu yoklar (polling). Her iş kendi geçici çalışma
+#          klasöründe çalışır, böylece aynı anda analiz yapan kullanıcılar birbirinin dosyalarının
+#          (video, günlük, ses) üzerine yazmaz.
+#
+#          - Yüklenen dosyalar belleğe okunmadan parça parça çalışma klasörüne yazılır.
+#          - İşler ilerlemesini report_progress ile bildirir; iptal istenmişse aynı çağrı
+#            JobCancelled yükseltir ve iş, kullandığı kaynakları kapatarak sonlanır.
+#          - Hata veren ya da iptal edilen işlerin klasörü hemen, tamamlanan işlerinki ise son
+#            erişimden (get) DEFAULT_TTL süresi sonra silinir. Sonucunu kullanan (depends_on) bir iş
+#            sürdükçe klasör silinmez. Süreç kapanırken tüm çalışma klasörleri temizlenir.
+##
+
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+PENDING = "bekliyor"
+RUNNING = "çalışıyor"
+DONE = "tamamlandı"
+FAILED = "hata"
+CANCELLED = "iptal edildi"
+
+DEFAULT_WORKERS = int(os.environ.get("MOODLENS_JOB_WORKERS", 2))
+DEFAULT_TTL = 3600
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+_default_service = None
+_default_service_lock = threading.Lock()
+
+
+## @brief İptal edilen bir işin çalışmasını durdurmak için yükseltilir.
+class JobCancelled(Exception):
+    pass
+
+
+## @brief Yüklenen dosyayı belleğe tamamen okumadan parça parça diske yazar.
+#  @param file_obj read(size) metodu olan dosya benzeri nesne (ör. Streamlit UploadedFile).
+#  @param dest_path Hedef dosya yolu.
+#  @param chunk_size Parça boyutu (bayt).
+#  @return dest_path.
+def save_upload(file_obj, dest_path, chunk_size=UPLOAD_CHUNK_SIZE):
+    if hasattr(file_obj, "seek"):
+        file_obj.seek(0)
+    with open(dest_path, "wb") as f:
+        shutil.copyfileobj(file_obj, f, chunk_size)
+    return dest_path
+
+
+## @brief Tek bir arka plan işi; durum, ilerleme, sonuç ve çalışma klasörünü tutar.
+class Job:
+    ## @param workspace İşe özel geçici klasör.
+    #  @param title Arayüzde gösterilecek başlık.
+    def __init__(self, workspace, title=""):
+        self.id = uuid.uuid4().hex
+        self.title = title
+        self.workspace = workspace
+        self.status = PENDING
+        self.progress = 0.0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.input_path = None
+        self.dependencies = ()
+        self.created_at = time.time()
+        self.finished_at = None
+        self.accessed_at = None
+        self._cancel_event = threading.Event()
+
+    ## @brief Çalışma klasöründe bir dosya yolu döndürür.
+    def path(self, name):
+        return os.path.join(self.workspace, name)
+
+    @property
+    def done(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    ## @brief İptal istenmişse JobCancelled yükseltir.
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    ## @brief İlerlemeyi günceller; iptal istenmişse işi durdurur.
+    #  @param fraction 0-1 arası ilerleme.
+    #  @param message İsteğe bağlı durum mesajı.
+    def report_progress(self, fraction, message=None):
+        self.check_cancelled()
+        self.progress = min(1.0, max(0.0, fraction))
+        if message is not None:
+            self.message = message
+
+    ## @brief İşin iptalini ister; iş bir sonraki ilerleme bildiriminde durur.
+    def cancel(self):
+        self._cancel_event.set()
+
+
+## @brief Sınırlı iş parçacığı havuzunda işleri çalıştıran servis.
+class JobService:
+    ## @param max_workers Aynı anda çalışabilecek en fazla iş sayısı.
+    #  @param workspace_root Çalışma klasörlerinin oluşturulacağı kök; None ise sistem geçici klasörü.
+    #  @param ttl Tamamlanan işlerin ve klasörlerinin saklanacağı süre (saniye).
+    def __init__(self, max_workers=DEFAULT_WORKERS, workspace_root=None, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self._root = tempfile.mkdtemp(prefix="moodlens_jobs_", dir=workspace_root)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="moodlens-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    ## @brief Yeni bir iş oluşturup kuyruğa ekler.
+    #  @param fn fn(job, *args, **kwargs) biçiminde çağrılacak fonksiyon; dönüş değeri job.result olur.
+    #  @param title Arayüzde gösterilecek başlık.
+    #  @param upload Çalışma klasörüne kaydedilecek yüklenmiş dosya; yolu job.input_path olur.
+    #  @param upload_name Yüklenen dosyanın çalışma klasöründeki adı.
+    #  @param depends_on Sonucu (ör. indirilen video) bu işte kullanılan işler; bu iş bitene kadar
+    #         klasörleri silinmez.
+    #  @return Oluşturulan Job.
+    def submit(self, fn, *args, title="", upload=None, upload_name="video.mp4", depends_on=(), **kwargs):
+        job = Job(tempfile.mkdtemp(prefix="job_", dir=self._root), title)
+        job.dependencies = tuple(depends_on)
+        with self._lock:
+            for dependency in job.dependencies:
+                dependency.accessed_at = time.time()
+            self._jobs[job.id] = job
+        # Temizlik iş kaydedildikten sonra yapılır; böylece bağımlı olunan klasörler korunur
+        self.cleanup()
+        try:
+            if upload is not None:
+                job.input_path = save_upload(upload, job.path(upload_name))
+        except Exception:
+            with self._lock:
+                del self._jobs[job.id]
+            shutil.rmtree(job.workspace, ignore_errors=True)
+            raise
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        try:
+            job.check_cancelled()
+            job.status = RUNNING
+            job.result = fn(job, *args, **kwargs)
+            job.progress = 1.0
+            job.status = DONE
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            traceback.print_exc()
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = FAILED
+        finally:
+            job.finished_at = job.accessed_at = time.time()
+            if job.status != DONE:
+                shutil.rmtree(job.workspace, ignore_errors=True)
+
+    ## @brief Kimliği verilen işi döndürür; bulunamazsa None.
+    #  @details Tamamlanmış işin saklama süresi bu erişimden itibaren yeniden başlar; arayüz sonucu
+    #           göstermeye devam ettikçe klasör silinmez.
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.done:
+                job.accessed_at = time.time()
+            return job
+
+    ## @brief İşin iptalini ister.
+    #  @return İş bulunduysa True.
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is None:
+            return False
+        job.cancel()
+        return True
+
+    ## @brief Son erişimden bu yana saklama süresi dolan tamamlanmış işleri ve çalışma klasörlerini siler.
+    #  @details Süren bir işin bağımlı olduğu işler süreleri dolmuş olsa da silinmez.
+    #  @return Silinen iş sayısı.
+    def cleanup(self):
+        now = time.time()
+        with self._lock:
+            in_use = {id(dependency) for job in self._jobs.values() if not job.done
+                      for dependency in job.dependencies}
+            expired = [job for job in self._jobs.values()
+                       if job.done and job.accessed_at is not None and now - job.accessed_at > self.ttl
+                       and id(job) not in in_use]
+            for job in expired:
+                del self._jobs[job.id]
+        for job in expired:
+            shutil.rmtree(job.workspace, ignore_errors=True)
+        return len(expired)
+
+    ## @brief Tüm işleri iptal eder, havuzu kapatır ve çalışma klasörlerini siler.
+    def shutdown(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.cancel()
+        self._executor.shutdown(wait=True)
+        shutil.rmtree(self._root, ignore_errors=True)
+
+
+## @brief Süreç genelinde paylaşılan iş servisini döndürür.
+#  @details Streamlit betiği her etkileşimde yeniden çalışsa da servis (ve iş havuzu) tektir;
+#           böylece tüm kullanıcıların işleri aynı sınırlı havuzu paylaşır.
+def get_job_service():
+    global _default_service
+    with _default_service_lock:
+        if _default_service is None:
+            _default_service = JobService()
+            atexit.register(_default_service.shutdown)
+        return _default_service
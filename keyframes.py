@@ -0,0 +1,118 @@
+##
+# @file keyframes.py
+# @brief Sahne değişimi ve hareket sinyallerine göre analiz edilecek kareleri seçen uyarlanabilir örnekleyici.
+# @details Sabit "her N karede bir" örnekleme, neredeyse durağan konuşan kişi görüntülerinde gereğinden
+#          fazla çıkarım yapar; hızlı kesmelerde ise yeni sahnenin yüzlerini geç yakalar. Bu örnekleyici
+#          her kareyi küçük gri tonlamalı bir küçük resme (thumbnail) indirip iki ucuz sinyal hesaplar:
+#          - Kesme: art arda iki karenin gri histogramları arasındaki Bhattacharyya uzaklığı.
+#          - Hareket: son analiz edilen kareye göre ortalama mutlak piksel farkı (0-1 aralığında).
+#
+#          Kesmeden hemen sonraki kare, hareket eşiğini aşan kareler ve en uzun aralık (max_gap) dolunca
+#          bir kare analiz edilir; neredeyse aynı kalan kareler atlanır. Analiz hızı bir jeton kovasıyla
+#          (token bucket) saniyede max_rate kareyle sınırlanır; kova kısa patlamalar için burst jeton tutar.
+#
+#          Her örneğin özet sürelerine katkısı, kendisinden bir sonraki örneğe (son örnek için videonun
+#          sonuna) kadar geçen süredir; ilk örnek videonun başından itibaren sayılır (bkz. sample_seconds).
+##
+
+import cv2
+import numpy as np
+
+## @brief Örnekleme modları: sabit aralık ya da sahne değişimine göre uyarlanabilir.
+SAMPLING_MODES = ("fixed", "adaptive")
+DEFAULT_MAX_RATE = 6.0
+DEFAULT_MIN_RATE = 0.5
+DEFAULT_BURST = 2.0
+DEFAULT_MOTION_THRESHOLD = 0.03
+DEFAULT_CUT_THRESHOLD = 0.35
+THUMB_SIZE = (64, 36)
+## @brief Küçük resmin her pikseli, bu kadar kat büyük ara görüntünün pikselleri ortalanarak bulunur.
+THUMB_OVERSAMPLE = 4
+HIST_BINS = 32
+
+
+## @brief Karelerin analiz edilip edilmeyeceğine akış sırasında karar veren örnekleyici.
+#  @details Kullanım: her kare için sırayla should_analyze çağrılır; True dönen kareler analiz edilir.
+#           Analiz edilen karelerin numaraları samples listesinde tutulur.
+class AdaptiveSampler:
+    ## @param fps Videonun kare hızı.
+    #  @param max_rate Saniyede analiz edilecek en fazla kare sayısı (bütçe).
+    #  @param min_rate Görüntü değişmese de saniyede analiz edilecek en az kare sayısı.
+    #  @param burst Bütçe içinde art arda harcanabilecek en fazla jeton (kesmeden hemen sonra analiz için).
+    #  @param motion_threshold Son analiz edilen kareye göre ortalama mutlak fark eşiği (0-1).
+    #  @param cut_threshold Art arda iki kare arasındaki histogram uzaklığı eşiği (0-1).
+    def __init__(self, fps, max_rate=DEFAULT_MAX_RATE, min_rate=DEFAULT_MIN_RATE, burst=DEFAULT_BURST,
+                 motion_threshold=DEFAULT_MOTION_THRESHOLD, cut_threshold=DEFAULT_CUT_THRESHOLD):
+        if max_rate <= 0 or min_rate <= 0 or min_rate > max_rate:
+            raise ValueError("0 < min_rate <= max_rate olmalı")
+        self.fps = fps
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.burst = max(1.0, burst)
+        self.motion_threshold = motion_threshold
+        self.cut_threshold = cut_threshold
+        self._refill = max_rate / fps
+        self._max_gap = fps / min_rate
+        self._tokens = self.burst
+        self._reference = None
+        self._previous_hist = None
+        self._cut_pending = False
+        ## @brief Son analiz edilen kare bir sahne kesmesinden sonra mı seçildi.
+        self.cut = False
+        ## @brief Analiz edilen karelerin numaraları (artan sırada).
+        self.samples = []
+
+    ## @brief Karenin analiz edilip edilmeyeceğine karar verir.
+    #  @param frame_no Karenin numarası (artan sırada).
+    #  @param frame BGR kare.
+    #  @return Analiz edilecekse True.
+    def should_analyze(self, frame_no, frame):
+        # Tam karede INTER_AREA pahalıdır; önce en yakın komşuyla küçültülür, sonra ortalanarak gürültü azaltılır
+        width, height = THUMB_SIZE
+        thumb = cv2.resize(frame, (width * THUMB_OVERSAMPLE, height * THUMB_OVERSAMPLE),
+                           interpolation=cv2.INTER_NEAREST)
+        thumb = cv2.resize(thumb, THUMB_SIZE, interpolation=cv2.INTER_AREA)
+        if thumb.ndim == 3:
+            thumb = cv2.cvtColor(thumb, cv2.COLOR_BGR2GRAY)
+        hist = cv2.calcHist([thumb], [0], None, [HIST_BINS], [0, 256])
+        cv2.normalize(hist, hist)
+        if self._previous_hist is not None and \
+                cv2.compareHist(self._previous_hist, hist, cv2.HISTCMP_BHATTACHARYYA) >= self.cut_threshold:
+            self._cut_pending = True
+        self._previous_hist = hist
+        self._tokens = min(self.burst, self._tokens + self._refill)
+
+        if self._reference is None:
+            analyze = True
+        elif self._tokens < 1:
+            analyze = False
+        elif self._cut_pending or frame_no - self.samples[-1] >= self._max_gap:
+            analyze = True
+        else:
+            motion = cv2.absdiff(thumb, self._reference).mean() / 255.0
+            analyze = motion >= self.motion_threshold
+        if not analyze:
+            return False
+
+        self._tokens = max(0.0, self._tokens - 1)
+        self._reference = thumb
+        self.cut = self._cut_pending
+        self._cut_pending = False
+        self.samples.append(frame_no)
+        return True
+
+
+## @brief Her örneğin temsil ettiği süreyi hesaplar.
+#  @param samples Analiz edilen karelerin artan sıradaki numaraları (1 tabanlı).
+#  @param total_frames Videodaki (okunan) kare sayısı.
+#  @param fps Videonun kare hızı.
+#  @return samples ile aynı uzunlukta saniye dizisi; bir örnek, kendisinden sonraki örneğe kadar olan
+#          kareleri, ilk örnek ayrıca videonun başındaki kareleri temsil eder.
+def sample_seconds(samples, total_frames, fps):
+    samples = np.asarray(samples, dtype=np.int64)
+    if not len(samples):
+        return np.zeros(0)
+    ends = np.append(samples[1:], total_frames + 1)
+    starts = samples.copy()
+    starts[0] = 1
+    return (ends - starts) / fps
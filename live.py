@@ -0,0 +1,216 @@
+##
+# @file live.py
+# @brief Canlı analiz için yakalama, çıkarım ve gösterimi birbirinden ayıran iş parçacıkları.
+# @details Yakalama iş parçacığı kaynaktan sürekli okur ve yalnızca en son kareyi tutar; eski
+#          kareler kuyrukta birikmez. Çıkarım iş parçacığı en son kareyi alıp analiz eder ve
+#          sonuçları yayımlar. Gösterim döngüsü beklemeden en son kareye en son sonuçları çizer.
+#          Yakalamadan sonuç üretimine kadar geçen süre hedef gecikmenin altında kalacak şekilde
+#          algılamanın çözünürlüğü (ölçeği) uyarlanır.
+#
+#          Kaynak olarak kamera indeksi, video dosyası ya da SyntheticSource verilebilir; böylece
+#          canlı mod ekran ve kamera olmadan da (headless) çalıştırılabilir.
+##
+
+import threading
+import time
+
+import cv2
+import numpy as np
+
+DEFAULT_TARGET_LATENCY = 0.2
+MIN_DETECT_SCALE = 0.4
+SCALE_DOWN = 0.85
+SCALE_UP = 1.1
+## @brief Gecikme hedefin bu oranının altına inince ölçek yeniden büyütülür (hedef çevresinde salınımı önler).
+SCALE_UP_MARGIN = 0.7
+LATENCY_PERCENTILES = (50, 90, 99)
+
+
+## @brief Üzerinde yüze benzer bir dikdörtgen gezinen yapay kare kaynağı.
+#  @details cv2.VideoCapture ile aynı read/isOpened/release arayüzünü sunar.
+class SyntheticSource:
+    ## @param width Kare genişliği.
+    #  @param height Kare yüksekliği.
+    #  @param fps Kare üretim hızı; read bu hıza göre bekler.
+    #  @param n_frames Üretilecek kare sayısı; None ise sınırsız.
+    def __init__(self, width=640, height=480, fps=30, n_frames=None):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.n_frames = n_frames
+        self._index = 0
+        self._next_time = None
+        self._open = True
+
+    def isOpened(self):
+        return self._open
+
+    def read(self):
+        if not self._open or (self.n_frames is not None and self._index >= self.n_frames):
+            return False, None
+        now = time.monotonic()
+        if self._next_time is not None and now < self._next_time:
+            time.sleep(self._next_time - now)
+        self._next_time = max(now, self._next_time or now) + 1.0 / self.fps
+
+        frame = np.full((self.height, self.width, 3), 40, dtype=np.uint8)
+        size = min(self.width, self.height) // 4
+        x = int((self.width - size) * (0.5 + 0.5 * np.sin(self._index / 30)))
+        y = (self.height - size) // 2
+        cv2.rectangle(frame, (x, y), (x + size, y + size), (180, 200, 230), -1)
+        self._index += 1
+        return True, frame
+
+    def release(self):
+        self._open = False
+
+
+## @brief Kaynak tanımından okunabilir bir yakalama nesnesi oluşturur.
+#  @param source Kamera indeksi (int), video dosyası yolu (str) ya da read() metodu olan nesne.
+#  @return (capture, gerçek zamanlı hızda oynatılsın mı) ikilisi; dosyalar kendi fps'leriyle oynatılır.
+def open_source(source):
+    if hasattr(source, "read"):
+        return source, False
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise RuntimeError(f"Kaynak açılamadı: {source}")
+    return cap, isinstance(source, str)
+
+
+## @brief Yalnızca en son kareyi tutan, iş parçacıkları arası paylaşılan tutucu.
+class LatestFrame:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._frame = None
+        self._captured_at = None
+        self._seq = 0
+        self.closed = False
+
+    ## @brief Yeni kareyi yayımlar; önceki kare okunmamış olsa bile üzerine yazılır.
+    def put(self, frame, captured_at):
+        with self._cond:
+            self._frame, self._captured_at = frame, captured_at
+            self._seq += 1
+            self._cond.notify_all()
+
+    ## @brief after_seq'ten daha yeni bir kare gelene kadar bekler.
+    #  @param after_seq Son görülen sıra numarası.
+    #  @param timeout En fazla bekleme süresi (saniye); None ise beklemeden döner.
+    #  @return (seq, frame, captured_at); yeni kare yoksa frame None olabilir.
+    def get(self, after_seq=0, timeout=None):
+        with self._cond:
+            if timeout is not None:
+                self._cond.wait_for(lambda: self._seq > after_seq or self.closed, timeout)
+            return self._seq, self._frame, self._captured_at
+
+    ## @brief Kaynağın bittiğini bildirir ve bekleyenleri uyandırır.
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+## @brief Kaynaktan sürekli okuyup en son kareyi LatestFrame'e koyan iş parçacığı.
+class CaptureThread(threading.Thread):
+    ## @param cap read() metodu olan yakalama nesnesi.
+    #  @param latest Karelerin yayımlanacağı LatestFrame.
+    #  @param realtime True ise kareler kaynağın fps'ine göre beklenerek okunur (video dosyaları için).
+    def __init__(self, cap, latest, realtime=False):
+        super().__init__(name="live-capture", daemon=True)
+        self.cap = cap
+        self.latest = latest
+        self.realtime = realtime
+        self.frames_captured = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        fps = self.cap.get(cv2.CAP_PROP_FPS) if self.realtime else 0
+        period = 1.0 / fps if fps and fps > 0 else 0
+        next_time = time.monotonic()
+        try:
+            while not self._stop_event.is_set():
+                ret, frame = self.cap.read()
+                if not ret:
+                    break
+                self.frames_captured += 1
+                self.latest.put(frame, time.monotonic())
+                if period:
+                    next_time += period
+                    self._stop_event.wait(max(0.0, next_time - time.monotonic()))
+        finally:
+            self.latest.close()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+## @brief En son kareyi analiz edip sonuçları yayımlayan çıkarım iş parçacığı.
+#  @details Her analizden sonra yakalama anından sonucun hazır olmasına kadar geçen süre ölçülür.
+#           İşçi her zaman en son kareyi aldığından bu süre, karenin beklediği en fazla bir kare
+#           süresi ile analizin kendi süresinden oluşur; analizler arasına bekleme koymak onu
+#           kısaltmaz. Bu yüzden gecikme hedefi aşınca algılama ölçeği küçültülür (daha küçük
+#           karede algılama daha hızlıdır, küçük yüzler kaçabilir), hedefin belirgin biçimde altına
+#           inince yeniden büyütülür. En küçük ölçekte de hedef aşılıyorsa gecikme analizin kendi
+#           süresiyle sınırlı kalır.
+class InferenceWorker(threading.Thread):
+    ## @param latest Karelerin okunacağı LatestFrame.
+    #  @param analyze (frame, scale) -> [(kutu, isim, duygu_etiketi, duygu_skoru)] döndüren fonksiyon; scale
+    #         algılamanın yapılacağı çözünürlüğün tam çözünürlüğe oranıdır (MIN_DETECT_SCALE - 1).
+    #  @param target_latency Hedef yakalama→sonuç gecikmesi (saniye).
+    def __init__(self, latest, analyze, target_latency=DEFAULT_TARGET_LATENCY):
+        super().__init__(name="live-inference", daemon=True)
+        self.latest = latest
+        self.analyze = analyze
+        self.target_latency = target_latency
+        self.scale = 1.0
+        self.frames_analyzed = 0
+        self.result_latencies = []
+        self.error = None
+        self._lock = threading.Lock()
+        self._result = ([], None)
+        self._stop_event = threading.Event()
+
+    ## @brief En son analiz sonuçlarını ve ait oldukları karenin yakalanma zamanını döndürür.
+    def result(self):
+        with self._lock:
+            return self._result
+
+    def run(self):
+        seq = 0
+        try:
+            while not self._stop_event.is_set():
+                new_seq, frame, captured_at = self.latest.get(seq, timeout=0.1)
+                if new_seq == seq or frame is None:
+                    if self.latest.closed:
+                        break
+                    continue
+                seq = new_seq
+                annotations = self.analyze(frame, self.scale)
+                with self._lock:
+                    self._result = (annotations, captured_at)
+                self.frames_analyzed += 1
+
+                latency = time.monotonic() - captured_at
+                self.result_latencies.append(latency)
+                self._adapt(latency)
+        except Exception as e:
+            self.error = e
+
+    def _adapt(self, latency):
+        if latency > self.target_latency:
+            self.scale = max(MIN_DETECT_SCALE, self.scale * SCALE_DOWN)
+        elif latency < self.target_latency * SCALE_UP_MARGIN:
+            self.scale = min(1.0, self.scale * SCALE_UP)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+## @brief Gecikme ölçümlerinin yüzdeliklerini milisaniye cinsinden hesaplar.
+#  @param latencies Saniye cinsinden gecikmeler.
+#  @return {"p50": ..., "p90": ..., "p99": ...}; ölçüm yoksa boş sözlük.
+def latency_percentiles(latencies, percentiles=LATENCY_PERCENTILES):
+    if not latencies:
+        return {}
+    values = np.percentile(np.asarray(latencies) * 1000, percentiles)
+    return {f"p{p}": round(float(v), 1) for p, v in zip(percentiles, values)}
@@ -0,0 +1,158 @@
+##
+# @file media.py
+# @brief ffmpeg tabanlı video ve ses yardımcıları.
+# @details ffmpeg ikili dosyası PATH'te ya da moviepy ile gelen imageio-ffmpeg paketinde aranır.
+#          ffmpeg bulunamazsa çağıran taraf OpenCV ile çalışan yedek yola geçer.
+##
+
+import os
+import shutil
+import subprocess
+import tempfile
+
+import cv2
+import numpy as np
+
+AUDIO_SAMPLE_RATE = 16000
+
+
+## @brief Kullanılabilir ffmpeg ikili dosyasının yolunu döndürür.
+#  @return ffmpeg yolu ya da bulunamazsa None.
+def find_ffmpeg():
+    path = shutil.which("ffmpeg")
+    if path:
+        return path
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return None
+
+
+## @brief Aynı kodlayıcı ve boyuttaki video parçalarını sırayla tek dosyada birleştirir.
+#  @details ffmpeg varsa concat demuxer ile yeniden kodlamadan (stream copy) birleştirilir;
+#           yoksa parçalar OpenCV ile okunup tek bir VideoWriter'a yazılır.
+#  @param chunk_paths Sıralı parça dosyaları.
+#  @param output_path Birleştirilmiş çıktı dosyası.
+#  @param fps Yedek yol için kare hızı.
+#  @param frame_size Yedek yol için (genişlik, yükseklik).
+def concat_videos(chunk_paths, output_path, fps, frame_size):
+    ffmpeg = find_ffmpeg()
+    if ffmpeg:
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as f:
+            for path in chunk_paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+            list_path = f.name
+        try:
+            result = subprocess.run([ffmpeg, "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+                                     "-i", list_path, "-c", "copy", output_path],
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            if result.returncode == 0:
+                return
+            print(f"ffmpeg birleştirme hatası, OpenCV ile devam ediliyor: {result.stderr.decode(errors='ignore')}")
+        finally:
+            os.remove(list_path)
+
+    out = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, frame_size)
+    try:
+        for path in chunk_paths:
+            cap = cv2.VideoCapture(path)
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                out.write(frame)
+            cap.release()
+    finally:
+        out.release()
+
+
+## @brief Videoda ses akışı olup olmadığını ffmpeg çıktısından anlar.
+#  @param ffmpeg ffmpeg yolu.
+#  @param video_path Video dosyası.
+#  @return Ses akışı varsa True.
+def has_audio_stream(ffmpeg, video_path):
+    result = subprocess.run([ffmpeg, "-hide_banner", "-i", video_path],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    return b"Audio:" in result.stderr
+
+
+## @brief Tek bir ffmpeg çözme geçişinden hem BGR kareleri hem de mono PCM sesi akıtan demuxer.
+#  @details Görüntü stdout'tan rawvideo (bgr24), ses ayrı bir boru (pipe) üzerinden s16le olarak
+#           okunur; geçici WAV dosyası yazılmaz. frames() ve audio_blocks() farklı iş parçacıklarında
+#           eşzamanlı tüketilmelidir, aksi halde ffmpeg dolan boruda bekler.
+#  @note Ek dosya tanıtıcısı (pass_fds) gerektirdiğinden yalnızca POSIX sistemlerde kullanılabilir.
+class AVDemuxer:
+    ## @param video_path Video dosyası.
+    #  @param width Kare genişliği.
+    #  @param height Kare yüksekliği.
+    #  @param sample_rate Ses örnekleme hızı.
+    #  @param ffmpeg ffmpeg yolu; None ise find_ffmpeg().
+    def __init__(self, video_path, width, height, sample_rate=AUDIO_SAMPLE_RATE, ffmpeg=None):
+        ffmpeg = ffmpeg or find_ffmpeg()
+        if ffmpeg is None or os.name == "nt":
+            raise RuntimeError("AVDemuxer için POSIX üzerinde ffmpeg gerekir.")
+        self.width = width
+        self.height = height
+        self.sample_rate = sample_rate
+        self.has_audio = has_audio_stream(ffmpeg, video_path)
+
+        cmd = [ffmpeg, "-hide_banner", "-loglevel", "error", "-i", video_path,
+               "-map", "0:v:0", "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "pipe:1"]
+        pass_fds = ()
+        self._audio = None
+        if self.has_audio:
+            audio_r, audio_w = os.pipe()
+            cmd += ["-map", "0:a:0", "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1",
+                    "-ar", str(sample_rate), f"pipe:{audio_w}"]
+            pass_fds = (audio_w,)
+        self._process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                         pass_fds=pass_fds)
+        if self.has_audio:
+            os.close(audio_w)
+            self._audio = os.fdopen(audio_r, "rb")
+
+    ## @brief Kareleri sırayla verir.
+    def frames(self):
+        frame_size = self.width * self.height * 3
+        while True:
+            data = self._process.stdout.read(frame_size)
+            if len(data) < frame_size:
+                return
+            yield np.frombuffer(data, dtype=np.uint8).reshape(self.height, self.width, 3).copy()
+
+    ## @brief Sesi int16 mono bloklar halinde verir.
+    #  @param block_sec Blok uzunluğu (saniye).
+    def audio_blocks(self, block_sec=1.0):
+        if self._audio is None:
+            return
+        block_bytes = max(2, int(self.sample_rate * block_sec) * 2)
+        while True:
+            data = self._audio.read(block_bytes)
+            if not data:
+                return
+            yield np.frombuffer(data[:len(data) - len(data) % 2], dtype=np.int16)
+
+    ## @brief ffmpeg sürecini durdurur; iki borunun okuyucusu da dosya sonuna ulaşır.
+    #  @details Akışlardan birinin okuyucusu hata verip okumayı bıraktığında ffmpeg o boruya yazarken
+    #           bekler ve diğer akışı da üretmez; bu durumda diğer okuyucunun sonsuza dek beklememesi
+    #           için çağrılır. Borular kapatılmaz; close ayrıca çağrılmalıdır.
+    def terminate(self):
+        if self._process.poll() is None:
+            self._process.kill()
+
+    ## @brief ffmpeg sürecini sonlandırır ve boruları kapatır.
+    def close(self):
+        if self._process.poll() is None:
+            self._process.kill()
+        self._process.wait()
+        self._process.stdout.close()
+        if self._audio is not None:
+            self._audio.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,215 @@
+##
+# @file model_registry.py
+# @brief Süreç genelinde paylaşılan, tembel yüklenen ve iş parçacığı güvenli model kayıt defteri.
+# @details KNN kimlik modeli ve duygu CNN'i süreç başına bir kez yüklenir; Haar cascade ise
+#          eşzamanlı kullanıma dayanıklı olmadığından iş parçacığı başına bir kez yüklenir.
+#          Duygu CNN'i Keras ya da (emotion_runtime ile aktarılmış) TFLite arka ucuyla çalışabilir.
+#          Model dosyası diskte değişirse (mtime/boyut) bir sonraki istekte yeniden yüklenir.
+#          Ağır kütüphaneler (deepface, keras) yalnızca ilgili model ilk kez istendiğinde içe aktarılır.
+##
+
+import os
+import threading
+
+KNN_MODEL_PATH = "face_knn_model.pkl"
+IDENTITY_INDEX_PATH = "face_index.npz"
+EMOTION_MODEL_PATH = os.environ.get("MOODLENS_EMOTION_MODEL", "model_dropout.h5")
+EMOTION_TFLITE_PATH = os.environ.get("MOODLENS_EMOTION_TFLITE", "model_dropout.tflite")
+EMOTION_BACKENDS = {"keras": "emotion", "tflite": "emotion_tflite"}
+FACE_CASCADE_NAME = "haarcascade_frontalface_default.xml"
+DNN_MODEL_PATH = os.path.join("face_detector", "res10_300x300_ssd_iter_140000.caffemodel")
+DNN_CONFIG_PATH = os.path.join("face_detector", "deploy.prototxt")
+
+_registry_lock = threading.Lock()
+_entries = {}
+_warmup_thread = None
+_thread_local = threading.local()
+
+
+## @brief Kayıt defterindeki tek bir modelin durumunu tutar.
+class _ModelEntry:
+    def __init__(self, loader, path=None):
+        self.loader = loader
+        self.path = path
+        self.lock = threading.Lock()
+        self.model = None
+        self.signature = None
+        self.loaded = False
+
+
+## @brief Dosyanın değişip değişmediğini anlamak için (mtime, boyut) imzası döndürür.
+#  @param path Model dosyasının yolu, yol demeti ya da dosyaya bağlı olmayan model için None.
+#  @return İmza ya da None.
+def _file_signature(path):
+    if path is None:
+        return None
+    if isinstance(path, tuple):
+        return tuple(_file_signature(p) for p in path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+## @brief Bir modeli kayıt defterine ekler ya da mevcut kaydı değiştirir.
+#  @param key Modelin anahtarı (ör. "knn").
+#  @param loader Modeli yükleyen fonksiyon; path verilmişse path parametresiyle çağrılır.
+#  @param path Değişiklikleri izlenecek model dosyası ya da dosyalar demeti (isteğe bağlı).
+def register_model(key, loader, path=None):
+    with _registry_lock:
+        _entries[key] = _ModelEntry(loader, path)
+
+
+## @brief Anahtara karşılık gelen modeli döndürür, gerekirse yükler ya da yeniden yükler.
+#  @param key Modelin anahtarı.
+#  @return Yüklü model nesnesi.
+#  @throws KeyError Anahtar kayıtlı değilse.
+def get_model(key):
+    with _registry_lock:
+        entry = _entries[key]
+
+    signature = _file_signature(entry.path)
+    if entry.loaded and signature == entry.signature:
+        return entry.model
+
+    with entry.lock:
+        # Başka bir iş parçacığı kilidi beklerken modeli yüklemiş olabilir
+        signature = _file_signature(entry.path)
+        if not entry.loaded or signature != entry.signature:
+            entry.model = entry.loader(entry.path) if entry.path is not None else entry.loader()
+            entry.signature = signature
+            entry.loaded = True
+        return entry.model
+
+
+## @brief Kayıtlı modellerin bir sonraki istekte yeniden yüklenmesini sağlar.
+#  @param key Yalnızca bu modeli sıfırla; None ise tümünü sıfırla.
+def reload_models(key=None):
+    with _registry_lock:
+        entries = list(_entries.values()) if key is None else [_entries[key]]
+    for entry in entries:
+        with entry.lock:
+            entry.loaded = False
+            entry.model = None
+
+
+def _load_face_cascade():
+    import cv2
+    return cv2.CascadeClassifier(cv2.data.haarcascades + FACE_CASCADE_NAME)
+
+
+## @brief OpenCV DNN yüz dedektörünü (ResNet-10 SSD, Caffe) CPU üzerinde çalışacak şekilde yükler.
+def _load_face_dnn(paths):
+    import cv2
+
+    model_path, config_path = paths
+    if not (os.path.exists(model_path) and os.path.exists(config_path)):
+        raise FileNotFoundError(f"DNN yüz dedektörü için {model_path} ve {config_path} gerekli.")
+    net = cv2.dnn.readNetFromCaffe(config_path, model_path)
+    net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+    net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+    return net
+
+
+## @brief Kimlik modelini yükler: face_index.npz varsa onu, yoksa KNN pickle'ını dönüştürerek.
+def _load_identity_model(paths):
+    from identity_index import load_identity_model
+
+    index_path, knn_path = paths
+    return load_identity_model(index_path if os.path.exists(index_path) else knn_path)
+
+
+def _load_emotion_model(path):
+    from keras.models import load_model
+    return load_model(path)
+
+
+## @brief emotion_runtime.export_tflite ile üretilmiş .tflite duygu modelini yükler.
+def _load_emotion_tflite(path):
+    from emotion_runtime import TFLiteEmotionModel
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} bulunamadı; önce 'python emotion_runtime.py export' çalıştırın.")
+    return TFLiteEmotionModel(path)
+
+
+def _load_facenet():
+    from deepface import DeepFace
+    return DeepFace.build_model("Facenet")
+
+
+register_model("face_dnn", _load_face_dnn, (DNN_MODEL_PATH, DNN_CONFIG_PATH))
+register_model("knn", _load_identity_model, (IDENTITY_INDEX_PATH, KNN_MODEL_PATH))
+register_model("emotion", _load_emotion_model, EMOTION_MODEL_PATH)
+register_model("emotion_tflite", _load_emotion_tflite, EMOTION_TFLITE_PATH)
+register_model("facenet", _load_facenet)
+
+
+## @brief Çağıran iş parçacığına ait Haar cascade yüz dedektörünü döndürür.
+#  @details Aynı cv2.CascadeClassifier ile eşzamanlı detectMultiScale çağrıları OpenCV içinde
+#           çökmeye yol açar (aynı anda birden fazla video analiz edildiğinde görülür). Bu yüzden her
+#           iş parçacığı kendi örneğini ilk çağrıda yükler (~20 ms); iş havuzlarında iş parçacıkları
+#           yeniden kullanıldığından bu maliyet bir kez ödenir.
+def get_face_cascade():
+    cascade = getattr(_thread_local, "face_cascade", None)
+    if cascade is None:
+        cascade = _thread_local.face_cascade = _load_face_cascade()
+    return cascade
+
+
+## @brief Paylaşılan OpenCV DNN yüz dedektörünü döndürür.
+def get_face_dnn():
+    return get_model("face_dnn")
+
+
+## @brief Paylaşılan kimlik modelini (IdentityIndex) döndürür.
+#  @details KNeighborsClassifier ile aynı predict arayüzüne sahiptir; tanınmayan yüzler için "Bilinmiyor" döner.
+def get_knn_model():
+    return get_model("knn")
+
+
+## @brief Varsayılan duygu modeli arka ucunun adını döndürür.
+def default_emotion_backend():
+    return os.environ.get("MOODLENS_EMOTION_BACKEND", "keras")
+
+
+## @brief Paylaşılan duygu CNN modelini döndürür.
+#  @param backend "keras" ya da "tflite"; None ise MOODLENS_EMOTION_BACKEND, o da yoksa "keras".
+#  @return predict(x, verbose=0) metodu olan model; her iki arka uç da (N, 1) "Sad" olasılığı döndürür.
+def get_emotion_model(backend=None):
+    backend = backend or default_emotion_backend()
+    if backend not in EMOTION_BACKENDS:
+        raise ValueError(f"Bilinmeyen duygu modeli arka ucu: {backend}")
+    return get_model(EMOTION_BACKENDS[backend])
+
+
+## @brief Tüm modelleri yükler ve ilk çıkarımın maliyetini önceden öder.
+#  @details Facenet ağırlıkları DeepFace'in kendi önbelleğine alınır, duygu modeli sahte bir
+#           girdiyle bir kez çalıştırılır. Hatalar yutulur; gerçek çağrıda tekrar denenir.
+def warm_up_models():
+    import numpy as np
+
+    for key in ("knn", EMOTION_BACKENDS.get(default_emotion_backend(), "emotion"), "facenet"):
+        try:
+            get_model(key)
+        except Exception as e:
+            print(f"Model ön yükleme hatası ({key}): {e}")
+
+    try:
+        get_emotion_model().predict(np.zeros((1, 48, 48, 3), dtype="float32"), verbose=0)
+    except Exception as e:
+        print(f"Model ısıtma hatası (emotion): {e}")
+
+
+## @brief Modelleri arka planda yükleyen iş parçacığını (süreç başına bir kez) başlatır.
+#  @details Streamlit her etkileşimde betiği yeniden çalıştırsa da iş parçacığı yalnızca ilk
+#           çağrıda başlatılır; arayüz modellerin yüklenmesini beklemeden görüntülenir.
+#  @return Isıtma iş parçacığı.
+def start_background_warmup():
+    global _warmup_thread
+    with _registry_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=warm_up_models, name="model-warmup", daemon=True)
+            _warmup_thread.start()
+        return _warmup_thread
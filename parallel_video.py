@@ -0,0 +1,186 @@
+##
+# @file parallel_video.py
+# @brief Tek bir uzun videoyu kare aralıklarına bölüp süreç havuzunda paralel analiz eder.
+# @details Her işçi süreç modelleri kendi model_registry örneğiyle bir kez yükler ve kendisine
+#          düşen kare aralığını functions._analyze_frames ile analiz eder. Kare numaraları video
+#          genelinde tutulduğundan skip_frames örneklemesi parça sınırlarında da seri çalışmayla
+#          aynı karelere denk gelir. Parça başlangıçları dedektörün tam tarama aralığına hizalanır;
+#          her parça seri çalışmanın da tam tarama yaptığı bir karede başladığından ROI durumu
+#          parça sınırlarında seri çalışmayla aynı kalır. Yüz sonuçları sırayla yeniden oynatılarak özet, seri
+#          analyze_video ile aynı sırada (ve aynı kayan nokta toplamlarıyla) oluşturulur.
+##
+
+import itertools
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+from detection import FULL_SCAN_INTERVAL
+from functions import SKIP_FRAMES, _analyze_frames, _record_face, analyze_video
+from event_log import EventLog
+from media import concat_videos
+from pipeline import FrameReader
+from results_store import FaceResults
+
+MIN_CHUNK_FRAMES = 250
+## @brief Parça uzunlukları bu sayının katına yuvarlanır: her parçanın ilk analiz edilen karesi tam taramadır.
+CHUNK_ALIGN = SKIP_FRAMES * FULL_SCAN_INTERVAL
+
+
+## @brief Videoyu verilen kareden itibaren okunacak şekilde açar.
+#  @details Önce doğrudan konumlanmayı (seek) dener; konum doğrulanamazsa baştan grab ile ilerler.
+#  @param video_path Video dosyası.
+#  @param start 0 tabanlı başlangıç karesi.
+#  @return Açık cv2.VideoCapture.
+def _open_at(video_path, start):
+    cap = cv2.VideoCapture(video_path)
+    if start == 0:
+        return cap
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    if int(cap.get(cv2.CAP_PROP_POS_FRAMES)) == start:
+        return cap
+
+    cap.release()
+    cap = cv2.VideoCapture(video_path)
+    for _ in range(start):
+        if not cap.grab():
+            break
+    return cap
+
+
+## @brief Bir kare aralığını analiz edip işaretlenmiş parçayı diske yazar (işçi süreçte çalışır).
+#  @param task (video_path, start, end, chunk_path, batch_size, track_faces, emotion_backend, render_mode);
+#         end None ise video sonuna kadar; render_mode "none" ise chunk_path None'dır ve parça yazılmaz.
+#  @return (okunan kare sayısı, yüz olayları listesi).
+def _analyze_chunk(task):
+    video_path, start, end, chunk_path, batch_size, track_faces, emotion_backend, render_mode = task
+    cap = _open_at(video_path, start)
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    out = None
+    if render_mode != "none":
+        out_fps = fps if render_mode == "full" else fps / SKIP_FRAMES
+        out = cv2.VideoWriter(chunk_path, cv2.VideoWriter_fourcc(*'mp4v'), out_fps, (width, height))
+    # Okuyucunun kare numaraları parça içinde 1'den başlar
+    keep = None if render_mode == "full" else (lambda frame_no: (start + frame_no) % SKIP_FRAMES == 0)
+    reader = FrameReader(cap, keep=keep)
+
+    events = []
+
+    def on_face(kare_no, name, emotion_label, emotion_score, box, track_id):
+        events.append((kare_no, name, emotion_label, emotion_score, box, track_id))
+
+    frames = reader if end is None else itertools.islice(reader, end - start)
+    try:
+        frame_count = _analyze_frames(frames, out.write if out else None, on_face, first_frame=start + 1,
+                                      batch_size=batch_size, track_faces=track_faces,
+                                      emotion_backend=emotion_backend)
+    finally:
+        reader.close()
+        cap.release()
+        if out:
+            out.release()
+    return frame_count, events
+
+
+## @brief Kare aralıklarını planlar.
+#  @param total_frames Videodaki (tahmini) kare sayısı.
+#  @param workers İşçi sayısı.
+#  @param chunk_frames Parça başına kare sayısı; None ise işçi başına yaklaşık bir parça. CHUNK_ALIGN katına
+#         yukarı yuvarlanır.
+#  @return (start, end) listesi; son parçanın end değeri None'dır (kare sayısı tahmini hatalı olabilir).
+def plan_chunks(total_frames, workers, chunk_frames=None):
+    if chunk_frames is None:
+        chunk_frames = max(MIN_CHUNK_FRAMES, -(-total_frames // workers))
+    chunk_frames = -(-chunk_frames // CHUNK_ALIGN) * CHUNK_ALIGN
+    starts = list(range(0, max(total_frames, 1), chunk_frames))
+    return [(start, starts[i + 1] if i + 1 < len(starts) else None) for i, start in enumerate(starts)]
+
+
+## @brief analyze_video ile aynı özeti, videoyu parçalara bölüp paralel analiz ederek üretir.
+#  @param video_path Analiz edilecek video dosyasının yolu.
+#  @param output_video_path Parçaların birleştirileceği işaretlenmiş çıktı videosu.
+#  @param log_path İşlem detaylarının kaydedileceği günlük dosyası.
+#  @param workers İşçi süreç sayısı; None ise çekirdek sayısı.
+#  @param chunk_frames Parça başına kare sayısı.
+#  @param batch_size Tek model çağrısında işlenecek en fazla yüz sayısı.
+#  @param track_faces Yüz izleme. Varsayılan False: izler parça sınırında yeniden başlayacağından
+#         seri çalışmayla birebir aynı sonuç yalnızca izleme kapalıyken garanti edilir.
+#  @param log_format Günlük biçimi: "text" ya da "jsonl".
+#  @param verbose 0 ise yüz satırları ekrana basılmaz.
+#  @param emotion_backend Duygu modeli arka ucu ("keras" ya da "tflite"); None ise varsayılan.
+#  @param render_mode Çıktı videosu: "full", "keyframes" ya da "none" (bkz. functions.analyze_video).
+#  @param on_progress on_progress(okunan kare, toplam kare) ile her parça bittiğinde çağrılır; bu fonksiyonun
+#         yükselttiği hata analizi durdurur (başlamamış parçalar iptal edilir, çalışanlar beklenir).
+#  @return analyze_video ile aynı biçimde özet sözlüğü.
+def analyze_video_parallel(video_path, output_video_path="analyzed_output.mp4", log_path="loglar.txt",
+                           workers=None, chunk_frames=None, batch_size=32, track_faces=False,
+                           log_format="text", verbose=1, emotion_backend=None, render_mode="full",
+                           on_progress=None):
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"Video açılamadı: {video_path}")
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+
+    workers = workers or os.cpu_count() or 1
+    chunks = plan_chunks(total_frames, workers, chunk_frames)
+    if total_frames <= 0 or len(chunks) == 1:
+        return analyze_video(video_path, output_video_path, log_path, batch_size=batch_size,
+                             track_faces=track_faces, log_format=log_format, verbose=verbose,
+                             on_progress=on_progress, emotion_backend=emotion_backend, render_mode=render_mode)
+
+    chunk_dir = tempfile.mkdtemp(prefix="moodlens_chunks_")
+    try:
+        tasks = [(video_path, start, end,
+                  os.path.join(chunk_dir, f"chunk_{i:05d}.mp4") if render_mode != "none" else None,
+                  batch_size, track_faces, emotion_backend, render_mode)
+                 for i, (start, end) in enumerate(chunks)]
+        # fork, ana süreçteki iş parçacıklarının (model ısıtma, kare okuyucu) tuttuğu kilitleri kopyalayabilir
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                                       mp_context=multiprocessing.get_context("spawn"))
+        try:
+            futures = [executor.submit(_analyze_chunk, task) for task in tasks]
+            chunk_results = []
+            for future in futures:
+                chunk_results.append(future.result())
+                if on_progress is not None:
+                    on_progress(sum(frame_count for frame_count, _ in chunk_results), total_frames)
+        finally:
+            executor.shutdown(cancel_futures=True)
+        if render_mode != "none":
+            out_fps = fps if render_mode == "full" else fps / SKIP_FRAMES
+            concat_videos([task[3] for task in tasks], output_video_path, out_fps, (width, height))
+    finally:
+        shutil.rmtree(chunk_dir, ignore_errors=True)
+    print("🎬 Video bitti.")
+
+    # Sonuçlar seri çalışmadakiyle aynı sırada toplanır
+    saniye = SKIP_FRAMES / fps
+    results = FaceResults(fps, saniye)
+    kişiler_süre = {}
+    duygular_süre = {}
+    with EventLog(log_path, log_format, verbose) as event_log:
+        for _, events in chunk_results:
+            for kare_no, name, emotion_label, emotion_score, box, track_id in events:
+                _record_face((kişiler_süre, duygular_süre), results, saniye, kare_no, name, emotion_label,
+                             emotion_score, box, track_id)
+                event_log.face(kare_no, name, emotion_label, emotion_score)
+
+    özet = {
+        "Toplam Kare": sum(frame_count for frame_count, _ in chunk_results),
+        "Kişi Bazında Toplam Süre (sn)": kişiler_süre,
+        "Duygu Bazında Toplam Süre (sn)": duygular_süre,
+        "Detaylı Sonuçlar": results
+    }
+
+    print(f"\n✅ İşlem tamamlandı! Çıkış videosu: {output_video_path}, Log dosyası: {log_path}")
+    return özet
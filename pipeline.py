@@ -0,0 +1,142 @@
+##
+# @file pipeline.py
+# @brief Video çözme (decode), çıkarım ve kodlama (encode) aşamalarını eşzamanlı çalıştıran yardımcılar.
+# @details cv2.VideoCapture.read ve cv2.VideoWriter.write çağrıları GIL'i bıraktığından, bunları
+#          ayrı iş parçacıklarında çalıştırmak çıkarım ile çakışmalarını sağlar. Aşamalar sınırlı
+#          kuyruklarla bağlanır; kuyruk dolduğunda üretici bekler (backpressure), böylece uzun
+#          1080p videolarda bellek kullanımı kuyruk boyutuyla sınırlı kalır. Kare sırası korunur.
+##
+
+import queue
+import threading
+
+import profiling
+
+DEFAULT_QUEUE_SIZE = 8
+
+_END = object()
+_POLL_INTERVAL = 0.1
+
+
+## @brief Durdurma olayı işaretlenene kadar kuyruğa eleman koymayı dener.
+#  @return Eleman konduysa True, aşama durdurulduysa False.
+def _put(q, item, stop_event):
+    while not stop_event.is_set():
+        try:
+            q.put(item, timeout=_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+## @brief Kareleri arka planda okuyan ve sırasıyla veren yineleyici.
+#  @details Kullanım: `for frame in FrameReader(cap): ...`. Video bittiğinde ya da okuma
+#           başarısız olduğunda yineleme sona erer; okuma sırasında oluşan hata tüketicide yükseltilir.
+#           keep verilirse istenmeyen kareler yalnızca grab ile geçilir (renk dönüşümü ve kopyalama
+#           yapılmaz) ve yerlerine None verilir; böylece kare numaraları değişmez.
+class FrameReader:
+    ## @param cap Açık bir cv2.VideoCapture nesnesi.
+    #  @param queue_size Bellekte bekletilecek en fazla çözülmüş kare sayısı.
+    #  @param keep keep(kare no) False dönen kareler çözülmez; kare numaraları 1 tabanlıdır. None ise hepsi.
+    def __init__(self, cap, queue_size=DEFAULT_QUEUE_SIZE, keep=None):
+        self._cap = cap
+        self._keep = keep
+        self._profiler = profiling.current()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="frame-reader", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        frame_no = 0
+        try:
+            while self._cap.isOpened() and not self._stop.is_set():
+                frame_no += 1
+                if self._keep is not None and not self._keep(frame_no):
+                    with self._profiler.stage("atlama"):
+                        ret, frame = self._cap.grab(), None
+                else:
+                    with self._profiler.stage("çözme"):
+                        ret, frame = self._cap.read()
+                if not ret:
+                    break
+                if not _put(self._queue, frame, self._stop):
+                    return
+        except Exception as e:
+            _put(self._queue, e, self._stop)
+            return
+        _put(self._queue, _END, self._stop)
+
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is _END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    ## @brief Okuyucu iş parçacığını durdurur ve bitmesini bekler.
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+## @brief Kareleri arka planda cv2.VideoWriter'a yazan aşama.
+#  @details write çağrısı yalnızca kuyruk doluysa bekler. Yazıcıda oluşan hata bir sonraki
+#           write ya da close çağrısında yükseltilir.
+class FrameWriter:
+    ## @param writer Açık bir cv2.VideoWriter (write metodu olan herhangi bir nesne).
+    #  @param queue_size Kodlanmayı bekleyebilecek en fazla kare sayısı.
+    def __init__(self, writer, queue_size=DEFAULT_QUEUE_SIZE):
+        self._writer = writer
+        self._profiler = profiling.current()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="frame-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _END:
+                return
+            try:
+                with self._profiler.stage("kodlama"):
+                    self._writer.write(item)
+            except Exception as e:
+                self._error = e
+                self._stop.set()
+                return
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+    ## @brief Kareyi kodlama kuyruğuna ekler.
+    #  @param frame Yazılacak kare.
+    def write(self, frame):
+        self._raise_error()
+        if not _put(self._queue, frame, self._stop):
+            self._raise_error()
+
+    ## @brief Kuyruktaki tüm karelerin yazılmasını bekler ve iş parçacığını kapatır.
+    def close(self):
+        if self._thread.is_alive():
+            _put(self._queue, _END, self._stop)
+            self._thread.join()
+        self._raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,125 @@
+##
+# @file profiling.py
+# @brief Analiz aşamalarının (çözme, algılama, gömme, KNN, duygu, çizim, kodlama) süre ölçümü.
+# @details Ölçüm, `with profiling.enabled() as profiler:` bloğu içinde etkinleşir; blok dışında
+#          current() hiçbir şey yapmayan paylaşılan bir NullProfiler döndürür, böylece kapalıyken
+#          maliyet yalnızca bir ContextVar okuması ve boş bir with bloğudur.
+#
+#          Ölçüm noktaları etkin profili current() ile bulur. Ayrı iş parçacıklarında çalışan
+#          aşamalar (ör. pipeline.FrameReader) profili oluşturuldukları anda yakalar.
+##
+
+import contextlib
+import contextvars
+import threading
+import time
+
+import numpy as np
+
+PERCENTILES = (50, 90, 99)
+## @brief Histogram kova üst sınırları (milisaniye); son kova sınırsızdır.
+HISTOGRAM_BUCKETS_MS = (1, 5, 10, 50, 100, 500)
+
+
+## @brief Hiçbir şey ölçmeyen profil; ölçüm kapalıyken kullanılır.
+class NullProfiler:
+    enabled = False
+    _NULL_CONTEXT = contextlib.nullcontext()
+
+    def stage(self, name, count=1):
+        return self._NULL_CONTEXT
+
+    def add(self, name, seconds, count=1):
+        pass
+
+    def report(self):
+        return {}
+
+
+## @brief Aşama başına çağrı sayısı, toplam süre ve süre dağılımını tutan profil.
+#  @details İş parçacığı güvenlidir; aynı aşama birden fazla iş parçacığından ölçülebilir.
+class StageProfiler:
+    enabled = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._durations = {}
+        self._items = {}
+
+    ## @brief Bir aşamanın süresini ölçen bağlam yöneticisi.
+    #  @param name Aşama adı.
+    #  @param count Bu aşamada işlenen öğe sayısı.
+    @contextlib.contextmanager
+    def stage(self, name, count=1):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start, count)
+
+    ## @brief Ölçülmüş bir süreyi ekler.
+    #  @param name Aşama adı.
+    #  @param seconds Süre (saniye).
+    #  @param count Bu sürede işlenen öğe sayısı (ör. toplu çağrıdaki yüz sayısı).
+    def add(self, name, seconds, count=1):
+        with self._lock:
+            self._durations.setdefault(name, []).append(seconds)
+            self._items[name] = self._items.get(name, 0) + count
+
+    ## @brief Aşama bazında özet raporu üretir.
+    #  @return {aşama: {"çağrı", "öğe", "toplam_sn", "ortalama_ms", "p50_ms", "p90_ms", "p99_ms",
+    #          "en_uzun_ms", "histogram_ms"}}; aşamalar toplam süreye göre azalan sırada.
+    def report(self):
+        with self._lock:
+            durations = {name: list(values) for name, values in self._durations.items()}
+            items = dict(self._items)
+
+        report = {}
+        for name, values in sorted(durations.items(), key=lambda kv: -sum(kv[1])):
+            ms = np.asarray(values) * 1000
+            percentiles = np.percentile(ms, PERCENTILES)
+            counts = np.bincount(np.searchsorted(HISTOGRAM_BUCKETS_MS, ms), minlength=len(HISTOGRAM_BUCKETS_MS) + 1)
+            labels = [f"<{b}" for b in HISTOGRAM_BUCKETS_MS] + [f">={HISTOGRAM_BUCKETS_MS[-1]}"]
+            report[name] = {
+                "çağrı": len(values),
+                "öğe": items[name],
+                "toplam_sn": round(float(ms.sum()) / 1000, 3),
+                "ortalama_ms": round(float(ms.mean()), 2),
+                **{f"p{p}_ms": round(float(v), 2) for p, v in zip(PERCENTILES, percentiles)},
+                "en_uzun_ms": round(float(ms.max()), 2),
+                "histogram_ms": {label: int(c) for label, c in zip(labels, counts) if c},
+            }
+        return report
+
+
+_NULL_PROFILER = NullProfiler()
+_current = contextvars.ContextVar("moodlens_profiler", default=_NULL_PROFILER)
+
+
+## @brief Etkin profili döndürür; ölçüm kapalıysa NullProfiler.
+def current():
+    return _current.get()
+
+
+## @brief Bloğun içinde (aynı iş parçacığında) aşama ölçümünü etkinleştirir.
+#  @param active False ise ölçüm kapalı kalır ve NullProfiler verilir.
+#  @return Etkin profil.
+@contextlib.contextmanager
+def enabled(active=True):
+    profiler = StageProfiler() if active else _NULL_PROFILER
+    token = _current.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _current.reset(token)
+
+
+## @brief Raporu okunabilir metin satırlarına çevirir.
+#  @param report StageProfiler.report çıktısı.
+#  @return Satır listesi.
+def format_report(report):
+    lines = []
+    for name, stats in report.items():
+        lines.append(f"- {name}: {stats['çağrı']} çağrı, {stats['toplam_sn']} sn toplam, "
+                     f"p50 {stats['p50_ms']} ms, p90 {stats['p90_ms']} ms, p99 {stats['p99_ms']} ms")
+    return lines
@@ -0,0 +1,182 @@
+##
+# @file result_cache.py
+# @brief Analiz sonuçları ve çıktı dosyaları için içerik adresli, boyutu sınırlı disk önbelleği.
+# @details Önbellek anahtarı videonun içerik özeti (SHA-1), model dosyalarının içerik özetleri ve
+#          analiz parametrelerinden üretilir; aynı dosya farklı adla yeniden yüklense de aynı sonuç
+#          bulunur, model yeniden eğitildiğinde ise eski sonuçlar kendiliğinden geçersiz olur.
+#
+#          Her kayıt önbellek klasöründe anahtar adlı bir klasördür: sonuç JSON olarak, çıktı
+#          dosyaları (işaretlenmiş video, günlük, rapor) ise yanında saklanır. Kayıt önce geçici bir
+#          klasöre yazılıp os.replace ile yerine taşınır. Toplam boyut sınırı aşılınca en uzun süredir
+#          kullanılmayan (LRU) kayıtlar silinir; son kullanım zamanı klasörün mtime değeridir.
+##
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+
+from embedding_store import file_hash
+from model_registry import EMOTION_MODEL_PATH, EMOTION_TFLITE_PATH, IDENTITY_INDEX_PATH, KNN_MODEL_PATH
+
+## @brief Varsayılan önbellek klasörü: MOODLENS_CACHE_DIR, yoksa kullanıcının önbellek klasörü
+#  ($XDG_CACHE_HOME ya da ~/.cache) altında moodlens; çalışma dizinine (ve depoya) yazılmaz.
+DEFAULT_CACHE_DIR = os.environ.get("MOODLENS_CACHE_DIR") or \
+    os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "moodlens")
+DEFAULT_MAX_BYTES = int(float(os.environ.get("MOODLENS_CACHE_MAX_MB", 2048)) * 1024 * 1024)
+## @brief Önbelleğe alınan sonuçların biçimi ya da aynı girdiyle üretilen sonuçlar değiştiğinde artırılır.
+CACHE_VERSION = 5
+MODEL_FILES = (IDENTITY_INDEX_PATH, KNN_MODEL_PATH, EMOTION_MODEL_PATH, EMOTION_TFLITE_PATH)
+RESULT_FILE = "sonuç.json"
+
+_hash_lock = threading.Lock()
+_hash_memo = {}
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+## @brief Dosyanın içerik özetini döndürür; (yol, mtime, boyut) aynı kaldıkça yeniden hesaplamaz.
+#  @param path Dosya yolu.
+#  @return SHA-1 özeti.
+def content_hash(path):
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    with _hash_lock:
+        digest = _hash_memo.get(memo_key)
+    if digest is None:
+        digest = file_hash(path)
+        with _hash_lock:
+            _hash_memo[memo_key] = digest
+    return digest
+
+
+## @brief Mevcut model dosyalarının içerik özetleri.
+#  @return {dosya adı: özet}; bulunmayan dosyalar atlanır.
+def model_versions(paths=MODEL_FILES):
+    return {os.path.basename(path): content_hash(path) for path in paths if os.path.exists(path)}
+
+
+## @brief Bir analiz için önbellek anahtarı üretir.
+#  @param kind Analiz türü (ör. "analyze_video").
+#  @param params Sonucu etkileyen parametreler (JSON'a çevrilebilir).
+#  @param video_path Analiz edilen video; None ise anahtar yalnızca parametrelere bağlıdır.
+#  @param include_models False ise model sürümleri anahtara katılmaz (ör. indirmeler için).
+#  @return Onaltılık anahtar.
+def cache_key(kind, params, video_path=None, include_models=True):
+    payload = {
+        "sürüm": CACHE_VERSION,
+        "tür": kind,
+        "parametreler": params,
+        "video": content_hash(video_path) if video_path else None,
+        "modeller": model_versions() if include_models else None,
+    }
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+## @brief Klasördeki dosyaların toplam boyutu.
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+## @brief Boyutu sınırlı, LRU ile boşaltılan sonuç önbelleği.
+class ResultCache:
+    ## @param cache_dir Önbellek klasörü.
+    #  @param max_bytes Toplam boyut sınırı (bayt).
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    ## @brief Anahtara ait kaydı döndürür ve son kullanım zamanını günceller.
+    #  @param key cache_key çıktısı.
+    #  @return (sonuç, {dosya adı: önbellekteki yol}) ya da kayıt yoksa None.
+    def get(self, key):
+        entry_dir = self._entry_dir(key)
+        try:
+            with open(os.path.join(entry_dir, RESULT_FILE), encoding="utf-8") as f:
+                result = json.load(f)
+            os.utime(entry_dir)
+            files = {name: os.path.join(entry_dir, name) for name in os.listdir(entry_dir) if name != RESULT_FILE}
+        except (OSError, ValueError):
+            return None
+        return result, files
+
+    ## @brief Sonucu ve çıktı dosyalarını önbelleğe kopyalar, gerekirse eski kayıtları siler.
+    #  @param key cache_key çıktısı.
+    #  @param result JSON'a çevrilebilir sonuç.
+    #  @param files {önbellekteki dosya adı: kaynak yol}; kaynağı None ya da bulunmayanlar atlanır.
+    def put(self, key, result, files=None):
+        tmp_dir = os.path.join(self.cache_dir, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp_dir)
+        try:
+            for name, src in (files or {}).items():
+                if src and os.path.exists(src):
+                    shutil.copyfile(src, os.path.join(tmp_dir, name))
+            with open(os.path.join(tmp_dir, RESULT_FILE), "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False)
+            entry_dir = self._entry_dir(key)
+            with self._lock:
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                os.replace(tmp_dir, entry_dir)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        self.evict()
+
+    ## @brief Toplam boyut sınırı aşılmışsa en uzun süredir kullanılmayan kayıtları siler.
+    #  @return Silinen kayıt sayısı.
+    def evict(self):
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                path = os.path.join(self.cache_dir, name)
+                if name.startswith(".tmp-") or not os.path.isdir(path):
+                    continue
+                entries.append((os.path.getmtime(path), _dir_size(path), path))
+
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+                removed += 1
+            return removed
+
+    ## @brief Tüm kayıtları siler.
+    def clear(self):
+        with self._lock:
+            for name in os.listdir(self.cache_dir):
+                shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+
+
+## @brief Önbellekteki dosyayı hedef yola kopyalar.
+#  @param files ResultCache.get'in döndürdüğü dosya sözlüğü.
+#  @param name Dosya adı.
+#  @param dst Hedef yol; None ise kopyalanmaz.
+def restore_file(files, name, dst):
+    if dst and name in files and os.path.abspath(files[name]) != os.path.abspath(dst):
+        shutil.copyfile(files[name], dst)
+
+
+## @brief Süreç genelinde paylaşılan varsayılan önbelleği döndürür.
+def get_default_cache():
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResultCache()
+        return _default_cache
@@ -0,0 +1,262 @@
+##
+# @file results_store.py
+# @brief Kare bazlı yüz sonuçları için dizi tabanlı (sütunsal) depo, saniye bazlı zaman çizelgesi
+#        ve sütunsal dosya çıktısı.
+# @details Her yüz için bir sözlük tutmak yerine sonuçlar büyüyebilen NumPy sütunlarında saklanır:
+#          kare no, zaman, temsil ettiği süre, iz no, kişi no, duygu no, güven ve yüz kutusu. Kişi ve duygu adları bir kez
+#          saklanır (interning), satırlarda yalnızca indeksleri tutulur. İki saatlik bir videoda bile
+#          satır başına birkaç on bayt yer kaplar.
+#
+#          Eski "Detaylı Sonuçlar" listesiyle uyumluluk için depo yinelenebilir ve indekslenebilir;
+#          her satır istendiği anda {"Kare", "Kişi", "Duygu"} sözlüğüne çevrilir.
+#
+#          Dosya biçimleri: .npz (yalnızca NumPy gerekir) ya da .parquet (pyarrow kuruluysa).
+##
+
+import json
+
+import numpy as np
+
+from inference import format_emotion
+
+INITIAL_CAPACITY = 1024
+NO_EMOTION = -1
+NO_TRACK = -1
+## @brief Sütun adları ve türleri; kutu sütunu (N, 4) boyutludur.
+COLUMNS = {
+    "kare": np.int32,
+    "zaman": np.float64,
+    "süre": np.float64,
+    "iz": np.int32,
+    "kişi": np.int32,
+    "duygu": np.int16,
+    "güven": np.float64,
+    "kutu": np.int32,
+}
+
+
+## @brief Kare bazlı yüz sonuçlarının sütunsal deposu.
+class FaceResults:
+    ## @param fps Videonun kare hızı; kare numarasından zaman hesaplanır.
+    #  @param sample_seconds Analiz edilen bir karenin varsayılan olarak temsil ettiği süre; None ise her
+    #         satır 1 sayılır (zaman çizelgesi tespit sayısı verir).
+    #  @param capacity Başlangıç kapasitesi; dolunca iki katına çıkarılır.
+    def __init__(self, fps=None, sample_seconds=None, capacity=INITIAL_CAPACITY):
+        self.fps = fps
+        self.sample_seconds = sample_seconds
+        self.names = []
+        self.emotions = []
+        self._name_ids = {}
+        self._emotion_ids = {}
+        self._size = 0
+        self._columns = {name: np.zeros((capacity, 4) if name == "kutu" else capacity, dtype=dtype)
+                         for name, dtype in COLUMNS.items()}
+
+    def _intern(self, value, values, ids):
+        index = ids.get(value)
+        if index is None:
+            index = ids[value] = len(values)
+            values.append(value)
+        return index
+
+    def _grow(self):
+        for name, column in self._columns.items():
+            grown = np.zeros((len(column) * 2, *column.shape[1:]), dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    ## @brief Bir yüz sonucunu ekler.
+    #  @param kare_no Kare numarası (1 tabanlı).
+    #  @param name Kişi adı.
+    #  @param emotion_label Duygu etiketi; bulunamadıysa None.
+    #  @param emotion_score Yüzde güven skoru; bulunamadıysa None.
+    #  @param box (x, y, w, h) yüz kutusu; None ise sıfır.
+    #  @param track_id İz numarası; izleme kapalıysa NO_TRACK.
+    #  @param seconds Satırın temsil ettiği süre; None ise sample_seconds.
+    def append(self, kare_no, name, emotion_label, emotion_score, box=None, track_id=NO_TRACK, seconds=None):
+        if self._size == len(self._columns["kare"]):
+            self._grow()
+        i = self._size
+        columns = self._columns
+        columns["kare"][i] = kare_no
+        columns["zaman"][i] = (kare_no - 1) / self.fps if self.fps else 0.0
+        columns["süre"][i] = seconds if seconds is not None else self.sample_seconds or 1.0
+        columns["iz"][i] = NO_TRACK if track_id is None else track_id
+        columns["kişi"][i] = self._intern(str(name), self.names, self._name_ids)
+        if emotion_label:
+            columns["duygu"][i] = self._intern(emotion_label, self.emotions, self._emotion_ids)
+            columns["güven"][i] = emotion_score
+        else:
+            columns["duygu"][i] = NO_EMOTION
+            columns["güven"][i] = np.nan
+        if box is not None:
+            columns["kutu"][i] = box
+        self._size += 1
+
+    def __len__(self):
+        return self._size
+
+    ## @brief Sütunun dolu kısmını döndürür (kopyalamadan).
+    def column(self, name):
+        return self._columns[name][:self._size]
+
+    ## @brief Satırların temsil ettiği süreleri örnek karelerin sürelerinden atar.
+    #  @param samples Analiz edilen karelerin artan sıradaki numaraları.
+    #  @param seconds Her örneğin temsil ettiği süre (bkz. keyframes.sample_seconds).
+    def assign_seconds(self, samples, seconds):
+        if not self._size:
+            return
+        index = np.searchsorted(samples, self.column("kare"))
+        self.column("süre")[:] = np.asarray(seconds)[index]
+
+    ## @brief Kişi ve duygu bazında toplam süreleri satır sürelerinden hesaplar.
+    #  @return (kişiler_süre, duygular_süre) sözlükleri; ilk görülme sırasında.
+    def totals(self):
+        seconds = self.column("süre")
+        people = np.bincount(self.column("kişi"), weights=seconds, minlength=len(self.names))
+        emotion_ids = self.column("duygu")
+        detected = emotion_ids != NO_EMOTION
+        emotions = np.bincount(emotion_ids[detected], weights=seconds[detected], minlength=len(self.emotions))
+        return ({name: float(people[i]) for i, name in enumerate(self.names)},
+                {label: float(emotions[i]) for i, label in enumerate(self.emotions)})
+
+    def _emotion_text(self, i):
+        emotion = self._columns["duygu"][i]
+        if emotion == NO_EMOTION:
+            return format_emotion(None, None)
+        return format_emotion(self.emotions[emotion], self._columns["güven"][i])
+
+    ## @brief Satırı eski "Detaylı Sonuçlar" biçiminde döndürür.
+    def record(self, i):
+        return {
+            "Kare": int(self._columns["kare"][i]),
+            "Kişi": self.names[self._columns["kişi"][i]],
+            "Duygu": self._emotion_text(i),
+        }
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.record(j) for j in range(*i.indices(self._size))]
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError(i)
+        return self.record(i)
+
+    def __iter__(self):
+        for i in range(self._size):
+            yield self.record(i)
+
+    ## @brief Eski biçimdeki listeyle ya da başka bir depoyla satır satır karşılaştırır.
+    def __eq__(self, other):
+        if isinstance(other, (FaceResults, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return f"FaceResults({self._size} satır, {len(self.names)} kişi)"
+
+    ## @brief Arayüzde sayfa sayfa göstermek için satırları ayrıntılı sözlükler olarak döndürür.
+    #  @param start İlk satır.
+    #  @param stop Son satırın bir fazlası; None ise sona kadar.
+    #  @return Kare, zaman, kişi, duygu, güven, iz ve kutu alanlarını içeren sözlük listesi.
+    def rows(self, start=0, stop=None):
+        stop = self._size if stop is None else min(stop, self._size)
+        rows = []
+        for i in range(max(0, start), stop):
+            emotion = self._columns["duygu"][i]
+            rows.append({
+                "Kare": int(self._columns["kare"][i]),
+                "Zaman (sn)": round(float(self._columns["zaman"][i]), 2),
+                "Süre (sn)": round(float(self._columns["süre"][i]), 3),
+                "Kişi": self.names[self._columns["kişi"][i]],
+                "Duygu": None if emotion == NO_EMOTION else self.emotions[emotion],
+                "Güven (%)": None if emotion == NO_EMOTION else round(float(self._columns["güven"][i]), 1),
+                "İz": int(self._columns["iz"][i]),
+                "Kutu": [int(v) for v in self._columns["kutu"][i]],
+            })
+        return rows
+
+    ## @brief Saniye bazlı kişi görünme ve duygu süreleri.
+    #  @param bin_seconds Zaman aralığı genişliği (saniye).
+    #  @return {"Saniye": aralık başlangıçları, "Kişiler": {kişi: süreler}, "Duygular": {duygu: süreler},
+    #          "Ortalama Güven (%)": {duygu: ortalamalar (yoksa nan)}}; süreler satırların temsil ettiği
+    #          sürelerin toplamıdır (sample_seconds verilmemişse tespit sayısı).
+    def timeline(self, bin_seconds=1.0):
+        zaman = self.column("zaman")
+        if not len(zaman):
+            return {"Saniye": np.zeros(0), "Kişiler": {}, "Duygular": {}, "Ortalama Güven (%)": {}}
+        bins = (zaman // bin_seconds).astype(np.int64)
+        n_bins = int(bins.max()) + 1
+        seconds = self.column("süre")
+        people = np.bincount(bins * len(self.names) + self.column("kişi"), weights=seconds,
+                             minlength=n_bins * len(self.names)).reshape(n_bins, -1)
+        emotion_ids = self.column("duygu")
+        detected = emotion_ids != NO_EMOTION
+        emotions = np.zeros((n_bins, len(self.emotions)))
+        confidence = np.full((n_bins, len(self.emotions)), np.nan)
+        if detected.any():
+            flat = bins[detected] * len(self.emotions) + emotion_ids[detected]
+            counts = np.bincount(flat, minlength=n_bins * len(self.emotions)).reshape(n_bins, -1)
+            sums = np.bincount(flat, weights=self.column("güven")[detected],
+                               minlength=n_bins * len(self.emotions)).reshape(n_bins, -1)
+            emotions = np.bincount(flat, weights=seconds[detected],
+                                   minlength=n_bins * len(self.emotions)).reshape(n_bins, -1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                confidence = np.where(counts > 0, sums / counts, np.nan)
+
+        return {
+            "Saniye": np.arange(n_bins) * bin_seconds,
+            "Kişiler": {name: people[:, i] for i, name in enumerate(self.names)},
+            "Duygular": {label: emotions[:, i] for i, label in enumerate(self.emotions)},
+            "Ortalama Güven (%)": {label: confidence[:, i] for i, label in enumerate(self.emotions)},
+        }
+
+    def _meta(self):
+        return {"fps": self.fps, "sample_seconds": self.sample_seconds, "kişiler": self.names,
+                "duygular": self.emotions}
+
+    ## @brief Depoyu sütunsal dosyaya yazar.
+    #  @param path .parquet ile bitiyorsa Parquet (pyarrow gerekir), aksi halde sıkıştırılmış .npz.
+    #         npz için dosya benzeri nesne de verilebilir.
+    def save(self, path):
+        if isinstance(path, str) and path.endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            kutu = self.column("kutu")
+            table = pa.table({
+                **{name: self.column(name) for name in COLUMNS if name != "kutu"},
+                **{f"kutu_{axis}": kutu[:, i] for i, axis in enumerate("xywh")},
+            })
+            table = table.replace_schema_metadata({"moodlens": json.dumps(self._meta(), ensure_ascii=False)})
+            pq.write_table(table, path)
+            return
+        np.savez_compressed(path, meta=np.array(json.dumps(self._meta(), ensure_ascii=False)),
+                            **{name: self.column(name) for name in COLUMNS})
+
+    ## @brief save ile yazılmış dosyayı okur.
+    #  @param path .parquet ya da .npz dosyası (ya da npz için dosya benzeri nesne).
+    @classmethod
+    def load(cls, path):
+        if isinstance(path, str) and path.endswith(".parquet"):
+            import pyarrow.parquet as pq
+
+            table = pq.read_table(path)
+            meta = json.loads(table.schema.metadata[b"moodlens"])
+            columns = {name: table.column(name).to_numpy() for name in COLUMNS if name != "kutu"}
+            columns["kutu"] = np.stack([table.column(f"kutu_{axis}").to_numpy() for axis in "xywh"], axis=1)
+        else:
+            with np.load(path) as data:
+                meta = json.loads(str(data["meta"]))
+                columns = {name: data[name] for name in COLUMNS}
+
+        results = cls(meta["fps"], meta["sample_seconds"], capacity=max(1, len(columns["kare"])))
+        results.names = list(meta["kişiler"])
+        results.emotions = list(meta["duygular"])
+        results._name_ids = {name: i for i, name in enumerate(results.names)}
+        results._emotion_ids = {label: i for i, label in enumerate(results.emotions)}
+        results._size = len(columns["kare"])
+        for name, dtype in COLUMNS.items():
+            results._columns[name][:results._size] = np.asarray(columns[name], dtype=dtype)
+        return results
@@ -0,0 +1,27 @@
+##
+# @file conftest.py
+# @brief Testlerin ortak ayarları.
+# @details Facenet ve duygu CNN'i yerine tests/stubs altındaki hafif modüller kullanılır; böylece testler
+#          TensorFlow olmadan ve hızlı çalışır. Yol, spawn ile başlatılan işçi süreçlere de aktarılır.
+#          Model dosyaları göreli yollarla açıldığından çalışma dizini depo köküdür.
+##
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUBS = os.path.join(ROOT, "tests", "stubs")
+sys.path[:0] = [STUBS, ROOT]
+os.chdir(ROOT)
+
+
+## @brief Veri kümesindeki yüzlerden üretilmiş, sesi olmayan kısa bir test videosu.
+@pytest.fixture(scope="session")
+def synthetic_video(tmp_path_factory):
+    from benchmark import make_synthetic_video
+
+    path = str(tmp_path_factory.mktemp("video") / "iki_yuz.mp4")
+    make_synthetic_video(path, n_faces=2, width=640, height=360, seconds=24, fps=25, with_audio=False)
+    return path
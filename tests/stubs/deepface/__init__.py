@@ -0,0 +1,24 @@
+##
+# @file __init__.py
+# @brief Testler için DeepFace yerine geçen hafif modül.
+# @details Facenet yerine görüntünün ortalamasından tohumlanan rastgele 128 boyutlu bir gömme döndürür;
+#          aynı kırpıntı her zaman aynı gömmeyi verir, böylece seri ve paralel çalışmalar karşılaştırılabilir.
+##
+
+import numpy as np
+
+
+class DeepFace:
+    @staticmethod
+    def represent(img_path, model_name="Facenet", enforce_detection=True, **kwargs):
+        def one(img):
+            rng = np.random.default_rng(int(np.asarray(img).mean() * 1000) % 2 ** 32)
+            return [{"embedding": list(rng.normal(size=128)), "facial_area": {}}]
+
+        if isinstance(img_path, list):
+            return [one(img) for img in img_path]
+        return one(img_path)
+
+    @staticmethod
+    def build_model(name):
+        return None
@@ -0,0 +1,20 @@
+##
+# @file models.py
+# @brief Testler için keras.models yerine geçen hafif modül.
+##
+
+import numpy as np
+
+
+## @brief Duygu CNN'i yerine geçen model: "Sad" olasılığı olarak girdinin ortalamasını döndürür.
+class _EmotionModel:
+    def predict(self, x, verbose=None, **kwargs):
+        x = np.asarray(x)
+        return x.reshape(len(x), -1).mean(axis=1, keepdims=True).astype("float32")
+
+    def predict_on_batch(self, x):
+        return self.predict(x)
+
+
+def load_model(path, *args, **kwargs):
+    return _EmotionModel()
@@ -0,0 +1,95 @@
+import io
+import json
+import os
+from contextlib import redirect_stdout
+
+import pytest
+
+import batch
+import model_registry
+from batch import MANIFEST_NAME, SUMMARY_NAME, Manifest, collect_items, item_id, run_batch
+from jobs import DONE, FAILED
+
+
+def test_manifest_last_entry_wins_and_survives_torn_line(tmp_path):
+    path = str(tmp_path / MANIFEST_NAME)
+    manifest = Manifest(path)
+    manifest.record("a", FAILED, hata="x")
+    manifest.record("b", DONE)
+    manifest.record("a", DONE)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"id": "c", "dur')  # Yazılırken kesilmiş satır
+
+    reloaded = Manifest(path)
+    assert reloaded.status("a") == DONE
+    assert reloaded.status("b") == DONE
+    assert reloaded.status("c") is None
+
+
+def test_collect_items_is_stable_and_deduplicated(tmp_path):
+    for name in ("b.mp4", "a.MP4", "notlar.txt"):
+        (tmp_path / name).write_bytes(b"")
+    url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+    items = collect_items([str(tmp_path), str(tmp_path / "a.MP4"), url, url])
+    assert [source for _, source in items] == [str(tmp_path / "a.MP4"), str(tmp_path / "b.mp4"), url]
+    assert items[2][0].startswith("dQw4w9WgXcQ-")
+    assert item_id(str(tmp_path / "b.mp4")) == items[1][0]
+    with pytest.raises(FileNotFoundError):
+        collect_items([str(tmp_path / "yok.mp4")])
+
+
+@pytest.fixture
+def fake_analysis(monkeypatch):
+    calls = []
+
+    def process_item(item_id, source, results_dir, download, options, stop_event=None):
+        calls.append(item_id)
+        if "bozuk" in source:
+            raise ValueError("Video açılamadı")
+        os.makedirs(os.path.join(results_dir, item_id))
+        return {}
+
+    monkeypatch.setattr(batch, "process_item", process_item)
+    monkeypatch.setattr(model_registry, "warm_up_models", lambda: None)
+    return calls
+
+
+def test_resume_skips_finished_items(tmp_path, fake_analysis):
+    items = [("iyi", "iyi.mp4"), ("bozuk", "bozuk.mp4")]
+    results_dir = str(tmp_path / "sonuçlar")
+    os.makedirs(os.path.join(results_dir, ".tmp-yarım"))
+
+    with redirect_stdout(io.StringIO()):
+        assert run_batch(items, results_dir, 2, None, {}) == {DONE: 1, FAILED: 1, "atlandı": 0}
+        assert not os.path.exists(os.path.join(results_dir, ".tmp-yarım"))
+
+        # Tamamlanan ve hata veren videolar yeniden analiz edilmez
+        assert run_batch(items, results_dir, 2, None, {}) == {DONE: 0, FAILED: 0, "atlandı": 2}
+        assert sorted(fake_analysis) == ["bozuk", "iyi"]
+
+        assert run_batch(items, results_dir, 2, None, {}, retry_failed=True) == {DONE: 0, FAILED: 1, "atlandı": 1}
+    assert sorted(fake_analysis) == ["bozuk", "bozuk", "iyi"]
+    assert Manifest(os.path.join(results_dir, MANIFEST_NAME)).entries["bozuk"]["hata"] == "ValueError: Video açılamadı"
+
+
+def test_main_writes_results_and_resumes(tmp_path):
+    from benchmark import make_synthetic_video
+
+    videos = tmp_path / "videolar"
+    videos.mkdir()
+    make_synthetic_video(str(videos / "klip.mp4"), n_faces=1, seconds=2, with_audio=False)
+    out = str(tmp_path / "sonuçlar")
+    args = [str(videos), "--out", out, "--cpus", "2", "--no-tracking"]
+
+    with redirect_stdout(io.StringIO()):
+        assert batch.main(args) == 0
+        (video_id, _), = collect_items([str(videos)])
+        with open(os.path.join(out, video_id, SUMMARY_NAME), encoding="utf-8") as f:
+            summary = json.load(f)
+        assert summary["Toplam Kare"] == 50
+        assert os.path.exists(os.path.join(out, video_id, "sonuçlar.npz"))
+
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            assert batch.main(args) == 0
+    assert "1 atlandı" in stdout.getvalue()
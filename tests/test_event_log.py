@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from event_log import EventLog
+
+
+def test_text_format_matches_legacy_log(tmp_path):
+    path = tmp_path / "loglar.txt"
+    with EventLog(str(path), "text", verbose=0, batch_size=2) as log:
+        for kare in (5, 10, 15):
+            log.face(kare, "Aysu", "Happy", 99.7)
+        log.emit("bilgi", mesaj="bitti")
+    assert path.read_text(encoding="utf-8").splitlines() == [
+        "Analiz Başladı",
+        "",
+        "Kare #5 | Kişi: Aysu | Duygu: Happy (99.7%)",
+        "Kare #10 | Kişi: Aysu | Duygu: Happy (99.7%)",
+        "Kare #15 | Kişi: Aysu | Duygu: Happy (99.7%)",
+        "[bilgi] mesaj=bitti",
+    ]
+
+
+def test_jsonl_format(tmp_path):
+    path = tmp_path / "loglar.jsonl"
+    with EventLog(str(path), "jsonl", verbose=0) as log:
+        log.face(5, "Selin", "Sad", 61.234)
+    event, = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert {k: event[k] for k in ("olay", "kare", "kişi", "duygu", "güven")} == \
+        {"olay": "yüz", "kare": 5, "kişi": "Selin", "duygu": "Sad", "güven": 61.23}
+    assert "_skor" not in event
+
+
+def test_verbose_prints_face_lines(capsys):
+    with EventLog(None, verbose=1) as log:
+        log.face(5, "Kader", "Happy", 80.0, emotion_text="Mutlu")
+    assert capsys.readouterr().out == "Kare #5 | Kişi: Kader | Duygu: Mutlu\n"
+
+
+def test_writer_error_is_raised_on_close(tmp_path):
+    log = EventLog(str(tmp_path / "loglar.txt"), verbose=0)
+    log.emit("yüz", kare=1)  # Eksik alanlar yazıcı iş parçacığında hataya yol açar
+    with pytest.raises(KeyError):
+        log.close()
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        EventLog(None, "xml")
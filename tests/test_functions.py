@@ -0,0 +1,42 @@
+import cv2
+import pytest
+
+from functions import _analyze_frames
+
+
+def _read_frames(path, limit=200):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < limit:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def _run(frames, max_pending_frames):
+    written, events, held = [], [], []
+
+    def stream():
+        for i, frame in enumerate(frames, 1):
+            held.append(i - len(written))
+            yield frame.copy()
+
+    _analyze_frames(stream(), written.append, lambda *event: events.append(event), track_faces=False,
+                    max_pending_frames=max_pending_frames)
+    return written, events, max(held)
+
+
+@pytest.mark.parametrize("max_pending_frames", [1, 8])
+def test_pending_frames_are_bounded(synthetic_video, max_pending_frames):
+    frames = _read_frames(synthetic_video)
+    reference, reference_events, _ = _run(frames, max_pending_frames=len(frames))
+    written, events, held = _run(frames, max_pending_frames)
+
+    # Yeni kare alınırken en fazla max_pending_frames kare yazılmayı bekler
+    assert held <= max_pending_frames + 1
+    assert events == reference_events
+    assert len(written) == len(frames)
+    assert all((a == b).all() for a, b in zip(written, reference))
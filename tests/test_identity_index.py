@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from identity_index import IdentityIndex, l2_normalize
+from inference import UNKNOWN_NAME
+
+
+def _gallery(people=20, per_person=40, dim=128, noise=0.15, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = l2_normalize(rng.normal(size=(people, dim)))
+    embeddings = np.repeat(centers, per_person, axis=0) + rng.normal(scale=noise / np.sqrt(dim),
+                                                                     size=(people * per_person, dim))
+    labels = np.repeat([f"kişi{i:02d}" for i in range(people)], per_person)
+    return centers, embeddings, labels
+
+
+def test_exact_and_ivf_agree():
+    centers, embeddings, labels = _gallery()
+    queries = centers + np.random.default_rng(1).normal(scale=0.01, size=centers.shape)
+    exact = IdentityIndex(embeddings, labels, mode="exact")
+    ivf = IdentityIndex(embeddings, labels, mode="ivf", n_lists=8, n_probe=3)
+    assert ivf.centroids is not None and exact.centroids is None
+
+    expected = [f"kişi{i:02d}" for i in range(len(centers))]
+    assert exact.predict(queries).tolist() == expected
+    assert ivf.predict(queries).tolist() == expected
+
+    exact_sims, exact_idx = exact.search(queries, k=5)
+    ivf_sims, _ = ivf.search(queries, k=5)
+    np.testing.assert_allclose(ivf_sims, exact_sims, rtol=1e-5)
+    assert (np.diff(exact_sims, axis=1) <= 0).all()
+    assert exact_idx.shape == (len(queries), 5)
+
+
+def test_unknown_beyond_threshold():
+    centers, embeddings, labels = _gallery()
+    index = IdentityIndex(embeddings, labels, threshold=0.4)
+    stranger = np.random.default_rng(2).normal(size=(1, 128))
+    assert index.predict(stranger).tolist() == [UNKNOWN_NAME]
+
+    # kişi00 merkezine kosinüs benzerliği 0.6 olan sorgu: eşik uzaklığın hemen üstündeyse kabul, altındaysa ret
+    other = l2_normalize(np.random.default_rng(3).normal(size=(1, 128)))
+    other -= (other @ centers[0]) * centers[0]
+    query = 0.6 * centers[0] + 0.8 * l2_normalize(other)[0]
+    distance = 1 - float(index.search(query, k=1)[0][0, 0])
+    assert 0.2 < distance < 0.6
+    assert IdentityIndex(embeddings, labels, threshold=distance + 0.01).predict(query).tolist() == ["kişi00"]
+    assert IdentityIndex(embeddings, labels, threshold=distance - 0.01).predict(query).tolist() == [UNKNOWN_NAME]
+
+
+@pytest.mark.parametrize("mode", ["exact", "ivf"])
+def test_save_load_round_trip(tmp_path, mode):
+    centers, embeddings, labels = _gallery(people=5, per_person=10)
+    index = IdentityIndex(embeddings, labels, k=3, threshold=0.35, dtype="float16", mode=mode, n_lists=2)
+    path = str(tmp_path / "dizin.npz")
+    index.save(path)
+    loaded = IdentityIndex.load(path)
+    assert (loaded.k, loaded.threshold, len(loaded)) == (3, 0.35, len(index))
+    assert loaded.embeddings.dtype == np.float16
+    assert loaded.predict(centers).tolist() == index.predict(centers).tolist()
+
+
+def test_from_knn_matches_classifier():
+    from sklearn.neighbors import KNeighborsClassifier
+
+    centers, embeddings, labels = _gallery(people=6, per_person=15)
+    knn = KNeighborsClassifier(n_neighbors=5).fit(embeddings, labels)
+    index = IdentityIndex.from_knn(knn, threshold=2.0)
+    assert index.k == 5
+    assert index.predict(embeddings[::7]).tolist() == knn.predict(embeddings[::7]).tolist()
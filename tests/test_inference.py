@@ -0,0 +1,47 @@
+import numpy as np
+
+from inference import predict_emotions
+
+
+class _FlakyModel:
+    """Toplu çağrıda ve parlak yüzlerde hata veren, ortalama parlaklığı döndüren model."""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict_on_batch(self, x):
+        self.calls.append(len(x))
+        if len(x) > 1 or x.mean() > 0.9:
+            raise RuntimeError("bozuk girdi")
+        return x.reshape(len(x), -1).mean(axis=1, keepdims=True)
+
+
+class _PredictOnlyModel:
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, x, verbose=None):
+        self.calls += 1
+        return np.full((len(x), 1), 0.25, dtype="float32")
+
+
+def _face(value):
+    return np.full((60, 60, 3), value, dtype=np.uint8)
+
+
+def test_batch_failure_falls_back_to_per_face_predictions():
+    model = _FlakyModel()
+    probabilities = predict_emotions(model, [_face(51), _face(255), _face(102)])
+
+    assert abs(probabilities[0] - 0.2) < 1e-9
+    assert probabilities[1] is None
+    assert abs(probabilities[2] - 0.4) < 1e-9
+    assert model.calls == [3, 1, 1, 1]
+
+
+def test_models_without_predict_on_batch_use_a_single_predict_call():
+    model = _PredictOnlyModel()
+    probabilities = predict_emotions(model, [_face(0), _face(10), None])
+
+    assert probabilities == [0.25, 0.25, None]
+    assert model.calls == 1
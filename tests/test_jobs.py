@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+
+import pytest
+
+from jobs import CANCELLED, DONE, FAILED, JobService
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = JobService(max_workers=2, workspace_root=str(tmp_path), ttl=60)
+    yield service
+    service.shutdown()
+
+
+def _wait(job, timeout=5):
+    deadline = time.time() + timeout
+    while not job.done and time.time() < deadline:
+        time.sleep(0.01)
+    assert job.done
+
+
+def _write(job, name, text):
+    with open(job.path(name), "w", encoding="utf-8") as f:
+        f.write(text)
+    return job.path(name)
+
+
+def test_failed_and_cancelled_workspaces_are_removed(service):
+    def fail(job):
+        raise ValueError("bozuk video")
+
+    failed = service.submit(fail)
+    _wait(failed)
+    assert failed.status == FAILED and failed.error == "ValueError: bozuk video"
+
+    started = threading.Event()
+
+    def slow(job):
+        started.set()
+        while True:
+            job.report_progress(0.5)
+            time.sleep(0.01)
+
+    cancelled = service.submit(slow)
+    started.wait(5)
+    service.cancel(cancelled.id)
+    _wait(cancelled)
+    assert cancelled.status == CANCELLED
+    assert not os.path.exists(failed.workspace) and not os.path.exists(cancelled.workspace)
+
+
+def test_expired_jobs_are_removed_after_last_access(service, monkeypatch):
+    job = service.submit(_write, "video.mp4", "v")
+    _wait(job)
+    assert job.status == DONE
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 50)
+    assert service.get(job.id) is job  # Erişim saklama süresini yeniler
+    monkeypatch.setattr(time, "time", lambda: now + 100)
+    assert service.cleanup() == 0
+    monkeypatch.setattr(time, "time", lambda: now + 200)
+    assert service.cleanup() == 1
+    assert service.get(job.id) is None
+    assert not os.path.exists(job.workspace)
+
+
+def test_dependency_kept_while_dependent_job_runs(service, monkeypatch):
+    download = service.submit(_write, "video.mp4", "v")
+    _wait(download)
+    release = threading.Event()
+
+    def analyze(job, video_path):
+        release.wait(5)
+        with open(video_path, encoding="utf-8") as f:
+            return f.read()
+
+    # İndirmeden saklama süresinden uzun süre sonra analiz başlatılır
+    real_time = time.time
+    monkeypatch.setattr(time, "time", lambda: real_time() + 120)
+    analysis = service.submit(analyze, download.result, depends_on=[download])
+    assert os.path.exists(download.result)
+
+    # Analiz sürerken başka işler gönderilse de indirilen video silinmez
+    monkeypatch.setattr(time, "time", lambda: real_time() + 400)
+    service.cleanup()
+    assert os.path.exists(download.result)
+    release.set()
+    _wait(analysis)
+    assert analysis.status == DONE and analysis.result == "v"
+
+    monkeypatch.setattr(time, "time", lambda: real_time() + 1000)
+    assert service.cleanup() == 2
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from keyframes import AdaptiveSampler, sample_seconds
+
+
+def _frame(value, size=(72, 128)):
+    return np.full(size + (3,), value, dtype=np.uint8)
+
+
+def _noise(seed, size=(72, 128)):
+    return np.random.default_rng(seed).integers(0, 256, size + (3,), dtype=np.uint8)
+
+
+def test_static_video_sampled_at_min_rate():
+    sampler = AdaptiveSampler(fps=25, max_rate=6, min_rate=0.5)
+    chosen = [n for n in range(1, 251) if sampler.should_analyze(n, _frame(100))]
+    # İlk kare ve ardından her fps / min_rate = 50 karede bir
+    assert chosen == [1, 51, 101, 151, 201]
+    assert sampler.samples == chosen
+
+
+def test_cut_is_analyzed_and_flagged():
+    sampler = AdaptiveSampler(fps=25)
+    for n in range(1, 11):
+        sampler.should_analyze(n, _frame(30))
+    assert not sampler.cut
+    assert sampler.should_analyze(11, _frame(220))
+    assert sampler.cut
+    # Sonraki örnek (en uzun aralık dolunca) kesme sayılmaz
+    assert [n for n in range(12, 62) if sampler.should_analyze(n, _frame(220))] == [61]
+    assert not sampler.cut
+
+
+def test_rate_is_bounded_by_budget():
+    fps, seconds, max_rate, burst = 25, 8, 3, 2
+    sampler = AdaptiveSampler(fps=fps, max_rate=max_rate, burst=burst)
+    for n in range(1, fps * seconds + 1):
+        sampler.should_analyze(n, _noise(n))
+    assert len(sampler.samples) <= burst + max_rate * seconds
+    assert len(sampler.samples) >= max_rate * seconds - 1
+
+
+def test_invalid_rates():
+    with pytest.raises(ValueError):
+        AdaptiveSampler(fps=25, max_rate=1, min_rate=2)
+
+
+def test_sample_seconds_cover_whole_video():
+    seconds = sample_seconds([3, 10, 40], total_frames=50, fps=10)
+    # İlk örnek videonun başından, son örnek videonun sonuna kadar olan kareleri temsil eder
+    assert seconds.tolist() == [0.9, 3.0, 1.1]
+    assert seconds.sum() == pytest.approx(5.0)
+    assert len(sample_seconds([], 50, 10)) == 0
@@ -0,0 +1,60 @@
+import io
+import threading
+import time
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from functions import live_camera_analysis
+from live import MIN_DETECT_SCALE, InferenceWorker, LatestFrame, SyntheticSource, latency_percentiles
+
+
+def test_latency_percentiles():
+    assert latency_percentiles([]) == {}
+    assert latency_percentiles([0.01, 0.02, 0.03]) == {"p50": 20.0, "p90": 28.0, "p99": 29.8}
+
+
+def test_worker_lowers_detection_scale_until_latency_meets_target():
+    latest = LatestFrame()
+    frame = np.zeros((8, 8, 3), dtype=np.uint8)
+
+    # Analiz süresi ölçekle orantılı: tam ölçekte 80 ms, hedef 50 ms
+    def analyze(_, scale):
+        time.sleep(0.08 * scale)
+        return []
+
+    worker = InferenceWorker(latest, analyze, target_latency=0.05)
+    worker.start()
+    stop = threading.Event()
+
+    def produce():
+        while not stop.is_set():
+            latest.put(frame, time.monotonic())
+            time.sleep(0.005)
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    time.sleep(1.5)
+    stop.set()
+    producer.join()
+    latest.close()
+    worker.join()
+
+    assert worker.error is None
+    assert MIN_DETECT_SCALE <= worker.scale < 0.7
+    assert worker.result_latencies[0] > 0.05
+    assert np.median(worker.result_latencies[-5:]) < 0.06
+
+
+def test_live_analysis_headless():
+    with redirect_stdout(io.StringIO()):
+        stats = live_camera_analysis(source=SyntheticSource(fps=30, n_frames=45), display=False, duration=10)
+
+    assert stats["Yakalanan Kare"] == 45
+    assert 0 < stats["Analiz Edilen Kare"] <= 45
+    assert 0 < stats["Gösterilen Kare"] <= 45
+    for key in ("Gösterim Gecikmesi (ms)", "Sonuç Gecikmesi (ms)"):
+        percentiles = stats[key]
+        assert list(percentiles) == ["p50", "p90", "p99"]
+        assert 0 <= percentiles["p50"] <= percentiles["p90"] <= percentiles["p99"]
+    assert MIN_DETECT_SCALE <= stats["Algılama Ölçeği"] <= 1.0
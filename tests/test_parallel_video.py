@@ -0,0 +1,71 @@
+import io
+from contextlib import redirect_stdout
+
+import cv2
+import pytest
+
+from functions import analyze_video
+from parallel_video import CHUNK_ALIGN, analyze_video_parallel, plan_chunks
+
+
+def test_plan_chunks_aligns_starts():
+    chunks = plan_chunks(600, 3, chunk_frames=130)
+    assert [start for start, _ in chunks] == [0, 150, 300, 450]
+    assert all(start % CHUNK_ALIGN == 0 for start, _ in chunks)
+    assert chunks[-1][1] is None
+
+
+# chunk_frames=None: varsayılan planlama (işçi başına bir parça)
+@pytest.mark.parametrize("chunk_frames", [None, 130])
+def test_parallel_matches_serial(synthetic_video, tmp_path, chunk_frames):
+    serial_log, parallel_log = tmp_path / "seri.txt", tmp_path / "paralel.txt"
+    with redirect_stdout(io.StringIO()):
+        serial = analyze_video(synthetic_video, str(tmp_path / "seri.mp4"), str(serial_log), track_faces=False)
+        parallel = analyze_video_parallel(synthetic_video, str(tmp_path / "paralel.mp4"), str(parallel_log),
+                                          workers=3, chunk_frames=chunk_frames)
+
+    assert serial["Toplam Kare"] == parallel["Toplam Kare"] == 600
+    assert serial == parallel
+    assert serial_log.read_text() == parallel_log.read_text()
+
+
+@pytest.mark.parametrize("render_mode", ["keyframes", "none"])
+def test_workers_option_matches_serial(synthetic_video, tmp_path, render_mode):
+    with redirect_stdout(io.StringIO()):
+        serial = analyze_video(synthetic_video, str(tmp_path / "seri.mp4"), str(tmp_path / "seri.txt"),
+                               track_faces=False, render_mode=render_mode)
+        parallel = analyze_video(synthetic_video, str(tmp_path / "paralel.mp4"), str(tmp_path / "paralel.txt"),
+                                 track_faces=False, render_mode=render_mode, workers=3)
+
+    assert serial == parallel
+    assert (tmp_path / "seri.txt").read_text() == (tmp_path / "paralel.txt").read_text()
+    if render_mode == "keyframes":
+        assert _frame_count(tmp_path / "seri.mp4") == _frame_count(tmp_path / "paralel.mp4") == 120
+    else:
+        assert not (tmp_path / "paralel.mp4").exists()
+
+
+# Varsayılan argümanlar (izleme açık) parça sınırında izleri sıfırlayacağından reddedilir
+@pytest.mark.parametrize("options", [{}, {"track_faces": False, "sampling": "adaptive"},
+                                     {"track_faces": False, "profile": True}])
+def test_workers_option_rejects_non_reproducible_settings(synthetic_video, tmp_path, options):
+    with pytest.raises(ValueError):
+        analyze_video(synthetic_video, str(tmp_path / "a.mp4"), str(tmp_path / "a.txt"), workers=2, **options)
+    assert not (tmp_path / "a.txt").exists()
+
+
+def test_batch_video_workers_requires_no_tracking(synthetic_video, tmp_path, capsys):
+    import batch
+
+    with pytest.raises(SystemExit):
+        batch.main([synthetic_video, "--out", str(tmp_path), "--video-workers", "2"])
+    assert "--no-tracking" in capsys.readouterr().err
+
+
+def _frame_count(path):
+    cap = cv2.VideoCapture(str(path))
+    count = 0
+    while cap.grab():
+        count += 1
+    cap.release()
+    return count
@@ -0,0 +1,64 @@
+import os
+import shutil
+
+import pytest
+
+from result_cache import ResultCache, cache_key, restore_file
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(b"\x00video" * 100)
+    return str(path)
+
+
+def test_key_depends_on_content_not_name(video, tmp_path):
+    copy = str(tmp_path / "başka_ad.mp4")
+    shutil.copyfile(video, copy)
+    params = {"skip_frames": 5}
+    assert cache_key("analyze_video", params, video) == cache_key("analyze_video", params, copy)
+
+    with open(copy, "ab") as f:
+        f.write(b"!")
+    assert cache_key("analyze_video", params, video) != cache_key("analyze_video", params, copy)
+
+
+def test_key_depends_on_kind_and_params(video):
+    key = cache_key("analyze_video", {"skip_frames": 5}, video)
+    assert key != cache_key("analyze_video", {"skip_frames": 10}, video)
+    assert key != cache_key("speaker_report", {"skip_frames": 5}, video)
+    assert cache_key("indirme", {"url": "x"}, include_models=False) == \
+        cache_key("indirme", {"url": "x"}, include_models=False)
+
+
+def test_put_get_round_trip(tmp_path):
+    cache = ResultCache(str(tmp_path / "önbellek"))
+    log = tmp_path / "loglar.txt"
+    log.write_text("satır\n", encoding="utf-8")
+    assert cache.get("yok") is None
+
+    cache.put("k", {"Toplam Kare": 80, "Kişi": {"Selin": 1.2}}, {"log": str(log), "video.mp4": None})
+    result, files = cache.get("k")
+    assert result == {"Toplam Kare": 80, "Kişi": {"Selin": 1.2}}
+    assert set(files) == {"log"}
+
+    restored = tmp_path / "geri.txt"
+    restore_file(files, "log", str(restored))
+    assert restored.read_text(encoding="utf-8") == "satır\n"
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path / "önbellek"), max_bytes=10 ** 6)
+    payload = tmp_path / "veri.bin"
+    payload.write_bytes(b"x" * 1000)
+    for i, key in enumerate(("a", "b", "c")):
+        cache.put(key, {"i": i}, {"veri": str(payload)})
+        os.utime(os.path.join(cache.cache_dir, key), (1000 + i, 1000 + i))
+    # "a" en eski kayıttı; okunması onu en yeni yapar
+    assert cache.get("a") is not None
+
+    cache.max_bytes = 2500
+    assert cache.evict() == 1
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
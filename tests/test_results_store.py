@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from results_store import NO_TRACK, FaceResults
+
+
+def _results():
+    # 25 fps, her 5 karede bir örnek: satır başına 0.2 sn
+    results = FaceResults(fps=25, sample_seconds=0.2, capacity=2)
+    results.append(5, "Aysu", "Happy", 90.0, (10, 20, 30, 40), track_id=1)
+    results.append(5, "Selin", "Sad", 60.0, (100, 20, 30, 40), track_id=2)
+    results.append(30, "Aysu", "Sad", 70.0, (12, 20, 30, 40), track_id=1)
+    results.append(55, "Bilinmiyor", None, None)
+    return results
+
+
+def test_append_grows_and_keeps_legacy_records():
+    results = _results()
+    assert len(results) == 4
+    assert results.names == ["Aysu", "Selin", "Bilinmiyor"]
+    assert results[0] == {"Kare": 5, "Kişi": "Aysu", "Duygu": "Happy (90.0%)"}
+    assert results[-1] == {"Kare": 55, "Kişi": "Bilinmiyor", "Duygu": "Tespit edilemedi"}
+    assert results == list(results)
+    assert results.rows(3)[0]["İz"] == NO_TRACK
+    assert results.rows(0, 1)[0]["Kutu"] == [10, 20, 30, 40]
+
+
+def test_totals():
+    people, emotions = _results().totals()
+    assert people == pytest.approx({"Aysu": 0.4, "Selin": 0.2, "Bilinmiyor": 0.2})
+    assert emotions == pytest.approx({"Happy": 0.2, "Sad": 0.4})
+
+
+def test_timeline_bins_by_second():
+    timeline = _results().timeline()
+    # Kare 5 -> 0.16 sn, kare 30 -> 1.16 sn, kare 55 -> 2.16 sn
+    assert timeline["Saniye"].tolist() == [0, 1, 2]
+    np.testing.assert_allclose(timeline["Kişiler"]["Aysu"], [0.2, 0.2, 0])
+    np.testing.assert_allclose(timeline["Kişiler"]["Bilinmiyor"], [0, 0, 0.2])
+    np.testing.assert_allclose(timeline["Duygular"]["Sad"], [0.2, 0.2, 0])
+    np.testing.assert_allclose(timeline["Ortalama Güven (%)"]["Sad"], [60, 70, np.nan])
+
+    assert FaceResults(25).timeline()["Saniye"].size == 0
+
+
+def test_assign_seconds_uses_sample_durations():
+    results = _results()
+    results.assign_seconds([5, 30, 55], [1.0, 2.5, 0.5])
+    assert results.column("süre").tolist() == [1.0, 1.0, 2.5, 0.5]
+    people, _ = results.totals()
+    assert people == pytest.approx({"Aysu": 3.5, "Selin": 1.0, "Bilinmiyor": 0.5})
+
+    empty = FaceResults(25)
+    empty.assign_seconds([], [])
+    assert len(empty) == 0
+
+
+def test_npz_round_trip(tmp_path):
+    results = _results()
+    path = str(tmp_path / "sonuclar.npz")
+    results.save(path)
+    loaded = FaceResults.load(path)
+    assert loaded == results
+    assert (loaded.fps, loaded.sample_seconds) == (25, 0.2)
+    assert loaded.rows() == results.rows()
+    assert loaded.totals() == results.totals()
+
+    # Yüklenen depoya eklemeye devam edilebilir
+    loaded.append(60, "Selin", "Happy", 80.0)
+    assert loaded.names == ["Aysu", "Selin", "Bilinmiyor"]
+    assert loaded.emotions == ["Happy", "Sad"]
+
+
+def test_parquet_round_trip(tmp_path):
+    pytest.importorskip("pyarrow")
+    results = _results()
+    path = str(tmp_path / "sonuclar.parquet")
+    results.save(path)
+    loaded = FaceResults.load(path)
+    assert loaded.rows() == results.rows()
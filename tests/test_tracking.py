@@ -0,0 +1,58 @@
+import pytest
+
+from tracking import FaceTracker, box_iou
+
+
+def test_box_iou():
+    assert box_iou((0, 0, 10, 10), (0, 0, 10, 10)) == 1.0
+    assert box_iou((0, 0, 10, 10), (10, 0, 10, 10)) == 0.0
+    assert box_iou((0, 0, 10, 10), (5, 0, 10, 10)) == pytest.approx(50 / 150)
+
+
+def test_boxes_follow_their_tracks():
+    tracker = FaceTracker(reverify_interval=50)
+    first = tracker.update([(0, 0, 100, 100), (300, 0, 100, 100)], 5)
+    assert [needs for _, needs in first] == [True, True]
+
+    # Sıra değişse de kutular IoU ile kendi izlerine eşleşir; kimlik yeniden istenmez
+    second = tracker.update([(310, 5, 100, 100), (8, 4, 100, 100)], 10)
+    assert [t.track_id for t, _ in second] == [first[1][0].track_id, first[0][0].track_id]
+    assert [needs for _, needs in second] == [False, False]
+
+
+def test_identity_reverified_after_interval():
+    tracker = FaceTracker(reverify_interval=20)
+    tracker.update([(0, 0, 50, 50)], 0)
+    assert tracker.update([(0, 0, 50, 50)], 10)[0][1] is False
+    assert tracker.update([(0, 0, 50, 50)], 20)[0][1] is True
+    assert tracker.update([(0, 0, 50, 50)], 25)[0][1] is False
+
+
+def test_lost_track_is_dropped_after_max_missed():
+    tracker = FaceTracker(max_missed=2)
+    track = tracker.update([(0, 0, 50, 50)], 0)[0][0]
+    for frame in (5, 10):
+        tracker.update([], frame)
+    assert tracker.update([(0, 0, 50, 50)], 15)[0][0] is track
+
+    for frame in (20, 25, 30):
+        tracker.update([], frame)
+    assert tracker.tracks == []
+    assert tracker.update([(0, 0, 50, 50)], 35)[0][0].track_id != track.track_id
+
+
+def test_votes_decide_track_name():
+    track = FaceTracker().update([(0, 0, 50, 50)], 0)[0][0]
+    for name in ("Selin", "Aysu", "Selin"):
+        track.add_identity(name)
+    assert track.name == "Selin"
+
+
+def test_clear_drops_tracks_but_keeps_ids_increasing():
+    tracker = FaceTracker()
+    old = tracker.update([(0, 0, 50, 50)], 0)[0][0]
+    tracker.clear()
+    assert tracker.tracks == []
+    new, needs = tracker.update([(0, 0, 50, 50)], 5)[0]
+    assert needs
+    assert new.track_id > old.track_id
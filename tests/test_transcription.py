@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from transcription import OfflineRecognizerBackend, SpeechSegmenter, join_segments, transcribe_stream
+
+RATE = 16000
+
+
+def _audio(*parts):
+    # parts: (saniye, konuşma mı) çiftleri; konuşma 440 Hz ton, sessizlik sıfır
+    chunks = []
+    for seconds, speech in parts:
+        t = np.arange(int(seconds * RATE)) / RATE
+        chunks.append((3000 * np.sin(2 * np.pi * 440 * t)).astype(np.int16) if speech
+                      else np.zeros(len(t), dtype=np.int16))
+    return np.concatenate(chunks)
+
+
+def _blocks(audio, size=7001):
+    return [audio[i:i + size] for i in range(0, len(audio), size)]
+
+
+def _segment(audio):
+    segmenter = SpeechSegmenter(RATE)
+    segments = []
+    for block in _blocks(audio):
+        segments += segmenter.feed(block)
+    segments += segmenter.finish()
+    return segmenter, [(start / RATE, (start + len(samples)) / RATE) for start, samples in segments]
+
+
+def test_speech_split_on_silence_with_padding():
+    audio = _audio((1, False), (2, True), (1, False), (0.5, True), (1, False))
+    segmenter, segments = _segment(audio)
+    assert segmenter.total_samples == len(audio)
+    assert len(segments) == 2
+    # Her parça, konuşmanın iki yanında PADDING_MS (0.2 sn) kadar sessizlik içerir
+    assert segments[0] == pytest.approx((0.8, 3.2), abs=0.04)
+    assert segments[1] == pytest.approx((3.8, 4.7), abs=0.04)
+
+
+def test_short_noise_is_dropped():
+    _, segments = _segment(_audio((1, False), (0.1, True), (1, False)))
+    assert segments == []
+
+
+def test_long_speech_is_split_at_max_length():
+    _, segments = _segment(_audio((65, True)))
+    lengths = [end - start for start, end in segments]
+    assert len(segments) == 3
+    assert lengths[:2] == pytest.approx([30, 30], abs=0.05)
+    assert segments[-1][1] == pytest.approx(65, abs=0.05)
+
+
+def test_speech_running_to_the_end_is_closed_by_finish():
+    segmenter = SpeechSegmenter(RATE)
+    assert segmenter.feed(_audio((0.5, False), (1, True))) == []
+    (start, samples), = segmenter.finish()
+    assert start / RATE == pytest.approx(0.3, abs=0.04)
+    assert (start + len(samples)) / RATE == pytest.approx(1.5, abs=0.04)
+
+
+def test_transcribe_stream_orders_segments_and_reports_duration():
+    audio = _audio((1, False), (2, True), (1, False), (0.5, True), (1, False))
+    segments, duration = transcribe_stream(_blocks(audio), RATE, OfflineRecognizerBackend(), max_workers=2)
+    assert duration == pytest.approx(5.5)
+    assert [s["start"] for s in segments] == sorted(s["start"] for s in segments)
+    assert join_segments(segments) == "[2.4 sn konuşma] [0.9 sn konuşma]"
+    assert join_segments([]) == "[Konuşma anlaşılamadı]"
+
+
+def test_backend_error_is_kept_in_segment_text():
+    class FlakyBackend:
+        def recognize(self, samples, sample_rate):
+            if len(samples) > sample_rate:
+                raise ConnectionError("bağlantı koptu")
+            return "kısa"
+
+    audio = _audio((1, False), (2, True), (1, False), (0.5, True), (1, False))
+    segments, _ = transcribe_stream(_blocks(audio), RATE, FlakyBackend())
+    assert [s["text"] for s in segments] == ["[Tanıma hatası: ConnectionError: bağlantı koptu]", "kısa"]
@@ -0,0 +1,119 @@
+##
+# @file tracking.py
+# @brief Kareler arasında yüz kutularını eşleştiren hafif çoklu nesne izleyici.
+# @details Aynı kişinin ardışık karelerdeki tespitleri IoU (kesişim/birleşim) oranına göre
+#          bir iz (track) altında toplanır. Kimlik (Facenet + KNN) yalnızca iz başladığında ve
+#          belirli aralıklarla yeniden doğrulama gerektiğinde hesaplanır; aradaki tespitler
+#          izin önbelleğe alınmış kimliğini kullanır.
+##
+
+DEFAULT_IOU_THRESHOLD = 0.3
+DEFAULT_MAX_MISSED = 3
+DEFAULT_REVERIFY_INTERVAL = 50
+
+
+## @brief İki kutunun kesişim/birleşim oranını hesaplar.
+#  @param box_a (x, y, w, h) biçiminde kutu.
+#  @param box_b (x, y, w, h) biçiminde kutu.
+#  @return 0 ile 1 arasında IoU değeri.
+def box_iou(box_a, box_b):
+    ax, ay, aw, ah = box_a
+    bx, by, bw, bh = box_b
+    inter_w = min(ax + aw, bx + bw) - max(ax, bx)
+    inter_h = min(ay + ah, by + bh) - max(ay, by)
+    if inter_w <= 0 or inter_h <= 0:
+        return 0.0
+    inter = inter_w * inter_h
+    return inter / float(aw * ah + bw * bh - inter)
+
+
+## @brief Tek bir yüz izinin durumu ve önbelleğe alınmış kimliği.
+class Track:
+    def __init__(self, track_id, box, frame_index):
+        self.track_id = track_id
+        self.box = tuple(int(v) for v in box)
+        self.last_seen = frame_index
+        self.misses = 0
+        self.name = None
+        self.identity_requested_at = None
+        self._votes = {}
+
+    ## @brief Bu tespit için kimliğin yeniden hesaplanması gerekip gerekmediğini söyler.
+    #  @param frame_index Geçerli kare numarası.
+    #  @param reverify_interval Kimliğin yeniden doğrulanacağı kare aralığı.
+    def needs_identity(self, frame_index, reverify_interval):
+        if self.identity_requested_at is None:
+            return True
+        return frame_index - self.identity_requested_at >= reverify_interval
+
+    ## @brief Yeni bir kimlik tahminini izin oy sayımına ekler.
+    #  @details İzin adı şimdiye kadarki en çok oy alan tahmindir; tek karelik yanlış
+    #           tanımalar etiketi değiştirmez.
+    #  @param name Tanıma modelinin tahmini.
+    #  @return İzin güncel adı.
+    def add_identity(self, name):
+        self._votes[name] = self._votes.get(name, 0) + 1
+        self.name = max(self._votes, key=self._votes.get)
+        return self.name
+
+
+## @brief Tespit kutularını IoU ile mevcut izlere açgözlü (greedy) biçimde eşleştiren izleyici.
+class FaceTracker:
+    ## @param iou_threshold Bir tespitin ize atanması için gereken en küçük IoU.
+    #  @param max_missed Bir izin silinmeden önce eşleşmeden geçebileceği en fazla güncelleme sayısı.
+    #  @param reverify_interval Kimliğin yeniden hesaplanacağı kare aralığı.
+    def __init__(self, iou_threshold=DEFAULT_IOU_THRESHOLD, max_missed=DEFAULT_MAX_MISSED,
+                 reverify_interval=DEFAULT_REVERIFY_INTERVAL):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.reverify_interval = reverify_interval
+        self.tracks = []
+        self._next_id = 1
+
+    ## @brief Tüm izleri bırakır (ör. sahne kesmesinden sonra); iz numaraları artmaya devam eder.
+    def clear(self):
+        self.tracks = []
+
+    ## @brief Bir karedeki tespitlerle izleri günceller.
+    #  @param boxes (x, y, w, h) kutularının listesi.
+    #  @param frame_index Karenin numarası.
+    #  @return Her kutu için (track, needs_identity) ikilisi; kutularla aynı sırada.
+    def update(self, boxes, frame_index):
+        boxes = [tuple(int(v) for v in box) for box in boxes]
+        pairs = []
+        for t_idx, track in enumerate(self.tracks):
+            for b_idx, box in enumerate(boxes):
+                iou = box_iou(track.box, box)
+                if iou >= self.iou_threshold:
+                    pairs.append((iou, t_idx, b_idx))
+        pairs.sort(reverse=True)
+
+        assigned = [None] * len(boxes)
+        used_tracks = set()
+        for _, t_idx, b_idx in pairs:
+            if t_idx in used_tracks or assigned[b_idx] is not None:
+                continue
+            used_tracks.add(t_idx)
+            assigned[b_idx] = self.tracks[t_idx]
+
+        for t_idx, track in enumerate(self.tracks):
+            if t_idx not in used_tracks:
+                track.misses += 1
+        self.tracks = [t for i, t in enumerate(self.tracks) if i in used_tracks or t.misses <= self.max_missed]
+
+        matches = []
+        for b_idx, box in enumerate(boxes):
+            track = assigned[b_idx]
+            if track is None:
+                track = Track(self._next_id, box, frame_index)
+                self._next_id += 1
+                self.tracks.append(track)
+            track.box = box
+            track.last_seen = frame_index
+            track.misses = 0
+
+            needs = track.needs_identity(frame_index, self.reverify_interval)
+            if needs:
+                track.identity_requested_at = frame_index
+            matches.append((track, needs))
+        return matches
@@ -0,0 +1,255 @@
+##
+# @file transcription.py
+# @brief Sesi sessizlik sınırlarından parçalara bölerek akış halinde yazıya döken aşama.
+# @details Tüm WAV dosyasını tek seferde tanıyıcıya göndermek yerine PCM blokları enerji tabanlı
+#          basit bir VAD (ses etkinliği tespiti) ile konuşma parçalarına ayrılır. Her parça
+#          kapandığı anda tanıyıcı arka ucuna (backend) gönderilir ve parçalar eşzamanlı işlenir.
+#          Parçaların zaman damgaları ve toplam süre bellekteki örnek sayılarından hesaplanır.
+#
+#          Arka uçlar:
+#          - "google": speech_recognition ile Google Web Speech API (varsayılan).
+#          - "offline": ağ gerektirmeyen, testler ve ölçümler için yerel yedek.
+#          Varsayılan arka uç MOODLENS_RECOGNIZER ortam değişkeniyle değiştirilebilir.
+##
+
+import os
+import wave
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+DEFAULT_LANGUAGE = "tr-TR"
+FRAME_MS = 30
+ENERGY_THRESHOLD = 300  # speech_recognition.Recognizer'ın varsayılan enerji eşiği (int16 RMS)
+MIN_SILENCE_MS = 500
+MIN_SPEECH_MS = 250
+PADDING_MS = 200
+MAX_SEGMENT_SEC = 30
+MAX_WORKERS = 4
+UNRECOGNIZED_TEXT = "[Konuşma anlaşılamadı]"
+
+
+## @brief Google Web Speech API'yi kullanan tanıyıcı arka ucu.
+class GoogleRecognizerBackend:
+    def __init__(self, language=DEFAULT_LANGUAGE):
+        import speech_recognition as sr
+
+        self._sr = sr
+        self.language = language
+        self.recognizer = sr.Recognizer()
+
+    ## @brief Tek bir konuşma parçasını yazıya çevirir.
+    #  @param samples int16 mono örnekler.
+    #  @param sample_rate Örnekleme hızı.
+    #  @return Metin; konuşma anlaşılamazsa boş metin.
+    def recognize(self, samples, sample_rate):
+        audio_data = self._sr.AudioData(samples.astype(np.int16).tobytes(), sample_rate, 2)
+        try:
+            return self.recognizer.recognize_google(audio_data, language=self.language)
+        except self._sr.UnknownValueError:
+            return ""
+        except self._sr.RequestError as e:
+            return f"[Google API hatası: {e}]"
+
+
+## @brief Ağ gerektirmeyen yerel yedek arka uç; parça süresini metin olarak döndürür.
+#  @details Çevrimdışı testlerde ve ölçümlerde (benchmark) gerçek tanıyıcının yerine geçer.
+class OfflineRecognizerBackend:
+    def recognize(self, samples, sample_rate):
+        return f"[{len(samples) / sample_rate:.1f} sn konuşma]"
+
+
+_BACKENDS = {
+    "google": GoogleRecognizerBackend,
+    "offline": OfflineRecognizerBackend,
+}
+
+
+## @brief Adına göre tanıyıcı arka ucu oluşturur.
+#  @param name "google" ya da "offline"; None ise MOODLENS_RECOGNIZER ortam değişkeni, o da yoksa "google".
+#  @return recognize(samples, sample_rate) metodu olan nesne.
+def get_recognizer_backend(name=None):
+    name = name or os.environ.get("MOODLENS_RECOGNIZER", "google")
+    if name not in _BACKENDS:
+        raise ValueError(f"Bilinmeyen tanıyıcı arka ucu: {name}")
+    return _BACKENDS[name]()
+
+
+## @brief PCM bloklarını akış halinde konuşma parçalarına ayıran enerji tabanlı VAD.
+#  @details feed ile gelen bloklar FRAME_MS uzunluğunda çerçevelere bölünür. RMS enerjisi eşiği
+#           aşan çerçeveler konuşma sayılır; MIN_SILENCE_MS kadar sessizlik parçayı kapatır.
+#           Parçalar MAX_SEGMENT_SEC'i aşarsa zorla bölünür, böylece her istek sınırlı boyuttadır.
+class SpeechSegmenter:
+    def __init__(self, sample_rate, energy_threshold=ENERGY_THRESHOLD, frame_ms=FRAME_MS,
+                 min_silence_ms=MIN_SILENCE_MS, min_speech_ms=MIN_SPEECH_MS, padding_ms=PADDING_MS,
+                 max_segment_sec=MAX_SEGMENT_SEC):
+        self.sample_rate = sample_rate
+        self.energy_threshold = energy_threshold
+        self.frame_len = max(1, int(sample_rate * frame_ms / 1000))
+        self.min_silence_frames = max(1, min_silence_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.padding_frames = padding_ms // frame_ms
+        self.max_segment_frames = max(1, int(max_segment_sec * 1000 // frame_ms))
+
+        self.total_samples = 0
+        self._leftover = np.zeros(0, dtype=np.int16)
+        self._preroll = deque(maxlen=self.padding_frames)
+        self._frames = []
+        self._start = None
+        self._speech_frames = 0
+        self._silence_run = 0
+
+    ## @brief Yeni bir PCM bloğu ekler.
+    #  @param block int16 mono örnekler.
+    #  @return Bu blokla tamamlanan (start_sample, samples) parçalarının listesi.
+    def feed(self, block):
+        block = np.asarray(block, dtype=np.int16)
+        data = np.concatenate([self._leftover, block]) if len(self._leftover) else block
+        n_frames = len(data) // self.frame_len
+        self._leftover = data[n_frames * self.frame_len:]
+
+        completed = []
+        for i in range(n_frames):
+            frame = data[i * self.frame_len:(i + 1) * self.frame_len]
+            frame_start = self.total_samples
+            self.total_samples += len(frame)
+            segment = self._process_frame(frame, frame_start)
+            if segment is not None:
+                completed.append(segment)
+        return completed
+
+    ## @brief Akışın sonunda açık kalan parçayı kapatır.
+    #  @return Kalan parçaların listesi.
+    def finish(self):
+        completed = []
+        if len(self._leftover):
+            frame_start = self.total_samples
+            self.total_samples += len(self._leftover)
+            segment = self._process_frame(self._leftover, frame_start)
+            self._leftover = np.zeros(0, dtype=np.int16)
+            if segment is not None:
+                completed.append(segment)
+        segment = self._close(trim_silence=True)
+        if segment is not None:
+            completed.append(segment)
+        return completed
+
+    def _process_frame(self, frame, frame_start):
+        rms = np.sqrt(np.mean(frame.astype(np.float32) ** 2))
+        is_speech = rms >= self.energy_threshold
+
+        if self._start is None:
+            if not is_speech:
+                self._preroll.append((frame_start, frame))
+                return None
+            # Konuşmanın başı kesilmesin diye önceki sessiz çerçeveler parçaya eklenir
+            self._frames = [f for _, f in self._preroll]
+            self._start = self._preroll[0][0] if self._preroll else frame_start
+            self._preroll.clear()
+
+        self._frames.append(frame)
+        if is_speech:
+            self._speech_frames += 1
+            self._silence_run = 0
+        else:
+            self._silence_run += 1
+
+        if self._silence_run >= self.min_silence_frames:
+            return self._close(trim_silence=True)
+        if len(self._frames) >= self.max_segment_frames:
+            return self._close(trim_silence=False)
+        return None
+
+    def _close(self, trim_silence):
+        if self._start is None:
+            return None
+        frames = self._frames
+        if trim_silence:
+            # Sondaki sessizliğin yalnızca dolgu kadarı bırakılır
+            extra = max(0, self._silence_run - self.padding_frames)
+            frames = frames[:len(frames) - extra] if extra else frames
+        start, speech_frames = self._start, self._speech_frames
+        self._frames, self._start, self._speech_frames, self._silence_run = [], None, 0, 0
+        if speech_frames < self.min_speech_frames or not frames:
+            return None
+        return start, np.concatenate(frames)
+
+
+## @brief 16 bit PCM WAV dosyasını mono int16 bloklar halinde okur.
+#  @param audio_path WAV dosyası.
+#  @param block_sec Blok uzunluğu (saniye).
+#  @return (sample_rate, blok üreteci) ikilisi.
+def iter_wav_blocks(audio_path, block_sec=1.0):
+    wav = wave.open(audio_path, "rb")
+    if wav.getsampwidth() != 2:
+        wav.close()
+        raise ValueError("Yalnızca 16 bit PCM WAV dosyaları desteklenir.")
+    sample_rate = wav.getframerate()
+    channels = wav.getnchannels()
+
+    def blocks():
+        with wav:
+            block_frames = max(1, int(sample_rate * block_sec))
+            while True:
+                raw = wav.readframes(block_frames)
+                if not raw:
+                    return
+                samples = np.frombuffer(raw, dtype=np.int16)
+                if channels > 1:
+                    samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+                yield samples
+
+    return sample_rate, blocks()
+
+
+## @brief PCM bloklarını parçalara bölüp tanıyıcıya eşzamanlı gönderir.
+#  @details Parçalar kapandıkça iş parçacığı havuzuna verilir; aynı anda en fazla 2 * max_workers
+#           parça bellekte bekler. Sonuçlar ses içindeki sırayla döner.
+#  @param blocks int16 mono PCM blokları.
+#  @param sample_rate Örnekleme hızı.
+#  @param backend Tanıyıcı arka ucu; None ise get_recognizer_backend().
+#  @param max_workers Eşzamanlı tanıma isteği sayısı.
+#  @return (segments, duration_sec): {"start", "end", "text"} sözlükleri ve toplam ses süresi.
+#          Arka ucun bir parçada yükselttiği hata o parçanın metninde "[Tanıma hatası: ...]" olarak yer alır.
+def transcribe_stream(blocks, sample_rate, backend=None, max_workers=MAX_WORKERS):
+    backend = backend or get_recognizer_backend()
+    segmenter = SpeechSegmenter(sample_rate)
+    pending = deque()
+    segments = []
+
+    def collect(future, start, length):
+        # Tek bir parçadaki hata (ör. bağlantı kopması) tüm yazıya dökmeyi durdurmaz
+        try:
+            text = future.result()
+        except Exception as e:
+            text = f"[Tanıma hatası: {type(e).__name__}: {e}]"
+        if text:
+            segments.append({
+                "start": round(start / sample_rate, 2),
+                "end": round((start + length) / sample_rate, 2),
+                "text": text,
+            })
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        def submit(completed):
+            for start, samples in completed:
+                pending.append((executor.submit(backend.recognize, samples, sample_rate), start, len(samples)))
+                while len(pending) > 2 * max_workers:
+                    collect(*pending.popleft())
+
+        for block in blocks:
+            submit(segmenter.feed(block))
+        submit(segmenter.finish())
+        while pending:
+            collect(*pending.popleft())
+
+    return segments, segmenter.total_samples / sample_rate
+
+
+## @brief Zaman damgalı parçaları tek bir metinde birleştirir.
+#  @param segments transcribe_stream çıktısı.
+#  @return Metin; hiç konuşma tanınmadıysa "[Konuşma anlaşılamadı]".
+def join_segments(segments):
+    text = " ".join(segment["text"] for segment in segments)
+    return text or UNRECOGNIZED_TEXT